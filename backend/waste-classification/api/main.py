@@ -2,11 +2,19 @@ from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from routers import dispose, health, distance, rag, User_routes, collector, tax_routes,overflow, complaints
 from core.database import connect_to_mongo, close_mongo_connection
+from core.config import get_settings
+from repositories import pending_repo
+from services.leaderboard import leaderboard
+from api.middleware import BodySizeLimitMiddleware, BODY_OVERHEAD_BYTES
 from jobs.schedular import setup_schedular
 from jobs.retraining_scheduler import setup_retraining_scheduler
+from jobs.prewarm_workflows import setup_workflow_prewarm_scheduler
+from jobs.reward_jobs import setup_reward_scheduler
+from jobs import cluster
 import logging
 
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 app = FastAPI(
     title="EcoFit Waste Classification API",
@@ -22,6 +30,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Cap image payloads before they are buffered: JSON bodies carry base64 (4/3 of the raw size)
+app.add_middleware(
+    BodySizeLimitMiddleware,
+    max_bytes=settings.max_upload_bytes * 4 // 3 + BODY_OVERHEAD_BYTES,
+    path_prefixes=("/api/v1/dispose",),
+)
+
 @app.on_event("startup")
 async def startup_db_client():
     import logging
@@ -29,6 +44,15 @@ async def startup_db_client():
     logger.info("Starting database connection...")
     print("------------Starting database connection...-----------")
     await connect_to_mongo()
+    await dispose.classifier.image_cache.ensure_indexes()
+    await dispose.classifier.workflow_cache.ensure_indexes()
+    await dispose.classifier.tip_catalog.ensure_indexes()
+    await dispose.classifier.tip_catalog.refresh(force=True)
+    await dispose.classifier.tip_feedback.ensure_indexes()
+    dispose.classifier.tip_feedback.start()
+    await pending_repo.recount()
+    await leaderboard.ensure_indexes()
+    await cluster.ensure_indexes()
     
     # Start the data collection scheduler
     print("------------Starting data collection scheduler...-----------")
@@ -37,11 +61,18 @@ async def startup_db_client():
     # Add model retraining job to the same scheduler
     print("------------Setting up model retraining scheduler...-----------")
     setup_retraining_scheduler(scheduler)
+
+    print("------------Setting up tip workflow prewarm...-----------")
+    setup_workflow_prewarm_scheduler(scheduler, dispose.classifier)
+
+    print("------------Setting up reward distribution...-----------")
+    setup_reward_scheduler(scheduler)
     
     logger.info("---------All schedulers started successfully---------------")
 
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await dispose.classifier.close()
     await close_mongo_connection()
 
 @app.get("/ping")
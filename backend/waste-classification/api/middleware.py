@@ -0,0 +1,83 @@
+import json
+from fastapi import HTTPException
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# base64 inflates payloads by 4/3, plus room for the other JSON/multipart fields
+BODY_OVERHEAD_BYTES = 64 * 1024
+
+
+class BodySizeLimitMiddleware:
+    """
+    Reject request bodies larger than max_bytes on the given path prefixes.
+
+    Checks Content-Length up front and also counts the bytes as they are
+    streamed in, so chunked uploads without a Content-Length header are capped
+    before the multipart parser spools them.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int, path_prefixes: tuple):
+        self.app = app
+        self.max_bytes = max_bytes
+        self.path_prefixes = path_prefixes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send):
+        if scope["type"] != "http" or not scope["path"].startswith(self.path_prefixes):
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        content_length = headers.get(b"content-length")
+        if content_length is not None:
+            try:
+                if int(content_length) > self.max_bytes:
+                    await self._reject(send)
+                    return
+            except ValueError:
+                pass
+
+        received = 0
+        response_started = False
+
+        async def limited_receive():
+            nonlocal received
+            message = await receive()
+            if message["type"] == "http.request":
+                received += len(message.get("body", b""))
+                if received > self.max_bytes:
+                    raise _BodyTooLarge(self.max_bytes)
+            return message
+
+        async def tracking_send(message):
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except _BodyTooLarge:
+            if not response_started:
+                await self._reject(send)
+
+    async def _reject(self, send: Send):
+        body = json.dumps({"detail": _limit_message(self.max_bytes)}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": 413,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode("latin-1")),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def _limit_message(max_bytes: int) -> str:
+    return f"Request body exceeds the {max_bytes // (1024 * 1024)} MB limit"
+
+
+class _BodyTooLarge(HTTPException):
+    # Raised mid-stream; FastAPI re-raises HTTPException from body parsing,
+    # so the client gets a 413 instead of a generic 400 parse error.
+    def __init__(self, max_bytes: int):
+        super().__init__(status_code=413, detail=_limit_message(max_bytes))
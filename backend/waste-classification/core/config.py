@@ -17,11 +17,54 @@ class Settings(BaseSettings):
     # Model settings
     model_path: Optional[str] = None
     confidence_threshold: float = 0.5
+    # Inference backend for the waste CNN/text models: keras (tf.function) |
+    # keras_predict | tflite | tflite_int8 (TFLite files come from jobs/export_models.py)
+    classifier_backend: str = "keras"
+    tflite_num_threads: Optional[int] = None
+
+    # Upload limits (applies to /dispose and /dispose/upload)
+    max_upload_bytes: int = 15 * 1024 * 1024
+    upload_chunk_bytes: int = 64 * 1024
+
+    # Perceptual-hash cache for image classification
+    image_cache_size: int = 1024
+    image_cache_ttl_seconds: int = 3600
+    image_cache_max_distance: int = 3
+    image_cache_shared: bool = False
+
+    # Normalized-description caches for text classification
+    text_cache_size: int = 4096
+    text_cache_ttl_seconds: int = 24 * 3600
 
     mongodb_url: str
     mongodb_db_name: str
+    mongodb_ensure_indexes: bool = True
+    mongodb_max_pool_size: int = 50
+    mongodb_min_pool_size: int = 5
+    mongodb_max_idle_time_ms: int = 60_000
+    mongodb_server_selection_timeout_ms: int = 5_000
+    mongodb_connect_timeout_ms: int = 10_000
+    mongodb_socket_timeout_ms: int = 30_000
+    mongodb_compressors: str = "zstd,zlib"  # negotiated with the server in this order; snappy needs python-snappy
+    mongodb_read_preference: str = "primary"  # primaryPreferred | secondaryPreferred | nearest ...
     
     llm_key: Optional[str] = None
+    llm_timeout_seconds: float = 15.0
+    llm_max_connections: int = 20
+    workflow_cache_size: int = 2048
+    workflow_cache_ttl_seconds: int = 7 * 24 * 3600
+    workflow_prewarm_concurrency: int = 4
+    tip_catalog_refresh_seconds: int = 300
+    tip_feedback_batch_size: int = 200
+    tip_feedback_flush_seconds: float = 5.0
+    prediction_cache_size: int = 4096
+    prediction_cache_ttl_seconds: int = 24 * 3600
+    leaderboard_cache_ttl_seconds: int = 30
+    job_lease_seconds: int = 300  # how long a scheduled run blocks the same job on other workers
+    job_run_retention_days: int = 30
+    sequence_block_size: int = 100  # IDs reserved per counter round trip (complaints, tips)
+    household_import_chunk_size: int = 500  # households written per insert_many/transaction
+    household_import_max_bytes: int = 64 * 1024 * 1024
     
     class Config:
         env_file = str(ROOT_DIR / ".env")  # Points to root .env file
@@ -1,4 +1,5 @@
 from enum import Enum
+from typing import Optional
 
 class WasteType(str, Enum):
     PLASTIC = "plastic"
@@ -17,6 +18,33 @@ class WasteType(str, Enum):
     PHARMACEUTICAL = "pharmaceutical"
     RESIDUAL = "residual"
 
+# Output index -> waste type for the text model (model_functional_text.keras)
+TEXT_CLASS_MAPPING = {
+    0: WasteType.CLOTHES,
+    1: WasteType.E_WASTE,
+    2: WasteType.GLASS,
+    3: WasteType.PHARMACEUTICAL,
+    4: WasteType.METAL,
+    5: WasteType.ORGANIC,
+    6: WasteType.PAPER,
+    7: WasteType.PLASTIC,
+    8: WasteType.UNKNOWN,
+}
+
+# Output index -> waste type for the image CNN (waste_model_three.keras)
+IMAGE_CLASS_MAPPING = {
+    0: WasteType.BATTERIES,
+    1: WasteType.CLOTHES,
+    2: WasteType.E_WASTE,
+    3: WasteType.GLASS,
+    4: WasteType.LIGHT_BULBS,
+    5: WasteType.METAL,
+    6: WasteType.ORGANIC,
+    7: WasteType.OTHER,
+    8: WasteType.PAPER,
+    9: WasteType.PLASTIC
+}
+
 class BinCategory(str, Enum):
     RECYCLING = "blue_bin"
     GENERAL = "yellow_bin"
@@ -31,6 +59,39 @@ def overflow_collection(bin_id: str) -> str:
     """MongoDB collection name for a bin's volume/distance time series."""
     return f"bin_volumes_{bin_id}"
 
+
+def normalize_location(location: Optional[str]) -> Optional[str]:
+    """Canonical form of a ward/location name, as stored in the indexed `location` fields."""
+    location = (location or "").strip().lower()
+    return location or None
+
+
+def household_location(household_id: str) -> Optional[str]:
+    """Ward/location segment of a household ID (HH-<location>-<seq>), normalized."""
+    parts = str(household_id or "").split("-")
+    return normalize_location("-".join(parts[1:-1])) if len(parts) >= 3 else None
+
+
+def id_suffix(value: str, separator: str) -> int:
+    """Trailing sequence number of an ID such as HH-Colombo-07 or Collector_Colombo_07 (0 if none)."""
+    try:
+        return int(str(value).rsplit(separator, 1)[-1])
+    except (ValueError, IndexError):
+        return 0
+
+
+def location_counter_id(kind: str, location: str) -> str:
+    return f"{kind}_seq:{normalize_location(location)}"
+
+
+# Weekly weight (kg) upper bounds for the Zero / Low / Normal behaviour classes; above the last is High
+BEHAVIOUR_THRESHOLDS = {
+    "Organic": (0.5, 2.0, 5.0),
+    "Inorganic": (1.0, 4.0, 8.0),
+    "Recyclable": (0.1, 0.8, 2.5),
+}
+BEHAVIOUR_CLASSES = ("Zero", "Low", "Normal", "High")
+
 class FitStatus(str, Enum):
     FITS = "fits"
     DOES_NOT_FIT = "does_not_fit"
@@ -1,5 +1,9 @@
+import threading
+import time
 from motor.motor_asyncio import AsyncIOMotorClient
+from pymongo import monitoring
 from core.config import get_settings
+from core.metrics import register_metrics
 import logging
 
 # Configure logging
@@ -16,26 +20,137 @@ class Database:
 
 db = Database()
 
-async def connect_to_mongo():
-    """Create database connection"""
+# Server error codes meaning multi-document transactions are unavailable (standalone mongod)
+TRANSACTIONS_UNSUPPORTED_CODES = {20, 263}
+
+
+class PoolMetricsListener(monitoring.ConnectionPoolListener):
+    """Connection pool counters for GET /health/metrics (events arrive on driver threads)."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._checkout_started = {}
+        self.open = 0
+        self.checked_out = 0
+        self.max_checked_out = 0
+        self.checkouts = 0
+        self.checkout_failures = 0
+        self.pool_clears = 0
+        self.total_wait_ms = 0.0
+        self.max_wait_ms = 0.0
+
+    def _wait_ms(self, event) -> float:
+        started = self._checkout_started.pop((event.address, threading.get_ident()), None)
+        return (time.monotonic() - started) * 1000 if started is not None else 0.0
+
+    def pool_created(self, event): pass
+    def pool_ready(self, event): pass
+    def pool_closed(self, event): pass
+
+    def pool_cleared(self, event):
+        with self._lock:
+            self.pool_clears += 1
+
+    def connection_created(self, event):
+        with self._lock:
+            self.open += 1
+
+    def connection_ready(self, event): pass
+
+    def connection_closed(self, event):
+        with self._lock:
+            self.open -= 1
+
+    def connection_check_out_started(self, event):
+        with self._lock:
+            self._checkout_started[(event.address, threading.get_ident())] = time.monotonic()
+
+    def connection_check_out_failed(self, event):
+        with self._lock:
+            self._wait_ms(event)
+            self.checkout_failures += 1
+
+    def connection_checked_out(self, event):
+        with self._lock:
+            wait = self._wait_ms(event)
+            self.checkouts += 1
+            self.total_wait_ms += wait
+            self.max_wait_ms = max(self.max_wait_ms, wait)
+            self.checked_out += 1
+            self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def connection_checked_in(self, event):
+        with self._lock:
+            self.checked_out -= 1
+
+    def stats(self) -> dict:
+        return {
+            "max_pool_size": settings.mongodb_max_pool_size,
+            "open_connections": self.open,
+            "checked_out": self.checked_out,
+            "max_checked_out": self.max_checked_out,
+            "utilisation": round(self.checked_out / settings.mongodb_max_pool_size, 4),
+            "checkouts": self.checkouts,
+            "checkout_failures": self.checkout_failures,
+            "avg_checkout_wait_ms": round(self.total_wait_ms / self.checkouts, 3) if self.checkouts else 0.0,
+            "max_checkout_wait_ms": round(self.max_wait_ms, 3),
+            "pool_clears": self.pool_clears,
+        }
+
+
+pool_metrics = PoolMetricsListener()
+register_metrics("mongo_pool", pool_metrics.stats)
+
+
+def create_mongo_client() -> AsyncIOMotorClient:
+    """Motor client with the pool, timeout, compression and read preference from Settings."""
+    options = dict(
+        maxPoolSize=settings.mongodb_max_pool_size,
+        minPoolSize=settings.mongodb_min_pool_size,
+        maxIdleTimeMS=settings.mongodb_max_idle_time_ms,
+        serverSelectionTimeoutMS=settings.mongodb_server_selection_timeout_ms,
+        connectTimeoutMS=settings.mongodb_connect_timeout_ms,
+        socketTimeoutMS=settings.mongodb_socket_timeout_ms,
+        readPreference=settings.mongodb_read_preference,
+        event_listeners=[pool_metrics],
+    )
+    if settings.mongodb_compressors:
+        options["compressors"] = settings.mongodb_compressors
+    return AsyncIOMotorClient(settings.mongodb_url, **options)
+
+async def connect_to_mongo(ensure_indexes: bool = None):
+    """
+    Create the process-wide database connection. Safe to call more than once;
+    jobs running in their own process call it instead of opening ad-hoc clients.
+    """
+    if db.client is not None:
+        return
     try:
-        logger.info(f"Attempting to connect to MongoDB at: {settings.mongodb_url}")
+        logger.info("Attempting to connect to MongoDB")
         logger.info(f"Database name: {settings.mongodb_db_name}")
-        db.client = AsyncIOMotorClient(settings.mongodb_url)
+        db.client = create_mongo_client()
         db.database = db.client[settings.mongodb_db_name]
-        
+
         await db.client.admin.command('ping')
         logger.info("------------Connected to MongoDB successfully---------------")
+
+        if settings.mongodb_ensure_indexes if ensure_indexes is None else ensure_indexes:
+            from core.indexes import ensure_indexes as _ensure_indexes
+            await _ensure_indexes(db.database)
     except Exception as e:
         logger.error(f"Error connecting to MongoDB: {str(e)}")
+        db.client = None
+        db.database = None
         raise
 
 async def close_mongo_connection():
     """Close database connection"""
     if db.client:
         db.client.close()
+        db.client = None
+        db.database = None
         logger.info("------------Disconnected from MongoDB---------------")
 
 def get_database():
     """Get database instance"""
-    return db.database
\ No newline at end of file
+    return db.database
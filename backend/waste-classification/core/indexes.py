@@ -0,0 +1,193 @@
+"""
+Index registry for the MongoDB collections behind the hot routes.
+
+Every index the application relies on is declared here and created
+idempotently from connect_to_mongo (create_indexes is a no-op for indexes that
+already exist with the same spec). index_report() compares the declaration
+against the server ($indexStats) and explain_hot_queries() shows which plan
+each hot query gets; both are served by GET /health/indexes.
+"""
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+
+from core.constants import OVERFLOW_BIN_IDS, overflow_collection
+
+logger = logging.getLogger(__name__)
+
+
+def _bin_volume_indexes() -> Dict[str, List[IndexModel]]:
+    return {
+        name: [IndexModel([("recorded_at", ASCENDING)], name="recorded_at")]
+        for name in ["bin_volumes"] + [overflow_collection(b) for b in OVERFLOW_BIN_IDS]
+    }
+
+
+INDEX_REGISTRY: Dict[str, List[IndexModel]] = {
+    "history_col": [
+        IndexModel([("household_id", ASCENDING), ("waste_type", ASCENDING)], name="household_waste_type"),
+    ],
+    "pending_col": [
+        IndexModel([("household_id", ASCENDING), ("waste_type", ASCENDING), ("year", ASCENDING),
+                    ("week", ASCENDING), ("status", ASCENDING)], name="household_waste_type_week_status"),
+        IndexModel([("status", ASCENDING), ("submitted_at", ASCENDING), ("_id", ASCENDING)],
+                   name="status_submitted_at_id"),
+        IndexModel([("status", ASCENDING), ("location", ASCENDING), ("submitted_at", ASCENDING), ("_id", ASCENDING)],
+                   name="status_location_submitted_at_id"),
+    ],
+    "bills": [
+        IndexModel([("household_id", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="household_created_at_id"),
+        IndexModel([("status", ASCENDING), ("year", ASCENDING), ("week", ASCENDING)], name="status_year_week"),
+        IndexModel([("status", ASCENDING), ("location", ASCENDING), ("created_at", DESCENDING), ("_id", DESCENDING)],
+                   name="status_location_created_at_id"),
+    ],
+    "users": [
+        IndexModel([("email", ASCENDING)], name="email"),
+        IndexModel([("username", ASCENDING)], name="username"),
+        IndexModel([("location_key", ASCENDING)], name="location_key"),
+    ],
+    "households_col": [
+        IndexModel([("linked_email", ASCENDING)], name="linked_email"),
+        IndexModel([("location", ASCENDING)], name="location"),
+    ],
+    "complaints": [
+        IndexModel([("createdAt", DESCENDING), ("wardId", ASCENDING)], name="createdAt_wardId"),
+    ],
+    "waste_prices": [
+        IndexModel([("waste_type", ASCENDING)], name="waste_type"),
+    ],
+    "rewards": [
+        # one monthly reward per household; makes distribute_rewards idempotent. Rewards written by
+        # the old per-worker scheduler may be duplicated: run jobs/dedupe_rewards.py first
+        IndexModel([("household_id", ASCENDING), ("year", ASCENDING), ("month", ASCENDING)],
+                   name="household_year_month_unique", unique=True,
+                   partialFilterExpression={"month": {"$exists": True}}),
+    ],
+    **_bin_volume_indexes(),
+}
+
+
+def hot_queries() -> List[dict]:
+    """Representative shapes of the hot route queries, used for explain plans."""
+    now = datetime.utcnow()
+    return [
+        {"collection": "history_col", "filter": {"household_id": "H001", "waste_type": "organic"}},
+        {"collection": "pending_col", "filter": {"household_id": "H001", "waste_type": "organic",
+                                                 "year": now.year, "week": 1, "status": "REVIEW"}},
+        {"collection": "pending_col", "filter": {"status": "REVIEW"}, "sort": {"submitted_at": 1, "_id": 1}},
+        {"collection": "pending_col", "filter": {"status": "REVIEW", "location": "colombo"},
+         "sort": {"submitted_at": 1, "_id": 1}},
+        {"collection": "bills", "filter": {"household_id": "H001"}, "sort": {"created_at": -1, "_id": -1}},
+        {"collection": "bills", "filter": {"status": "PAID", "year": now.year, "week": 1}},
+        {"collection": "bills", "filter": {"status": "UNPAID", "location": "colombo"},
+         "sort": {"created_at": -1, "_id": -1}},
+        {"collection": "users", "filter": {"email": "user@example.com"}},
+        {"collection": "users", "filter": {"username": "collector"}},
+        {"collection": "users", "filter": {"location_key": "colombo", "username": {"$regex": "^Collector_"}}},
+        {"collection": "households_col", "filter": {"linked_email": "user@example.com"}},
+        {"collection": "households_col", "filter": {"location": "colombo"}},
+        {"collection": "complaints", "filter": {"createdAt": {"$gte": now - timedelta(hours=24)}, "wardId": "W1"},
+         "sort": {"createdAt": -1}},
+        {"collection": "waste_prices", "filter": {"waste_type": "organic"}},
+        {"collection": overflow_collection(OVERFLOW_BIN_IDS[0]),
+         "filter": {"recorded_at": {"$gte": now - timedelta(days=30)}}, "sort": {"recorded_at": 1}},
+    ]
+
+
+# Last ensure_indexes error per collection in this process, reported by index_report
+ensure_failures: Dict[str, str] = {}
+
+
+async def ensure_indexes(database) -> dict:
+    """Create every registered index. Failures are logged per collection and never raised."""
+    created, failed = {}, {}
+    for collection, models in INDEX_REGISTRY.items():
+        try:
+            created[collection] = await database[collection].create_indexes(models)
+        except Exception as e:
+            failed[collection] = str(e)
+            logger.error(f"Could not create indexes on {collection}: {str(e)}")
+    ensure_failures.clear()
+    ensure_failures.update(failed)
+    logger.info(f"Ensured indexes on {len(created)} collections ({len(failed)} failed)")
+    return {"created": created, "failed": failed}
+
+
+async def index_report(database) -> dict:
+    """
+    Per collection: registered indexes missing on the server, server indexes
+    with no recorded use since the last restart ($indexStats ops == 0), and the
+    error if ensure_indexes could not create them (e.g. duplicate keys).
+    """
+    existing_collections = set(await database.list_collection_names())
+    report = {}
+    for collection in sorted(existing_collections | set(INDEX_REGISTRY)):
+        declared = {model.document["name"] for model in INDEX_REGISTRY.get(collection, [])}
+        if collection not in existing_collections:
+            report[collection] = {"exists": False, "missing": sorted(declared), "unused": []}
+            continue
+        try:
+            usage = {
+                stat["name"]: stat["accesses"]["ops"]
+                async for stat in database[collection].aggregate([{"$indexStats": {}}])
+            }
+        except Exception as e:
+            report[collection] = {"error": str(e)}
+            continue
+        report[collection] = {
+            "exists": True,
+            "missing": sorted(declared - usage.keys()),
+            "unused": sorted(name for name, ops in usage.items() if ops == 0 and name != "_id_"),
+            "ops": usage,
+        }
+        if collection in ensure_failures:
+            report[collection]["ensure_error"] = ensure_failures[collection]
+    return report
+
+
+def plan_stages(plan: dict) -> List[str]:
+    """Flatten an explain winningPlan into its stage names, root first."""
+    stages = []
+    node = plan.get("queryPlan", plan)
+    while node:
+        stages.append(node.get("stage"))
+        inputs = node.get("inputStages") or ([node["inputStage"]] if "inputStage" in node else [])
+        for extra in inputs[1:]:
+            stages.extend(plan_stages(extra))
+        node = inputs[0] if inputs else None
+    return stages
+
+
+async def explain_query(database, query: dict, verbosity: str = "queryPlanner") -> dict:
+    find = {"find": query["collection"], "filter": query["filter"]}
+    if query.get("sort"):
+        find["sort"] = query["sort"]
+    explain = await database.command({"explain": find, "verbosity": verbosity})
+    stages = plan_stages(explain["queryPlanner"]["winningPlan"])
+    result = {
+        "collection": query["collection"],
+        "filter": list(query["filter"]),
+        "stages": stages,
+        "uses_index": "IXSCAN" in stages or "IDHACK" in stages,
+    }
+    if "executionStats" in explain:
+        stats = explain["executionStats"]
+        result.update({
+            "docs_examined": stats.get("totalDocsExamined"),
+            "keys_examined": stats.get("totalKeysExamined"),
+            "execution_ms": stats.get("executionTimeMillis"),
+        })
+    return result
+
+
+async def explain_hot_queries(database, verbosity: str = "queryPlanner") -> List[dict]:
+    results = []
+    for query in hot_queries():
+        try:
+            results.append(await explain_query(database, query, verbosity))
+        except Exception as e:
+            results.append({"collection": query["collection"], "error": str(e)})
+    return results
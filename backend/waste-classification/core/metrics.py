@@ -0,0 +1,23 @@
+import logging
+from typing import Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+# name -> zero-arg callable returning a JSON-serialisable dict
+_providers: Dict[str, Callable[[], dict]] = {}
+
+
+def register_metrics(name: str, provider: Callable[[], dict]) -> None:
+    """Register a stats provider to be reported by GET /health/metrics."""
+    _providers[name] = provider
+
+
+def collect_metrics() -> dict:
+    result = {}
+    for name, provider in _providers.items():
+        try:
+            result[name] = provider()
+        except Exception as e:
+            logger.warning(f"Metrics provider {name} failed: {str(e)}")
+            result[name] = {"error": str(e)}
+    return result
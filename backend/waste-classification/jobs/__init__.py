@@ -7,12 +7,21 @@ from .retraining_scheduler import (
     trigger_model_retraining,
     run_retraining_sync
 )
+from .prewarm_workflows import setup_workflow_prewarm_scheduler, prewarm_tip_workflows
+from .reward_jobs import setup_reward_scheduler, distribute_last_month_rewards
+from .cluster import cluster_job, job_report
 
 __all__ = [
     'setup_schedular',
     'save_bin_volume',
     'setup_retraining_scheduler',
     'trigger_model_retraining',
-    'run_retraining_sync'
+    'run_retraining_sync',
+    'setup_workflow_prewarm_scheduler',
+    'prewarm_tip_workflows',
+    'setup_reward_scheduler',
+    'distribute_last_month_rewards',
+    'cluster_job',
+    'job_report'
 ]
 
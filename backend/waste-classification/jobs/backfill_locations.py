@@ -0,0 +1,124 @@
+"""
+Backfill the denormalized location fields and seed the per-location ID counters.
+
+Documents written before the fields existed are found with {<field>: {$exists:
+false}}; the location is derived from the household ID ("HH-<location>-<seq>")
+for pending submissions, bills and households, and from the free-text
+location/area for users (`location_key`). Updates go out in bulk batches.
+Afterwards the household and collector ID counters are raised ($max) to the
+highest sequence in use per location, and the pending review counter is
+rebuilt. Safe to re-run.
+
+Usage:
+  python jobs/backfill_locations.py --batch-size 1000
+  python jobs/backfill_locations.py --dry-run
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pymongo import UpdateOne
+
+from core.constants import household_location, normalize_location, id_suffix, location_counter_id
+from core.database import connect_to_mongo, close_mongo_connection, get_database
+from repositories import pending_repo
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+# collection -> (field to fill, projection, derivation from the projected document)
+BACKFILL_SOURCES = {
+    "pending_col": ("location", {"household_id": 1}, lambda doc: household_location(doc.get("household_id"))),
+    "bills": ("location", {"household_id": 1}, lambda doc: household_location(doc.get("household_id"))),
+    "households_col": ("location", {"_id": 1}, lambda doc: household_location(doc["_id"])),
+    "users": ("location_key", {"location": 1, "area": 1},
+              lambda doc: normalize_location(doc.get("location") or doc.get("area"))),
+}
+
+
+async def backfill_collection(db, collection: str, source: tuple, batch_size: int, dry_run: bool) -> dict:
+    field, projection, derive = source
+    updated, skipped = 0, 0
+    cursor = db[collection].find({field: {"$exists": False}}, projection).batch_size(batch_size)
+    operations = []
+    async for doc in cursor:
+        location = derive(doc)
+        if location is None:
+            skipped += 1
+            continue
+        operations.append(UpdateOne({"_id": doc["_id"], field: {"$exists": False}},
+                                    {"$set": {field: location}}))
+        if len(operations) >= batch_size:
+            updated += await _flush(db, collection, operations, dry_run)
+            operations = []
+    if operations:
+        updated += await _flush(db, collection, operations, dry_run)
+    logger.info(f"{collection}: {updated} documents backfilled, {skipped} without a derivable location")
+    return {"updated": updated, "skipped": skipped}
+
+
+async def seed_id_counters(db, dry_run: bool) -> dict:
+    """Raise each household/collector counter to the highest sequence already used in its location."""
+    highest = {}
+    async for doc in db.households_col.find({}, {"_id": 1}):
+        location = household_location(doc["_id"])
+        if location:
+            key = location_counter_id("household", location)
+            highest[key] = max(highest.get(key, 0), id_suffix(doc["_id"], "-"))
+    async for doc in db["users"].find({"username": {"$regex": "^Collector_"}}, {"username": 1}):
+        parts = doc["username"].split("_")
+        if len(parts) >= 3:
+            key = location_counter_id("collector", "_".join(parts[1:-1]))
+            highest[key] = max(highest.get(key, 0), id_suffix(doc["username"], "_"))
+
+    if highest and not dry_run:
+        await db["counters"].bulk_write([
+            UpdateOne({"_id": key}, {"$max": {"sequence_value": value}}, upsert=True)
+            for key, value in highest.items()
+        ], ordered=False)
+    logger.info(f"Seeded {len(highest)} location ID counters")
+    return highest
+
+
+async def _flush(db, collection: str, operations: list, dry_run: bool) -> int:
+    if dry_run:
+        return len(operations)
+    result = await db[collection].bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def run(batch_size: int, dry_run: bool) -> dict:
+    await connect_to_mongo(ensure_indexes=False)
+    try:
+        db = get_database()
+        report = {}
+        for collection, source in BACKFILL_SOURCES.items():
+            report[collection] = await backfill_collection(db, collection, source, batch_size, dry_run)
+        report["counters"] = await seed_id_counters(db, dry_run)
+        if not dry_run:
+            await pending_repo.recount()
+        return report
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Backfill the denormalized location fields and ID counters")
+    parser.add_argument("--batch-size", type=int, default=1000, help="Updates per bulk_write")
+    parser.add_argument("--dry-run", action="store_true", help="Count the documents without writing")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.batch_size, args.dry_run))
+    logger.info(f"[OK] Backfill finished: {report}")
+
+
+if __name__ == "__main__":
+    main()
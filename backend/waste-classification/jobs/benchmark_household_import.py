@@ -0,0 +1,131 @@
+"""
+Throughput benchmark for the bulk household import (services/household_import.py).
+
+Generates a synthetic onboarding CSV (12 weeks per waste type per household),
+imports it into a scratch database next to the configured one for each chunk
+size, and reports households/s and the time spent parsing, validating and
+writing. A baseline imports a sample the way POST /create_user does (one
+insert per document) for comparison. The scratch database is dropped
+afterwards unless --keep is given.
+
+Usage:
+  python jobs/benchmark_household_import.py --households 20000
+  python jobs/benchmark_household_import.py --households 5000 --chunk-sizes 100 500 2000
+"""
+import argparse
+import asyncio
+import io
+import json
+import logging
+import random
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import pandas as pd
+
+from core.config import get_settings
+from core.database import create_mongo_client
+from services.household_import import HouseholdImporter, WASTE_TYPES, MIN_WEEKS, parse_csv, validate, build_documents
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+def synthetic_csv(households: int, prefix: str = "bench") -> bytes:
+    rng = random.Random(42)
+    rows = []
+    for i in range(households):
+        hid = f"HH-{prefix}-{i + 1:05d}"
+        for wtype in WASTE_TYPES:
+            for week in range(1, MIN_WEEKS + 1):
+                rows.append((hid, f"{hid.lower()}@example.com", rng.choice(["Low", "Middle", "High"]), hid,
+                             wtype, 2025, week, round(rng.uniform(0, 6), 2)))
+    frame = pd.DataFrame(rows, columns=["household_id", "email", "income_tier", "qr_code",
+                                        "waste_type", "year", "week", "weight_kg"])
+    buffer = io.StringIO()
+    frame.to_csv(buffer, index=False)
+    return buffer.getvalue().encode()
+
+
+async def per_document_baseline(database, data: bytes, sample: int) -> dict:
+    """Insert `sample` households one document at a time, as /create_user does."""
+    rows, _, _ = validate(parse_csv(data))
+    keys = rows["_key"].drop_duplicates().head(sample)
+    rows = rows[rows["_key"].isin(keys)]
+    households, histories = build_documents(rows, {key: f"{key}-single" for key in keys}, datetime.utcnow())
+    started = time.perf_counter()
+    for household in households:
+        await database.households_col.insert_one({**household, "linked_email": f"single-{household['linked_email']}"})
+        for doc in histories[household["_id"]]:
+            await database.history_col.insert_one(doc)
+    elapsed = time.perf_counter() - started
+    return {"households": len(households), "households_per_second": round(len(households) / elapsed, 1)}
+
+
+async def run(households: int, chunk_sizes: list, baseline_sample: int, keep: bool) -> dict:
+    settings = get_settings()
+    client = create_mongo_client()
+    db_name = f"{settings.mongodb_db_name}_import_bench"
+    database = client[db_name]
+
+    started = time.perf_counter()
+    data = synthetic_csv(households)
+    logger.info(f"Generated {households} households ({len(data) / (1024 * 1024):.1f} MB) "
+                f"in {time.perf_counter() - started:.2f} s")
+
+    results = []
+    try:
+        for chunk_size in chunk_sizes:
+            await client.drop_database(db_name)
+            started = time.perf_counter()
+            frame = parse_csv(data)
+            parse_ms = round((time.perf_counter() - started) * 1000, 1)
+            report = await HouseholdImporter(chunk_size=chunk_size, database=database).run(frame)
+            row = {"chunk_size": chunk_size, "imported": report["imported"], "chunks": report["chunks"],
+                   "transactions": report["transactions"], "parse_ms": parse_ms, **report["timings_ms"],
+                   "households_per_second": report["households_per_second"]}
+            results.append(row)
+            logger.info(f"chunk_size={chunk_size}: {report['imported']} households in {report['chunks']} chunks, "
+                        f"{report['households_per_second']} households/s (parse {parse_ms} ms, "
+                        f"validate {report['timings_ms'].get('validate_ms')} ms, "
+                        f"write {report['timings_ms'].get('write_ms')} ms)")
+
+        baseline = None
+        if baseline_sample:
+            baseline = await per_document_baseline(database, data, baseline_sample)
+            logger.info(f"Per-document baseline: {baseline['households_per_second']} households/s "
+                        f"({baseline['households']} households)")
+        return {"households": households, "runs": results, "per_document_baseline": baseline}
+    finally:
+        if not keep:
+            await client.drop_database(db_name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure bulk household import throughput")
+    parser.add_argument("--households", type=int, default=20000, help="Synthetic households to import")
+    parser.add_argument("--chunk-sizes", type=int, nargs="+", default=[100, 500, 2000],
+                        help="Households per insert_many/transaction to compare")
+    parser.add_argument("--baseline-sample", type=int, default=200,
+                        help="Households to insert one document at a time for comparison (0 to skip)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database for inspection")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.households, args.chunk_sizes, args.baseline_sample, args.keep))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, default=str))
+        logger.info(f"[OK] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
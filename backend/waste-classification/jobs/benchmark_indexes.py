@@ -0,0 +1,119 @@
+"""
+Seeded benchmark for the index registry (core/indexes.py).
+
+Creates a scratch database next to the configured one, seeds every hot
+collection with synthetic documents, explains each hot query with
+executionStats before and after ensure_indexes, and prints the plan change
+(COLLSCAN -> IXSCAN) with docs examined and execution time. The scratch
+database is dropped afterwards unless --keep is given.
+
+Usage:
+  python jobs/benchmark_indexes.py --households 2000
+"""
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.config import get_settings
+from core.database import create_mongo_client
+from core.constants import OVERFLOW_BIN_IDS, overflow_collection
+from core.indexes import ensure_indexes, explain_hot_queries
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+WASTE_TYPES = ["organic", "recyclable", "non_recyclable"]
+STATUSES = ["REVIEW", "DENIED", "VERIFIED"]
+
+
+def seed_documents(households: int, weeks: int) -> dict:
+    rng = random.Random(42)
+    now = datetime.utcnow()
+    ids = [f"H{i:05d}" for i in range(households)] + ["H001"]
+    docs = {name: [] for name in ["history_col", "pending_col", "bills", "users", "households_col",
+                                  "complaints", "waste_prices"]}
+
+    for hid in ids:
+        docs["households_col"].append({"_id": hid, "linked_email": f"{hid.lower()}@example.com"})
+        docs["users"].append({"email": f"{hid.lower()}@example.com", "username": f"user_{hid}"})
+        for wtype in WASTE_TYPES:
+            docs["history_col"].append({"household_id": hid, "waste_type": wtype, "format": 2,
+                                        "years": [now.year] * 4, "week_numbers": [1, 2, 3, 4],
+                                        "weights": [1.0] * 4})
+            for week in range(1, weeks + 1):
+                docs["pending_col"].append({"household_id": hid, "waste_type": wtype, "year": now.year,
+                                            "week": week, "status": rng.choice(STATUSES), "weight_kg": 1.0,
+                                            "submitted_at": now - timedelta(days=rng.randint(0, 365))})
+                docs["bills"].append({"household_id": hid, "waste_type": wtype, "year": now.year, "week": week,
+                                      "status": rng.choice(["PAID", "UNPAID"]), "final_bill": 10.0,
+                                      "created_at": now - timedelta(days=rng.randint(0, 365))})
+
+    docs["complaints"] = [{"createdAt": now - timedelta(hours=rng.randint(0, 24 * 90)),
+                           "wardId": f"W{rng.randint(1, 50)}"} for _ in range(households * 5)]
+    docs["waste_prices"] = [{"waste_type": f"type_{i}", "unit_price": 1.0} for i in range(200)] + \
+                           [{"waste_type": w, "unit_price": 1.0} for w in WASTE_TYPES]
+    readings = [{"recorded_at": now - timedelta(minutes=15 * i), "volume": rng.random()}
+                for i in range(households * 10)]
+    for bin_id in OVERFLOW_BIN_IDS:
+        docs[overflow_collection(bin_id)] = [dict(r) for r in readings]
+    return docs
+
+
+async def run(households: int, weeks: int, keep: bool) -> dict:
+    settings = get_settings()
+    client = create_mongo_client()
+    db_name = f"{settings.mongodb_db_name}_index_bench"
+    database = client[db_name]
+    try:
+        await client.drop_database(db_name)
+        for collection, docs in seed_documents(households, weeks).items():
+            for start in range(0, len(docs), 5000):
+                await database[collection].insert_many(docs[start:start + 5000], ordered=False)
+            logger.info(f"Seeded {collection}: {len(docs)} documents")
+
+        before = await explain_hot_queries(database, verbosity="executionStats")
+        await ensure_indexes(database)
+        after = await explain_hot_queries(database, verbosity="executionStats")
+
+        rows = []
+        for b, a in zip(before, after):
+            rows.append({"collection": b["collection"], "filter": b.get("filter"),
+                         "before": {k: b.get(k) for k in ("stages", "docs_examined", "execution_ms")},
+                         "after": {k: a.get(k) for k in ("stages", "docs_examined", "execution_ms")}})
+            logger.info(f"{b['collection']} {b.get('filter')}: "
+                        f"{'>'.join(b.get('stages') or [])} ({b.get('docs_examined')} docs, {b.get('execution_ms')} ms) -> "
+                        f"{'>'.join(a.get('stages') or [])} ({a.get('docs_examined')} docs, {a.get('execution_ms')} ms)")
+        return {"households": households, "weeks": weeks, "queries": rows}
+    finally:
+        if not keep:
+            await client.drop_database(db_name)
+        client.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Show hot query plans before and after the index registry")
+    parser.add_argument("--households", type=int, default=2000, help="Synthetic households to seed")
+    parser.add_argument("--weeks", type=int, default=12, help="Weeks of pending reviews and bills per household")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch database for inspection")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args.households, args.weeks, args.keep))
+    if args.output:
+        args.output.write_text(json.dumps(results, indent=2, default=str))
+        logger.info(f"[OK] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,104 @@
+"""
+Bytes transferred per route: full-document reads vs the repository projections.
+
+For each route touched by the repository layer, runs the query the handler used
+to issue (full documents) and the projected/aggregated replacement against the
+configured database, and reports the BSON size of what came back. Read-only.
+
+Usage:
+  python jobs/benchmark_projections.py --user-id <users._id> --household-id HH-Colombo-01 \
+      --waste-type Organic
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import bson
+from bson import ObjectId
+
+from core.database import connect_to_mongo, close_mongo_connection, get_database
+from repositories import users_repo, prices_repo, households_repo, history_repo
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+PROFILE_WASTE_TYPES = ["Organic", "Recyclable", "Inorganic"]
+
+
+def bson_size(*results) -> int:
+    """Encoded size of the documents a query returned (None counts as 0)."""
+    total = 0
+    for result in results:
+        docs = result if isinstance(result, list) else [result]
+        total += sum(len(bson.encode(doc)) for doc in docs if isinstance(doc, dict))
+    return total
+
+
+async def measure(user_id: str, household_id: str, waste_type: str) -> dict:
+    db = get_database()
+    routes = {}
+
+    if user_id:
+        full = await db["users"].find_one({"_id": ObjectId(user_id)})
+        routes["dispose/tips (user profile)"] = (bson_size(full), bson_size(await users_repo.get_tip_profile(user_id)))
+        routes["user/{id} (get_user_by_id)"] = (bson_size(full), bson_size(await users_repo.get_profile(user_id)))
+
+    full_price = await db.waste_prices.find_one({"waste_type": waste_type})
+    routes["forecast/{household_id}/{waste_type} (price)"] = (
+        bson_size(full_price), bson_size(await prices_repo.get_price(waste_type)))
+    routes["get_price/{waste_type}"] = (
+        bson_size(full_price), bson_size(await prices_repo.get_price_details(waste_type)))
+
+    if household_id:
+        full_household = await db.households_col.find_one({"_id": household_id})
+        full_history = [await db.history_col.find_one({"household_id": household_id, "waste_type": w})
+                        for w in PROFILE_WASTE_TYPES]
+        projected_household = await households_repo.get(household_id)
+        averages = await history_repo.average_weights(household_id, PROFILE_WASTE_TYPES)
+        routes["household/profile_extended/{household_id}"] = (
+            bson_size(full_household, full_history), bson_size(projected_household, averages))
+
+    report = {}
+    for route, (before, after) in routes.items():
+        report[route] = {
+            "full_bytes": before,
+            "projected_bytes": after,
+            "saved_pct": round(100 * (1 - after / before), 1) if before else 0.0,
+        }
+        logger.info(f"{route}: {before} -> {after} bytes")
+    return report
+
+
+async def run(args) -> dict:
+    await connect_to_mongo(ensure_indexes=False)
+    try:
+        return await measure(args.user_id, args.household_id, args.waste_type)
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare bytes transferred with and without projections")
+    parser.add_argument("--user-id", help="users._id (ObjectId) for the user profile routes")
+    parser.add_argument("--household-id", help="households_col._id for the household routes")
+    parser.add_argument("--waste-type", default="Organic", help="waste_prices.waste_type to read")
+    parser.add_argument("--output", type=Path, help="Write the results as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args))
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2))
+        logger.info(f"[OK] Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""
+Run scheduled jobs once per cluster instead of once per worker.
+
+Every uvicorn worker starts its own AsyncIOScheduler (jobs/schedular.py), so
+each cron fire happens in every worker. cluster_job() wraps a job so that only
+the worker holding the job's lease in `job_locks` runs it; the others skip. The
+lease is renewed while the job runs and left in place afterwards until it
+expires, which covers workers whose scheduler fires a little later. Each run is
+recorded in `job_runs` (owner, start, duration, status, error) and served by
+GET /health/jobs.
+"""
+import asyncio
+import logging
+import os
+import socket
+import time
+from datetime import datetime, timedelta, timezone
+from functools import wraps
+from typing import Any, Awaitable, Callable
+
+from pymongo import ASCENDING, DESCENDING
+from pymongo.errors import DuplicateKeyError
+
+from core.config import get_settings
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+JOB_LOCKS_COLLECTION = "job_locks"
+JOB_RUNS_COLLECTION = "job_runs"
+OWNER_ID = f"{socket.gethostname()}:{os.getpid()}"
+
+
+async def acquire_lease(job_id: str, lease_seconds: float) -> bool:
+    """Take the job's lease if it is free or expired. Exactly one concurrent caller wins."""
+    now = datetime.now(timezone.utc)
+    try:
+        # an unexpired lease does not match, so the upsert collides on _id and loses
+        await get_database()[JOB_LOCKS_COLLECTION].update_one(
+            {"_id": job_id, "expires_at": {"$lte": now}},
+            {"$set": {"owner": OWNER_ID, "acquired_at": now,
+                      "expires_at": now + timedelta(seconds=lease_seconds)}},
+            upsert=True
+        )
+        return True
+    except DuplicateKeyError:
+        return False
+
+
+async def renew_lease(job_id: str, lease_seconds: float) -> None:
+    await get_database()[JOB_LOCKS_COLLECTION].update_one(
+        {"_id": job_id, "owner": OWNER_ID},
+        {"$set": {"expires_at": datetime.now(timezone.utc) + timedelta(seconds=lease_seconds)}}
+    )
+
+
+async def _keep_lease(job_id: str, lease_seconds: float) -> None:
+    while True:
+        await asyncio.sleep(lease_seconds / 3)
+        try:
+            await renew_lease(job_id, lease_seconds)
+        except Exception as e:
+            logger.warning(f"Could not renew lease for job {job_id}: {str(e)}")
+
+
+def _summary(result: Any) -> Any:
+    """Keep run history small: store scalars and dicts, describe anything else by type."""
+    if result is None or isinstance(result, (bool, int, float, str, dict)):
+        return result
+    return type(result).__name__
+
+
+def cluster_job(job_id: str, func: Callable[..., Awaitable[Any]], lease_seconds: float = None):
+    """Wrap an async job for the scheduler so it runs on one worker per fire and is recorded."""
+    lease_seconds = lease_seconds or get_settings().job_lease_seconds
+
+    @wraps(func)
+    async def run(*args, **kwargs):
+        try:
+            if not await acquire_lease(job_id, lease_seconds):
+                logger.info(f"Job {job_id} is running on another worker, skipping")
+                return None
+        except Exception as e:
+            logger.error(f"Could not acquire lease for job {job_id}, skipping: {str(e)}")
+            return None
+
+        runs = get_database()[JOB_RUNS_COLLECTION]
+        started_at = datetime.now(timezone.utc)
+        started = time.perf_counter()
+        run_id = (await runs.insert_one({
+            "job_id": job_id, "owner": OWNER_ID, "status": "running", "started_at": started_at
+        })).inserted_id
+        heartbeat = asyncio.create_task(_keep_lease(job_id, lease_seconds))
+        update = {"status": "cancelled"}
+        try:
+            result = await func(*args, **kwargs)
+            update = {"status": "success", "result": _summary(result)}
+            return result
+        except Exception as e:
+            update = {"status": "failed", "error": str(e)}
+            logger.error(f"Job {job_id} failed: {str(e)}")
+            raise
+        finally:
+            heartbeat.cancel()
+            duration_ms = round((time.perf_counter() - started) * 1000, 1)
+            await runs.update_one({"_id": run_id}, {"$set": {
+                **update, "finished_at": datetime.now(timezone.utc), "duration_ms": duration_ms
+            }})
+            logger.info(f"Job {job_id} {update['status']} in {duration_ms} ms")
+
+    return run
+
+
+async def ensure_indexes() -> None:
+    runs = get_database()[JOB_RUNS_COLLECTION]
+    await runs.create_index([("job_id", ASCENDING), ("started_at", DESCENDING)], name="job_started_at")
+    await runs.create_index(
+        [("started_at", ASCENDING)], name="started_at_ttl",
+        expireAfterSeconds=get_settings().job_run_retention_days * 24 * 3600
+    )
+
+
+async def job_report(runs_per_job: int = 10) -> dict:
+    """Current leases and the latest runs of every job, newest first."""
+    db = get_database()
+    locks = await db[JOB_LOCKS_COLLECTION].find({}).to_list(length=None)
+    job_ids = await db[JOB_RUNS_COLLECTION].distinct("job_id")
+    runs = {}
+    for job_id in sorted(job_ids):
+        runs[job_id] = await db[JOB_RUNS_COLLECTION].find(
+            {"job_id": job_id}, {"_id": 0, "job_id": 0}
+        ).sort("started_at", DESCENDING).limit(runs_per_job).to_list(length=runs_per_job)
+    return {"owner": OWNER_ID, "locks": locks, "runs": runs}
@@ -0,0 +1,90 @@
+"""
+Remove duplicate monthly rewards so the unique rewards index can be built.
+
+The old per-worker scheduler distributed rewards with a check-then-insert, so a
+(household_id, year, month) can have several rewards, and the
+household_year_month_unique index in core/indexes.py cannot be created until
+they are gone. Per duplicated key one reward is kept: a USED one if any (it is
+referenced by a bill), otherwise the oldest. Extra AVAILABLE rewards are
+deleted; extra USED ones keep their bill reference but have `month` moved to
+`duplicate_month`, which takes them out of the (partial) unique index. Restart
+the API afterwards (or let the next startup) create the index. Safe to re-run.
+
+Usage:
+  python jobs/dedupe_rewards.py
+  python jobs/dedupe_rewards.py --dry-run
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pymongo import DeleteOne, UpdateOne
+
+from core.database import connect_to_mongo, close_mongo_connection, get_database
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def dedupe(dry_run: bool) -> dict:
+    db = get_database()
+    operations, keys = [], 0
+    cursor = db.rewards.aggregate([
+        {"$match": {"month": {"$exists": True}}},
+        {"$sort": {"created_at": 1, "_id": 1}},
+        {"$group": {
+            "_id": {"household_id": "$household_id", "year": "$year", "month": "$month"},
+            "rewards": {"$push": {"_id": "$_id", "status": "$status"}},
+            "n": {"$sum": 1},
+        }},
+        {"$match": {"n": {"$gt": 1}}},
+    ], allowDiskUse=True)
+    async for group in cursor:
+        keys += 1
+        rewards = group["rewards"]
+        keep = next((r for r in rewards if r.get("status") == "USED"), rewards[0])
+        for reward in rewards:
+            if reward is keep:
+                continue
+            if reward.get("status") == "USED":
+                operations.append(UpdateOne({"_id": reward["_id"]}, {
+                    "$set": {"duplicate_month": group["_id"]["month"]}, "$unset": {"month": ""}
+                }))
+            else:
+                operations.append(DeleteOne({"_id": reward["_id"], "status": {"$ne": "USED"}}))
+
+    deleted = sum(isinstance(op, DeleteOne) for op in operations)
+    if operations and not dry_run:
+        await db.rewards.bulk_write(operations, ordered=False)
+    logger.info(f"rewards: {keys} duplicated household/months, {deleted} extra rewards deleted, "
+                f"{len(operations) - deleted} extra used rewards set aside")
+    return {"duplicated_keys": keys, "deleted": deleted, "set_aside": len(operations) - deleted}
+
+
+async def run(dry_run: bool) -> dict:
+    await connect_to_mongo(ensure_indexes=False)
+    try:
+        return await dedupe(dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Remove duplicate monthly rewards before the unique index")
+    parser.add_argument("--dry-run", action="store_true", help="Count the duplicates without writing")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.dry_run))
+    logger.info(f"[OK] Reward dedupe finished: {report}")
+
+
+if __name__ == "__main__":
+    main()
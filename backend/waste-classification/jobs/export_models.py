@@ -0,0 +1,275 @@
+"""
+Export CPU-optimised variants of the waste classification models.
+
+Produces, next to each .keras file in model/:
+  <name>_dynamic.tflite  - dynamic-range quantized weights
+  <name>_int8.tflite     - full int8 (activations calibrated on a representative set)
+
+Then evaluates every backend against the float Keras model on a held-out set
+(accuracy and top-1 agreement) and benchmarks single-sample latency and memory.
+The "keras" (tf.function) vs "keras_predict" rows show the per-call overhead
+model.predict adds. Results are written to model/export_report.json.
+
+Usage:
+  python jobs/export_models.py --calibration-dir data/calib \
+      --holdout-dir data/holdout --text-holdout data/text_holdout.csv
+  python jobs/export_models.py --skip-export --synthetic-samples 64   # latency only
+
+Image directories are laid out as <dir>/<waste_type>/*.jpg (waste_type as in
+core.constants.WasteType); the text CSV has `description,waste_type` columns.
+Select the backend at runtime with CLASSIFIER_BACKEND=keras|tflite|tflite_int8.
+"""
+import argparse
+import json
+import logging
+import os
+import resource
+import sys
+import time
+from datetime import datetime
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+os.environ['TF_CPP_MIN_LOG_LEVEL'] = '3'
+import numpy as np
+import pandas as pd
+import tensorflow as tf
+from PIL import Image
+
+from core.constants import IMAGE_CLASS_MAPPING, TEXT_CLASS_MAPPING
+from services.inference import BACKENDS, load_backend, tflite_path
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+MODEL_DIR = Path(__file__).parent.parent / "model"
+IMAGE_MODEL_PATH = MODEL_DIR / "waste_model_three.keras"
+TEXT_MODEL_PATH = MODEL_DIR / "model_functional_text.keras"
+WEIGHT_MODEL_DIR = MODEL_DIR / "weight_model"
+REPORT_PATH = MODEL_DIR / "export_report.json"
+IMAGE_EXTENSIONS = {".jpg", ".jpeg", ".png", ".webp", ".bmp"}
+MAX_CALIBRATION_SAMPLES = 300
+
+
+# ---------------------------------------------------------------------------
+# Data loading
+# ---------------------------------------------------------------------------
+
+def load_image_array(path: Path, input_size: tuple) -> np.ndarray:
+    """Same preprocessing as WasteClassifier._preprocess_image, without the batch axis."""
+    pil_image = Image.open(path)
+    if pil_image.mode != 'RGB':
+        pil_image = pil_image.convert('RGB')
+    pil_image = pil_image.resize(input_size, Image.Resampling.LANCZOS)
+    return np.array(pil_image, dtype=np.float32)
+
+
+def load_image_dir(root: Path, input_size: tuple, limit: int = None):
+    """Return (X, y) for <root>/<waste_type>/*.ext; y is the CNN class index or -1 if unmapped."""
+    label_index = {wt.value: idx for idx, wt in IMAGE_CLASS_MAPPING.items()}
+    xs, ys = [], []
+    for class_dir in sorted(p for p in root.iterdir() if p.is_dir()):
+        for path in sorted(class_dir.iterdir()):
+            if path.suffix.lower() not in IMAGE_EXTENSIONS:
+                continue
+            xs.append(load_image_array(path, input_size))
+            ys.append(label_index.get(class_dir.name.lower(), -1))
+            if limit and len(xs) >= limit:
+                return np.stack(xs), np.array(ys)
+    if not xs:
+        raise ValueError(f"No images found under {root}")
+    return np.stack(xs), np.array(ys)
+
+
+def load_text_csv(path: Path, embedder):
+    """Return (embeddings, y) for a description,waste_type CSV."""
+    label_index = {wt.value: idx for idx, wt in TEXT_CLASS_MAPPING.items()}
+    df = pd.read_csv(path)
+    descriptions = [" ".join(str(d).lower().split()) for d in df["description"]]
+    embeddings = embedder(descriptions).numpy()
+    labels = np.array([label_index.get(str(w).lower(), -1) for w in df.get("waste_type", [])] or [-1] * len(df))
+    return embeddings, labels
+
+
+# ---------------------------------------------------------------------------
+# Conversion
+# ---------------------------------------------------------------------------
+
+def convert_dynamic(model) -> bytes:
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+    return converter.convert()
+
+
+def convert_int8(model, calibration: np.ndarray) -> bytes:
+    converter = tf.lite.TFLiteConverter.from_keras_model(model)
+    converter.optimizations = [tf.lite.Optimize.DEFAULT]
+
+    def representative_dataset():
+        for sample in calibration[:MAX_CALIBRATION_SAMPLES]:
+            yield [sample[np.newaxis].astype(np.float32)]
+
+    converter.representative_dataset = representative_dataset
+    converter.target_spec.supported_ops = [tf.lite.OpsSet.TFLITE_BUILTINS_INT8]
+    # Inputs/outputs stay float32 so the service preprocessing is unchanged
+    return converter.convert()
+
+
+def export_model(keras_path: Path, calibration) -> list:
+    logger.info(f"[Export] {keras_path.name}")
+    model = tf.keras.models.load_model(str(keras_path))
+    written = []
+
+    path = tflite_path(keras_path, "tflite")
+    path.write_bytes(convert_dynamic(model))
+    written.append(path)
+    logger.info(f"   dynamic-range -> {path.name} ({path.stat().st_size / 1e6:.1f} MB)")
+
+    if calibration is None:
+        logger.warning("   No calibration data; skipping int8 export")
+    else:
+        path = tflite_path(keras_path, "tflite_int8")
+        path.write_bytes(convert_int8(model, calibration))
+        written.append(path)
+        logger.info(f"   int8 -> {path.name} ({path.stat().st_size / 1e6:.1f} MB)")
+    return written
+
+
+# ---------------------------------------------------------------------------
+# Parity report and benchmark
+# ---------------------------------------------------------------------------
+
+def max_rss_mb() -> float:
+    # ru_maxrss is KiB on Linux
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def parity(reference: np.ndarray, candidate: np.ndarray, labels: np.ndarray) -> dict:
+    ref_top1 = reference.argmax(axis=1)
+    cand_top1 = candidate.argmax(axis=1)
+    labelled = labels >= 0
+    report = {
+        "samples": int(len(labels)),
+        "top1_agreement": round(float((ref_top1 == cand_top1).mean()), 4),
+        "max_abs_output_diff": round(float(np.abs(reference - candidate).max()), 5),
+    }
+    if labelled.any():
+        report["accuracy"] = round(float((cand_top1[labelled] == labels[labelled]).mean()), 4)
+        report["reference_accuracy"] = round(float((ref_top1[labelled] == labels[labelled]).mean()), 4)
+    return report
+
+
+def benchmark(backend, sample: np.ndarray, runs: int) -> dict:
+    backend.predict(sample)  # warm-up
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        backend.predict(sample)
+        timings.append((time.perf_counter() - start) * 1000)
+    timings = np.array(timings)
+    return {
+        "runs": runs,
+        "p50_ms": round(float(np.percentile(timings, 50)), 3),
+        "p95_ms": round(float(np.percentile(timings, 95)), 3),
+        "mean_ms": round(float(timings.mean()), 3),
+    }
+
+
+def evaluate(keras_path: Path, X: np.ndarray, y: np.ndarray, runs: int) -> dict:
+    results = {}
+    reference = None
+    for name in BACKENDS:
+        if name.startswith("tflite") and not tflite_path(keras_path, name).exists():
+            continue
+        rss_before = max_rss_mb()
+        start = time.perf_counter()
+        backend = load_backend(keras_path, name)
+        load_s = time.perf_counter() - start
+
+        outputs = np.concatenate([backend.predict(X[i:i + 32]) for i in range(0, len(X), 32)])
+        if reference is None:
+            reference = outputs
+
+        file_path = tflite_path(keras_path, name) if name.startswith("tflite") else keras_path
+        results[name] = {
+            "file_mb": round(file_path.stat().st_size / 1e6, 2),
+            "load_s": round(load_s, 3),
+            "peak_rss_growth_mb": round(max_rss_mb() - rss_before, 1),
+            "parity": parity(reference, outputs, y),
+            "latency_single_sample": benchmark(backend, X[:1], runs),
+        }
+        logger.info(f"   {name}: {results[name]}")
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export and evaluate TFLite variants of the waste models")
+    parser.add_argument("--calibration-dir", type=Path, help="Images for int8 calibration (<dir>/<waste_type>/*)")
+    parser.add_argument("--holdout-dir", type=Path, help="Held-out images for the parity report")
+    parser.add_argument("--text-calibration", type=Path, help="CSV of descriptions for text int8 calibration")
+    parser.add_argument("--text-holdout", type=Path, help="Held-out description,waste_type CSV")
+    parser.add_argument("--runs", type=int, default=200, help="Benchmark iterations per backend")
+    parser.add_argument("--synthetic-samples", type=int, default=0,
+                        help="Benchmark on random inputs (also the weight LSTMs) when no held-out set is given")
+    parser.add_argument("--skip-export", action="store_true", help="Only evaluate existing exports")
+    args = parser.parse_args()
+
+    report = {"generated_at": datetime.utcnow().isoformat(), "models": {}}
+
+    image_model = tf.keras.models.load_model(str(IMAGE_MODEL_PATH))
+    input_size = (image_model.input_shape[1], image_model.input_shape[2])
+    del image_model
+
+    embedder = None
+    if args.text_calibration or args.text_holdout:
+        import tensorflow_hub as hub
+        embedder = hub.load("https://tfhub.dev/google/universal-sentence-encoder/4")
+
+    if not args.skip_export:
+        calibration = None
+        if args.calibration_dir:
+            calibration, _ = load_image_dir(args.calibration_dir, input_size, MAX_CALIBRATION_SAMPLES)
+        export_model(IMAGE_MODEL_PATH, calibration)
+
+        text_calibration = None
+        if args.text_calibration:
+            text_calibration, _ = load_text_csv(args.text_calibration, embedder)
+        export_model(TEXT_MODEL_PATH, text_calibration)
+
+    if args.holdout_dir:
+        logger.info("[Evaluate] image model")
+        X, y = load_image_dir(args.holdout_dir, input_size)
+        report["models"][IMAGE_MODEL_PATH.name] = evaluate(IMAGE_MODEL_PATH, X, y, args.runs)
+
+    if args.text_holdout:
+        logger.info("[Evaluate] text model")
+        X, y = load_text_csv(args.text_holdout, embedder)
+        report["models"][TEXT_MODEL_PATH.name] = evaluate(TEXT_MODEL_PATH, X, y, args.runs)
+
+    if args.synthetic_samples:
+        rng = np.random.default_rng(42)
+        synthetic_targets = [(IMAGE_MODEL_PATH, lambda shape: rng.uniform(0, 255, shape))]
+        synthetic_targets += [(TEXT_MODEL_PATH, lambda shape: rng.normal(0, 0.05, shape))]
+        synthetic_targets += [(p, lambda shape: rng.normal(0, 1, shape))
+                              for p in sorted(WEIGHT_MODEL_DIR.glob("*_lstm_model.keras"))]
+        for keras_path, sampler in synthetic_targets:
+            key = f"{keras_path.name} (synthetic)"
+            if keras_path.name in report["models"] or not keras_path.exists():
+                continue
+            logger.info(f"[Evaluate] {key}")
+            input_shape = tf.keras.models.load_model(str(keras_path)).input_shape
+            X = sampler((args.synthetic_samples,) + tuple(input_shape[1:])).astype(np.float32)
+            y = np.full(args.synthetic_samples, -1)
+            report["models"][key] = evaluate(keras_path, X, y, args.runs)
+
+    REPORT_PATH.write_text(json.dumps(report, indent=2))
+    logger.info(f"[OK] Report written to {REPORT_PATH}")
+
+
+if __name__ == "__main__":
+    main()
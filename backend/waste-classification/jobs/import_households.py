@@ -0,0 +1,63 @@
+"""
+Bulk-import households from a CSV or NDJSON onboarding file.
+
+The CLI counterpart of POST /households/import (services/household_import.py):
+validates every row, rejects households with bad or incomplete data, and writes
+the rest in chunks with one transaction per chunk. Rejected households are
+listed with their reason; --report writes the full result as JSON.
+
+Usage:
+  python jobs/import_households.py onboarding.csv
+  python jobs/import_households.py households.ndjson --chunk-size 1000
+  python jobs/import_households.py onboarding.csv --dry-run --report report.json
+"""
+import argparse
+import asyncio
+import json
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.database import connect_to_mongo, close_mongo_connection
+from services.household_import import HouseholdImporter, parse, detect_format
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def run(path: Path, fmt: str, chunk_size: int, dry_run: bool) -> dict:
+    frame = parse(path.read_bytes(), fmt or detect_format(path.name))
+    await connect_to_mongo(ensure_indexes=False)
+    try:
+        return await HouseholdImporter(chunk_size=chunk_size).run(frame, dry_run=dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Bulk-import households from a CSV or NDJSON file")
+    parser.add_argument("path", type=Path, help="Onboarding file")
+    parser.add_argument("--format", choices=["csv", "ndjson"], help="Defaults to the file extension")
+    parser.add_argument("--chunk-size", type=int, default=500, help="Households per insert_many/transaction")
+    parser.add_argument("--dry-run", action="store_true", help="Validate without writing")
+    parser.add_argument("--report", type=Path, help="Write the full result as JSON")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.path, args.format, args.chunk_size, args.dry_run))
+    for rejection in report["rejected"]:
+        logger.warning(f"Rejected {rejection['household']}: {rejection['reason']}")
+    if args.report:
+        args.report.write_text(json.dumps(report, indent=2, default=str))
+        logger.info(f"[OK] Report written to {args.report}")
+    logger.info(f"[OK] {report['imported']} imported, {report['rejected_count']} rejected "
+                f"({report['households_per_second']} households/s)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,88 @@
+"""
+Convert `history_col` documents from the per-week `weeks` layout to arrays.
+
+Old documents keep one dict per week with stored lag/rolling/behaviour fields;
+the current layout (services/household_history.py) keeps only the parallel
+`years`, `week_numbers` and `weights` arrays and derives the rest on read.
+Readers accept both layouts, so this can run while the API is serving. Each
+document is rewritten with a filter on its original `weeks`, so one that was
+updated in between is left for the next run. Safe to re-run.
+
+Usage:
+  python jobs/migrate_history_arrays.py --batch-size 500
+  python jobs/migrate_history_arrays.py --dry-run
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from pymongo import UpdateOne
+
+from core.database import connect_to_mongo, close_mongo_connection, get_database
+from services.household_history import HouseholdHistory
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def migrate(batch_size: int, dry_run: bool) -> dict:
+    db = get_database()
+    converted, skipped = 0, 0
+    cursor = db.history_col.find({"weeks": {"$exists": True}}).batch_size(batch_size)
+    operations = []
+    async for doc in cursor:
+        try:
+            history = HouseholdHistory.from_document(doc)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Skipping history {doc['_id']} ({doc.get('household_id')}): {str(e)}")
+            skipped += 1
+            continue
+        operations.append(UpdateOne(
+            {"_id": doc["_id"], "weeks": doc["weeks"]},
+            {"$set": history.to_document(), "$unset": {"weeks": ""}}
+        ))
+        if len(operations) >= batch_size:
+            converted += await _flush(db, operations, dry_run)
+            operations = []
+    if operations:
+        converted += await _flush(db, operations, dry_run)
+    remaining = await db.history_col.count_documents({"weeks": {"$exists": True}})
+    logger.info(f"history_col: {converted} documents converted, {skipped} skipped, {remaining} still in old layout")
+    return {"converted": converted, "skipped": skipped, "remaining": remaining}
+
+
+async def _flush(db, operations: list, dry_run: bool) -> int:
+    if dry_run:
+        return len(operations)
+    result = await db.history_col.bulk_write(operations, ordered=False)
+    return result.modified_count
+
+
+async def run(batch_size: int, dry_run: bool) -> dict:
+    await connect_to_mongo(ensure_indexes=False)
+    try:
+        return await migrate(batch_size, dry_run)
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert history_col documents to the array layout")
+    parser.add_argument("--batch-size", type=int, default=500, help="Updates per bulk_write")
+    parser.add_argument("--dry-run", action="store_true", help="Count the documents without writing")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.batch_size, args.dry_run))
+    logger.info(f"[OK] History migration finished: {report}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from core.config import get_settings
+from core.constants import WasteType
+from core.database import get_database
+from services.workflow_cache import workflow_key
+from jobs.cluster import cluster_job
+
+logger = logging.getLogger(__name__)
+
+
+def _tip_data(tip: dict) -> dict:
+    """The tip in the shape the classifier builds workflow prompts and cache keys from."""
+    return {"tip_id": tip["_id"], "title": tip.get("title", ""), "description": tip.get("description", "")}
+
+
+async def prewarm_tip_workflows(classifier) -> int:
+    """
+    Generate LLM workflows for every tip in the `tips` collection that has no
+    cached workflow yet, so tip requests are served without a Groq round-trip.
+    Returns the number of workflows generated.
+    """
+    if not classifier.llm:
+        logger.warning("LLM not configured, skipping workflow prewarm")
+        return 0
+
+    db = get_database()
+    tips = await db["tips"].find(
+        {}, {"_id": 1, "waste_type": 1, "technique": 1, "title": 1, "description": 1}
+    ).to_list(length=None)
+
+    keys = {workflow_key(t.get("waste_type"), t.get("technique"), _tip_data(t)): t for t in tips}
+    cached = await classifier.workflow_cache.cached_keys(keys.keys())
+    missing = [t for key, t in keys.items() if key not in cached]
+    logger.info(f"Workflow prewarm: {len(tips)} tips, {len(missing)} without a cached workflow")
+
+    semaphore = asyncio.Semaphore(get_settings().workflow_prewarm_concurrency)
+
+    async def generate(tip: dict) -> bool:
+        try:
+            waste_type = WasteType(tip.get("waste_type"))
+        except ValueError:
+            return False
+        async with semaphore:
+            # already known to be uncached; going through get_tip_from_llm would count a miss
+            return bool(await classifier.generate_workflow(waste_type, tip.get("technique"), _tip_data(tip)))
+
+    results = await asyncio.gather(*(generate(t) for t in missing))
+    generated = sum(results)
+    logger.info(f"Workflow prewarm complete: generated {generated}/{len(missing)}")
+    return generated
+
+
+def setup_workflow_prewarm_scheduler(scheduler: AsyncIOScheduler, classifier):
+    """
+    Prewarm tip workflows shortly after startup and then nightly at 3:00 AM,
+    picking up tips added during the day.
+    """
+    scheduler.add_job(
+        cluster_job("prewarm_tip_workflows", prewarm_tip_workflows),
+        CronTrigger(hour="3", minute="0", second="0"),
+        args=[classifier],
+        id="prewarm_tip_workflows",
+        name="Prewarm LLM tip workflows",
+        replace_existing=True,
+        next_run_time=datetime.now() + timedelta(seconds=30),
+    )
+    logger.info("📅 Tip workflow prewarm scheduled: startup + daily at 3:00 AM")
@@ -0,0 +1,51 @@
+"""
+Rebuild the materialized leaderboards from the PAID bills.
+
+Recomputes every weekly and monthly entry in `leaderboards` with $merge (see
+services/leaderboard.py) and removes entries no longer backed by paid bills.
+Run after a deploy that changes the leaderboard shape, after bulk bill edits,
+or whenever the incremental updates are suspected to have drifted.
+
+Usage:
+  python jobs/rebuild_leaderboards.py
+  python jobs/rebuild_leaderboards.py --year 2025
+"""
+import argparse
+import asyncio
+import logging
+import sys
+from pathlib import Path
+
+# Add parent directory to path for imports
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from core.database import connect_to_mongo, close_mongo_connection
+from services.leaderboard import leaderboard
+
+logging.basicConfig(
+    level=logging.INFO,
+    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+)
+logger = logging.getLogger(__name__)
+
+
+async def run(year) -> dict:
+    await connect_to_mongo(ensure_indexes=False)
+    try:
+        await leaderboard.ensure_indexes()
+        return await leaderboard.rebuild(year)
+    finally:
+        await close_mongo_connection()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Rebuild the materialized leaderboards from PAID bills")
+    parser.add_argument("--year", type=int, help="Only rebuild this year's entries")
+    args = parser.parse_args()
+
+    report = asyncio.run(run(args.year))
+    logger.info(f"[OK] Leaderboards rebuilt: {report}")
+
+
+if __name__ == "__main__":
+    main()
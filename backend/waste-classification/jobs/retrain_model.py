@@ -11,7 +11,6 @@ sys.path.insert(0, str(Path(__file__).parent.parent))
 import numpy as np
 import pandas as pd
 import joblib
-from motor.motor_asyncio import AsyncIOMotorClient
 
 # Configure logging
 LOG_DIR = Path(__file__).parent.parent / "logs"
@@ -34,25 +33,15 @@ MIN_SAMPLES_FOR_TRAINING = 14
 DATA_LOOKBACK_DAYS = 60
 
 
-async def get_settings():
-    """Load settings from config"""
-    from core.config import get_settings as _get_settings
-    return _get_settings()
-
-
-async def fetch_training_data(settings, bin_id: str) -> list:
+async def fetch_training_data(db, bin_id: str) -> list:
     """Fetch bin volume data from MongoDB for the given bin_id (uses collection bin_volumes_{bin_id})."""
     from core.constants import overflow_collection
-    logger.info("[Data] Connecting to MongoDB...")
-    client = AsyncIOMotorClient(settings.mongodb_url)
-    db = client[settings.mongodb_db_name]
     coll_name = overflow_collection(bin_id)
     cutoff_date = datetime.utcnow() - timedelta(days=DATA_LOOKBACK_DAYS)
     cursor = db[coll_name].find(
         {"recorded_at": {"$gte": cutoff_date}}
     ).sort("recorded_at", 1)
     data = await cursor.to_list(length=None)
-    client.close()
     logger.info(f"Fetched {len(data)} records for {bin_id} from last {DATA_LOOKBACK_DAYS} days")
     return data
 
@@ -243,9 +232,9 @@ def save_model(model, feature_cols: list, metrics: dict, samples_used: int, bin_
                 logger.warning(f"[Save] Could not remove {old}: {e}")
 
 
-async def train_one_bin(settings, bin_id: str) -> bool:
+async def train_one_bin(db, bin_id: str) -> bool:
     """Train and save model for one bin. Returns True if successful."""
-    data = await fetch_training_data(settings, bin_id)
+    data = await fetch_training_data(db, bin_id)
     if len(data) < MIN_SAMPLES_FOR_TRAINING:
         logger.warning(
             f"[Warning] Not enough data for {bin_id}. Need {MIN_SAMPLES_FOR_TRAINING}, got {len(data)}. Skipping."
@@ -265,6 +254,7 @@ async def train_one_bin(settings, bin_id: str) -> bool:
 async def main():
     """Main retraining pipeline: train one model per bin (5 bins)."""
     from core.constants import OVERFLOW_BIN_IDS
+    from core.database import connect_to_mongo, close_mongo_connection, get_database
     start_time = datetime.utcnow()
     logger.info("=" * 60)
     logger.info("[Start] Starting Bin Overflow Prediction Model Retraining (all bins)")
@@ -272,11 +262,14 @@ async def main():
     logger.info(f"   Time: {start_time.isoformat()}")
     logger.info("=" * 60)
     try:
-        settings = await get_settings()
+        # One pooled client for every bin instead of a new connection per bin
+        logger.info("[Data] Connecting to MongoDB...")
+        await connect_to_mongo(ensure_indexes=False)
+        db = get_database()
         trained = 0
         for bin_id in OVERFLOW_BIN_IDS:
             logger.info(f"--- Training bin_id={bin_id} ---")
-            if await train_one_bin(settings, bin_id):
+            if await train_one_bin(db, bin_id):
                 trained += 1
         duration = (datetime.utcnow() - start_time).total_seconds()
         logger.info("=" * 60)
@@ -285,6 +278,8 @@ async def main():
     except Exception as e:
         logger.error(f"[Error] Retraining failed: {str(e)}", exc_info=True)
         raise
+    finally:
+        await close_mongo_connection()
 
 
 if __name__ == "__main__":
@@ -6,6 +6,7 @@ from datetime import datetime
 from pathlib import Path
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.cron import CronTrigger
+from jobs.cluster import cluster_job
 
 logger = logging.getLogger(__name__)
 
@@ -82,7 +83,7 @@ def setup_retraining_scheduler(scheduler: AsyncIOScheduler):
     This allows a full week of data collection before retraining.
     """
     scheduler.add_job(
-        trigger_model_retraining,
+        cluster_job("retrain_bin_overflow_model", trigger_model_retraining),
         CronTrigger(
             day_of_week="sun",  # Every Sunday
             hour="2",           # At 2:00 AM
@@ -0,0 +1,43 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
+from apscheduler.triggers.cron import CronTrigger
+from jobs.cluster import cluster_job
+from services.leaderboard import leaderboard
+from services.rewards import get_reward_rates, distribute_monthly_rewards
+
+logger = logging.getLogger(__name__)
+
+
+async def distribute_last_month_rewards() -> dict:
+    """Distribute the previous month's leaderboard rewards with the configured rates."""
+    today = datetime.now(timezone.utc)
+    target = today.replace(day=1) - timedelta(days=1)
+    rates = await get_reward_rates()
+    issued = await distribute_monthly_rewards(
+        target.year, target.month, [rates["rank1_pct"], rates["rank2_pct"], rates["rank3_pct"]]
+    )
+    return {"year": target.year, "month": target.month, "issued": issued}
+
+
+def setup_reward_scheduler(scheduler: AsyncIOScheduler):
+    """
+    Monthly reward distribution (1st of the month, 00:01) and a nightly
+    leaderboard rebuild (03:30) that repairs any drift in the incremental
+    updates. Both run once per cluster.
+    """
+    scheduler.add_job(
+        cluster_job("monthly_reward_distribution", distribute_last_month_rewards),
+        CronTrigger(day="1", hour="0", minute="1", second="0"),
+        id="monthly_reward_distribution",
+        name="Distribute last month's leaderboard rewards",
+        replace_existing=True,
+    )
+    scheduler.add_job(
+        cluster_job("rebuild_leaderboards", leaderboard.rebuild),
+        CronTrigger(hour="3", minute="30", second="0"),
+        id="rebuild_leaderboards",
+        name="Rebuild materialized leaderboards",
+        replace_existing=True,
+    )
+    logger.info("📅 Reward distribution scheduled: 1st of every month at 00:01; leaderboard rebuild daily at 3:30 AM")
@@ -5,6 +5,7 @@ from datetime import datetime
 from services.classifier import WasteClassifier
 from core.database import get_database
 from core.constants import OVERFLOW_BIN_IDS, overflow_collection
+from jobs.cluster import cluster_job
 
 logger = logging.getLogger(__name__)
 
@@ -28,7 +29,7 @@ async def setup_schedular():
     scheduler = AsyncIOScheduler()
     for bin_id in OVERFLOW_BIN_IDS:
         scheduler.add_job(
-            save_bin_volume,
+            cluster_job(f"get_bin_volume_{bin_id}", save_bin_volume),
             CronTrigger(hour="18", minute="17", second="0"),
             args=[bin_id],
             id=f"get_bin_volume_{bin_id}",
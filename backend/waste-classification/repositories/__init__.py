@@ -0,0 +1,25 @@
+"""
+Repository layer - one module per MongoDB collection with explicit projections,
+so handlers fetch only the fields they use.
+"""
+from .users import UserRepository, users_repo
+from .waste_prices import WastePriceRepository, prices_repo
+from .households import HouseholdRepository, households_repo
+from .history import HistoryRepository, history_repo
+from .bills import BillRepository, bills_repo
+from .pending import PendingRepository, pending_repo
+
+__all__ = [
+    'UserRepository',
+    'users_repo',
+    'WastePriceRepository',
+    'prices_repo',
+    'HouseholdRepository',
+    'households_repo',
+    'HistoryRepository',
+    'history_repo',
+    'BillRepository',
+    'bills_repo',
+    'PendingRepository',
+    'pending_repo'
+]
@@ -0,0 +1,104 @@
+import base64
+import logging
+from datetime import datetime
+from typing import AsyncIterator, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from core.constants import normalize_location
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+# ISO-8601 in UTC with milliseconds, the precision BSON dates are stored at
+DATE_FORMAT = "%Y-%m-%dT%H:%M:%S.%LZ"
+BILL_LIST_FIELDS = [
+    "household_id", "waste_type", "weight_kg", "year", "week", "base_cost", "penalty_amount",
+    "discount_amount", "reward_deduction", "final_bill", "status", "payment_method", "adjustment_reason",
+]
+EXPORT_BATCH_SIZE = 1000
+
+
+def _format_date(field: str) -> dict:
+    return {"$cond": [{"$eq": [{"$type": f"${field}"}, "date"]},
+                      {"$dateToString": {"format": DATE_FORMAT, "date": f"${field}"}},
+                      f"${field}"]}
+
+
+# Bills as the API returns them: ids and dates are converted by the server
+BILL_LIST_PROJECTION = {
+    "_id": {"$toString": "$_id"},
+    "submission_id": {"$toString": "$submission_id"},
+    **{field: 1 for field in BILL_LIST_FIELDS},
+    "created_at": _format_date("created_at"),
+    "paid_at": _format_date("paid_at"),
+}
+
+
+def encode_cursor(bill: dict) -> str:
+    """Cursor after a projected bill: its formatted created_at and string _id."""
+    raw = f"{bill['created_at']}|{bill['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Raises ValueError for anything encode_cursor could not have produced."""
+    try:
+        created_at, _id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.strptime(created_at, "%Y-%m-%dT%H:%M:%S.%fZ"), ObjectId(_id)
+    except (ValueError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class BillRepository:
+    """Queries on the `bills` collection."""
+
+    @property
+    def collection(self):
+        return get_database().bills
+
+    async def page(self, query: dict, limit: int = 50,
+                   cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """
+        One keyset page of projected bills, newest first by (created_at, _id).
+        Returns the page and the cursor for the next one (None on the last page).
+        """
+        match = dict(query)
+        if cursor:
+            before_at, before_id = decode_cursor(cursor)
+            match["$or"] = [
+                {"created_at": {"$lt": before_at}},
+                {"created_at": before_at, "_id": {"$lt": before_id}},
+            ]
+        bills = await self.collection.aggregate([
+            {"$match": match},
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {"$limit": limit + 1},
+            {"$project": BILL_LIST_PROJECTION},
+        ]).to_list(length=limit + 1)
+        next_cursor = encode_cursor(bills[limit - 1]) if len(bills) > limit else None
+        return bills[:limit], next_cursor
+
+    async def recent_for_household(self, household_id: str, limit: int = 50,
+                                   cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Latest bills first (served by the household_id, created_at, _id index)."""
+        return await self.page({"household_id": household_id}, limit, cursor)
+
+    async def unpaid_for_location(self, location: str, limit: int = 200,
+                                  cursor: Optional[str] = None) -> Tuple[List[dict], Optional[str]]:
+        """Latest UNPAID bills of a ward (served by the status, location, created_at, _id index)."""
+        return await self.page({"status": "UNPAID", "location": normalize_location(location)}, limit, cursor)
+
+    async def stream(self, query: dict) -> AsyncIterator[dict]:
+        """Every matching projected bill, newest first, fetched in EXPORT_BATCH_SIZE batches."""
+        cursor = self.collection.aggregate([
+            {"$match": query},
+            {"$sort": {"created_at": -1, "_id": -1}},
+            {"$project": BILL_LIST_PROJECTION},
+        ], batchSize=EXPORT_BATCH_SIZE)
+        async for bill in cursor:
+            yield bill
+
+
+bills_repo = BillRepository()
@@ -0,0 +1,71 @@
+import logging
+from typing import Dict, Iterable, List
+
+from core.database import get_database
+from services.household_history import HouseholdHistory, HISTORY_PROJECTION
+
+logger = logging.getLogger(__name__)
+
+
+class HistoryRepository:
+    """
+    Queries on the `history_col` collection (one document per household and
+    waste type, weekly weights as parallel arrays; see services/household_history.py).
+    """
+
+    @property
+    def collection(self):
+        return get_database().history_col
+
+    async def get_history(self, household_id: str, waste_type: str) -> HouseholdHistory:
+        record = await self.collection.find_one(
+            {"household_id": household_id, "waste_type": waste_type},
+            {"_id": 0, **HISTORY_PROJECTION}
+        )
+        return HouseholdHistory.from_document(record)
+
+    async def get_histories(self, household_id: str, waste_types: Iterable[str]) -> Dict[str, HouseholdHistory]:
+        """Histories for several waste types in one query; types without history map to an empty one."""
+        waste_types = list(waste_types)
+        cursor = self.collection.find(
+            {"household_id": household_id, "waste_type": {"$in": waste_types}},
+            {"_id": 0, "waste_type": 1, **HISTORY_PROJECTION}
+        )
+        result = {wtype: HouseholdHistory() for wtype in waste_types}
+        async for record in cursor:
+            result[record["waste_type"]] = HouseholdHistory.from_document(record)
+        return result
+
+    async def get_weeks(self, household_id: str, waste_type: str) -> List[dict]:
+        """Weeks in the API's per-week layout, derived fields included."""
+        return (await self.get_history(household_id, waste_type)).entries(waste_type)
+
+    async def get_weeks_by_type(self, household_id: str, waste_types: Iterable[str]) -> Dict[str, List[dict]]:
+        histories = await self.get_histories(household_id, waste_types)
+        return {wtype: history.entries(wtype) for wtype, history in histories.items()}
+
+    async def save(self, household_id: str, waste_type: str, history: HouseholdHistory,
+                   upsert: bool = False, session=None) -> None:
+        """Replace the stored weeks with `history`, dropping the legacy `weeks` layout."""
+        await self.collection.update_one(
+            {"household_id": household_id, "waste_type": waste_type},
+            {"$set": history.to_document(), "$unset": {"weeks": ""}},
+            upsert=upsert, session=session
+        )
+
+    async def average_weights(self, household_id: str, waste_types: Iterable[str]) -> Dict[str, float]:
+        """Mean weekly weight per waste type, computed server-side; 0.0 without history."""
+        waste_types = list(waste_types)
+        pipeline = [
+            {"$match": {"household_id": household_id, "waste_type": {"$in": waste_types}}},
+            {"$project": {"_id": 0, "waste_type": 1,
+                          "avg": {"$avg": {"$ifNull": ["$weights", "$weeks.weight_kg"]}}}},
+        ]
+        averages = {wtype: 0.0 for wtype in waste_types}
+        async for row in self.collection.aggregate(pipeline):
+            if row.get("avg") is not None:
+                averages[row["waste_type"]] = round(row["avg"], 2)
+        return averages
+
+
+history_repo = HistoryRepository()
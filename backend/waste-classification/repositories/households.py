@@ -0,0 +1,45 @@
+import logging
+from typing import Iterable, Optional, Set, Tuple
+
+from core.constants import normalize_location, id_suffix
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+PROFILE_FIELDS = ("linked_email", "income_tier", "qr_code")
+
+
+class HouseholdRepository:
+    """Queries on the `households_col` collection."""
+
+    @property
+    def collection(self):
+        return get_database().households_col
+
+    async def exists(self, household_id: str) -> bool:
+        return await self.collection.find_one({"_id": household_id}, {"_id": 1}) is not None
+
+    async def get(self, household_id: str, fields: Iterable[str] = PROFILE_FIELDS) -> Optional[dict]:
+        return await self.collection.find_one({"_id": household_id}, {field: 1 for field in fields})
+
+    async def taken(self, household_ids: Iterable[str], emails: Iterable[str],
+                    database=None) -> Tuple[Set[str], Set[str]]:
+        """Which of the household IDs and linked emails already exist (for batch onboarding)."""
+        collection = database.households_col if database is not None else self.collection
+        cursor = collection.find(
+            {"$or": [{"_id": {"$in": list(household_ids)}}, {"linked_email": {"$in": list(emails)}}]},
+            {"_id": 1, "linked_email": 1}
+        )
+        ids, linked = set(), set()
+        async for doc in cursor:
+            ids.add(doc["_id"])
+            linked.add(doc.get("linked_email"))
+        return ids, linked
+
+    async def max_sequence(self, location: str) -> int:
+        """Highest HH-<location>-<seq> sequence in use in a location (0 if none)."""
+        cursor = self.collection.find({"location": normalize_location(location)}, {"_id": 1})
+        return max([id_suffix(doc["_id"], "-") async for doc in cursor], default=0)
+
+
+households_repo = HouseholdRepository()
@@ -0,0 +1,136 @@
+import base64
+import logging
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from bson import ObjectId
+from bson.errors import InvalidId
+
+from core.constants import normalize_location
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+# counters document holding the REVIEW queue size, in total and per location
+PENDING_COUNTER_ID = "pending_reviews"
+# A VERIFYING claim older than this belongs to a reviewer that died mid-write
+STALE_CLAIM_MINUTES = 15
+REVIEW_ITEM_PROJECTION = {
+    "household_id": 1, "waste_type": 1, "weight_kg": 1, "week": 1, "year": 1,
+    "status": 1, "submitted_at": 1, "location": 1, "is_auto_filled": 1
+}
+
+
+def encode_cursor(doc: dict) -> str:
+    raw = f"{doc['submitted_at'].isoformat()}|{doc['_id']}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_cursor(cursor: str) -> Tuple[datetime, ObjectId]:
+    """Raises ValueError for anything encode_cursor could not have produced."""
+    try:
+        submitted_at, _id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(submitted_at), ObjectId(_id)
+    except (ValueError, InvalidId) as e:
+        raise ValueError(f"Invalid cursor: {cursor}") from e
+
+
+class PendingRepository:
+    """Queries on `pending_col` (weight submissions awaiting collector review)."""
+
+    @property
+    def collection(self):
+        return get_database().pending_col
+
+    async def review_page(self, statuses: Iterable[str] = ("REVIEW",), location: Optional[str] = None,
+                          household_id: Optional[str] = None, waste_type: Optional[str] = None,
+                          limit: int = 100, cursor: Optional[str] = None,
+                          newest_first: bool = False) -> Tuple[List[dict], Optional[str]]:
+        """
+        One keyset page ordered by (submitted_at, _id). Returns the page and the
+        cursor for the next one (None on the last page).
+        """
+        query = {"status": {"$in": list(statuses)}}
+        if location:
+            query["location"] = normalize_location(location)
+        if household_id:
+            query["household_id"] = household_id
+        if waste_type:
+            query["waste_type"] = waste_type
+        if cursor:
+            after_at, after_id = decode_cursor(cursor)
+            op = "$lt" if newest_first else "$gt"
+            query["$or"] = [
+                {"submitted_at": {op: after_at}},
+                {"submitted_at": after_at, "_id": {op: after_id}},
+            ]
+        direction = -1 if newest_first else 1
+        docs = await self.collection.find(query, REVIEW_ITEM_PROJECTION) \
+            .sort([("submitted_at", direction), ("_id", direction)]) \
+            .limit(limit + 1).to_list(length=limit + 1)
+        next_cursor = encode_cursor(docs[limit - 1]) if len(docs) > limit else None
+        return docs[:limit], next_cursor
+
+    async def adjust_review_count(self, deltas: Dict[Optional[str], int], session=None) -> None:
+        """Apply {location: delta} to the REVIEW counter; None counts towards the total only."""
+        total = sum(deltas.values())
+        inc = {f"by_location.{loc}": n for loc, n in deltas.items() if loc and n}
+        if total:
+            inc["total"] = total
+        if inc:
+            await get_database()["counters"].update_one(
+                {"_id": PENDING_COUNTER_ID}, {"$inc": inc}, upsert=True, session=session
+            )
+
+    async def review_count(self, location: Optional[str] = None) -> int:
+        doc = await get_database()["counters"].find_one({"_id": PENDING_COUNTER_ID})
+        if not doc:
+            return 0
+        if location:
+            return int(doc.get("by_location", {}).get(normalize_location(location), 0))
+        return int(doc.get("total", 0))
+
+    async def release_claims(self, ids: Optional[List[ObjectId]] = None,
+                             claimed_before: Optional[datetime] = None) -> int:
+        """
+        Put VERIFYING submissions back to the status they were claimed from
+        (REVIEW when unknown), either by id or by claim age.
+        """
+        query = {"status": "VERIFYING"}
+        if ids is not None:
+            query["_id"] = {"$in": ids}
+        if claimed_before is not None:
+            query["$or"] = [{"verifying_at": {"$lt": claimed_before}}, {"verifying_at": {"$exists": False}}]
+        result = await self.collection.update_many(query, [
+            {"$set": {"status": {"$ifNull": ["$claimed_status", "REVIEW"]}}},
+            {"$unset": ["claimed_status", "verifying_at"]},
+        ])
+        return result.modified_count
+
+    async def recount(self) -> int:
+        """
+        Rebuild the REVIEW counter from the collection (repairs drift; uses the
+        status index), after releasing VERIFYING claims left by crashed reviewers.
+        """
+        released = await self.release_claims(
+            claimed_before=datetime.utcnow() - timedelta(minutes=STALE_CLAIM_MINUTES))
+        if released:
+            logger.warning(f"Released {released} submissions stuck in VERIFYING")
+        by_location = {}
+        async for row in self.collection.aggregate([
+            {"$match": {"status": "REVIEW"}},
+            {"$group": {"_id": "$location", "n": {"$sum": 1}}}
+        ]):
+            by_location[row["_id"]] = row["n"]
+        total = sum(by_location.values())
+        await get_database()["counters"].replace_one(
+            {"_id": PENDING_COUNTER_ID},
+            {"total": total, "by_location": {k: v for k, v in by_location.items() if k},
+             "recounted_at": datetime.utcnow()},
+            upsert=True
+        )
+        logger.info(f"Pending review counter rebuilt: {total} in review")
+        return total
+
+
+pending_repo = PendingRepository()
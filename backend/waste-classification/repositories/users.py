@@ -0,0 +1,68 @@
+import logging
+from typing import Optional, TypedDict
+
+from bson import ObjectId
+
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+# Everything except the password hash
+PROFILE_PROJECTION = {"hashed_password": 0}
+CREDENTIALS_PROJECTION = {"_id": 1, "hashed_password": 1}
+TIP_PROFILE_PROJECTION = {
+    "_id": 0,
+    "has_compost_bin": 1,
+    "has_recycling_bin": 1,
+    "has_weekly_collection": 1,
+    "household_size": 1,
+    "residence_type": 1,
+    "waste_amount": 1,
+}
+
+
+class TipProfile(TypedDict, total=False):
+    has_compost_bin: bool
+    has_recycling_bin: bool
+    has_weekly_collection: bool
+    household_size: str
+    residence_type: str
+    waste_amount: str
+
+
+class UserRepository:
+    """Queries on the `users` collection."""
+
+    @property
+    def collection(self):
+        return get_database()["users"]
+
+    @staticmethod
+    def _serialize(user: Optional[dict]) -> Optional[dict]:
+        if user:
+            user["id"] = str(user.pop("_id"))
+        return user
+
+    async def get_profile(self, user_id: str) -> Optional[dict]:
+        return self._serialize(await self.collection.find_one({"_id": ObjectId(user_id)}, PROFILE_PROJECTION))
+
+    async def get_profile_by_email(self, email: str) -> Optional[dict]:
+        return self._serialize(await self.collection.find_one({"email": email.lower()}, PROFILE_PROJECTION))
+
+    async def get_credentials(self, email: str) -> Optional[dict]:
+        """Just the _id and password hash, for login."""
+        return await self.collection.find_one({"email": email.lower()}, CREDENTIALS_PROJECTION)
+
+    async def email_exists(self, email: str) -> bool:
+        return await self.collection.find_one({"email": email.lower()}, {"_id": 1}) is not None
+
+    async def get_tip_profile(self, user_id: str) -> Optional[TipProfile]:
+        """The onboarding fields the technique model uses."""
+        return await self.collection.find_one({"_id": ObjectId(user_id)}, TIP_PROFILE_PROJECTION)
+
+    async def get_area(self, user_id: str) -> Optional[str]:
+        user = await self.collection.find_one({"_id": ObjectId(user_id)}, {"area": 1})
+        return user.get("area") if user else None
+
+
+users_repo = UserRepository()
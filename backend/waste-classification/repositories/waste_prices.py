@@ -0,0 +1,51 @@
+import logging
+from typing import Dict, Iterable, Optional, TypedDict
+
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+# Skips the per-week price `history` array, which grows with every price change
+PRICE_PROJECTION = {"_id": 0, "waste_type": 1, "current_base_price": 1, "base_price": 1}
+PRICE_DETAILS_PROJECTION = {"_id": 0, "waste_type": 1, "current_base_price": 1, "base_price": 1, "history": 1}
+
+
+class PriceFields(TypedDict, total=False):
+    waste_type: str
+    current_base_price: float
+    base_price: float
+
+
+class WastePriceRepository:
+    """Queries on the `waste_prices` collection."""
+
+    @property
+    def collection(self):
+        return get_database().waste_prices
+
+    async def get_price(self, waste_type: str) -> Optional[PriceFields]:
+        return await self.collection.find_one({"waste_type": waste_type}, PRICE_PROJECTION)
+
+    async def get_current_price(self, waste_type: str) -> float:
+        record = await self.get_price(waste_type)
+        return record.get("current_base_price", 0.0) if record else 0.0
+
+    async def get_current_prices(self, waste_types: Iterable[str]) -> Dict[str, float]:
+        """
+        current_base_price for several waste types in one query. Names are
+        matched exactly first, then case-insensitively (submissions and
+        price documents do not always agree on casing); 0.0 when unpriced.
+        """
+        waste_types = list(dict.fromkeys(waste_types))
+        variants = {v for w in waste_types for v in (w, w.strip(), w.strip().capitalize(), w.strip().title())}
+        cursor = self.collection.find({"waste_type": {"$in": list(variants)}}, PRICE_PROJECTION)
+        by_name = {doc["waste_type"]: doc.get("current_base_price", 0.0) async for doc in cursor}
+        by_lower = {name.strip().lower(): price for name, price in by_name.items()}
+        return {w: by_name.get(w, by_lower.get(w.strip().lower(), 0.0)) for w in waste_types}
+
+    async def get_price_details(self, waste_type: str) -> Optional[dict]:
+        """Price fields plus the price history, for the price history screen."""
+        return await self.collection.find_one({"waste_type": waste_type}, PRICE_DETAILS_PROJECTION)
+
+
+prices_repo = WastePriceRepository()
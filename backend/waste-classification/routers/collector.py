@@ -1,13 +1,11 @@
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Response
+from fastapi.responses import StreamingResponse
 from fastapi.security import OAuth2PasswordRequestForm
 from typing import List, Optional
-import copy
-import asyncio
+import json
 from bson import ObjectId
 from pydantic import BaseModel
-import re
-from datetime import datetime, timezone, timedelta
-from apscheduler.schedulers.background import BackgroundScheduler
+from datetime import datetime, timezone
 from schemas.collector_schema import (
     CreateUserRequest, Token, UnifiedForecastResponse,
     LeaderboardEntry, CardCreateRequest,
@@ -17,14 +15,20 @@ from schemas.collector_schema import (
 from services.tax_services import (
     get_password_hash,
     verify_password,
-    get_next_collector_id,
-    classify_behaviour
+    get_next_collector_id
 )
 from schemas.tax_schemas import SubmitWeightRequest, ReviewActionRequest, SetPriceRequest
+from schemas.tax_schemas import BulkReviewActionRequest, BulkReviewActionResponse, ReviewActionResult
+from services.review_service import review_service, ReviewError, DENIABLE_STATUSES
+from services.sequences import reserve_location_sequence
+from services.leaderboard import leaderboard, BILL_FIELDS
+from services.rewards import get_reward_rates, distribute_monthly_rewards
 from services.tax_services import tax_engine
-from routers.tax_routes import predict_weight_core, WASTE_TYPE_MAP
+from routers.tax_routes import predict_weight_matrix, WASTE_TYPE_MAP
 from schemas.tax_schemas import BillDetails, ForecastItem
 from core.database import get_database
+from repositories import households_repo, prices_repo, bills_repo, pending_repo, history_repo
+from core.constants import household_location, normalize_location, id_suffix
 
 router = APIRouter()
 
@@ -53,10 +57,13 @@ async def register_user(user: CreateUserRequest):
     user_doc = {
         "username": user.username,
         "location": user.location,
+        "location_key": normalize_location(user.location),
         "role": user.role,
         "hashed_password": hashed_password
     }
     await users_collection.insert_one(user_doc)
+    if user_doc["location_key"] and user.username.startswith("Collector_"):
+        await reserve_location_sequence("collector", user.location, id_suffix(user.username, "_"))
     return {"message": "User registered successfully", "username": user.username}
 
 
@@ -85,21 +92,12 @@ async def submit_weight(data: SubmitWeightRequest):
     if db is None:
         raise HTTPException(500, "Database connection not initialized")
 
-    history_record = await db.history_col.find_one({
-        "household_id": data.household_id,
-        "waste_type": data.waste_type
-    })
+    history = await history_repo.get_history(data.household_id, data.waste_type)
 
-
-    if not history_record or not history_record.get("weeks"):
+    if not len(history):
         target_year, target_week = datetime.now().year, 1
     else:
-        weeks = history_record["weeks"]
-        last_entry = sorted(weeks, key=lambda x: (x["year"], x["week"]))[-1]
-        if last_entry["week"] < 52:
-            target_week, target_year = last_entry["week"] + 1, last_entry["year"]
-        else:
-            target_week, target_year = 1, last_entry["year"] + 1
+        target_year, target_week = history.next_week()
 
     existing_pending = await db.pending_col.find_one({
         "household_id": data.household_id,
@@ -116,12 +114,14 @@ async def submit_weight(data: SubmitWeightRequest):
         )
         action, submission_id = "Updated", str(existing_pending["_id"])
     else:
+        location = household_location(data.household_id)
         new_submission = {
             "household_id": data.household_id, "waste_type": data.waste_type,
             "weight_kg": data.weight_kg, "year": target_year, "week": target_week,
-            "status": "REVIEW", "submitted_at": datetime.utcnow()
+            "status": "REVIEW", "location": location, "submitted_at": datetime.utcnow()
         }
         result = await db.pending_col.insert_one(new_submission)
+        await pending_repo.adjust_review_count({location: 1})
         action, submission_id = "Created", str(result.inserted_id)
 
     return {"message": f"Submission {action} successfully.", "submission_id": submission_id, "week": target_week,
@@ -133,7 +133,7 @@ async def get_price_details(waste_type: str):
     db = get_database()
     if db is None:
         raise HTTPException(500, "Database connection not initialized")
-    doc = await db.waste_prices.find_one({"waste_type": waste_type})
+    doc = await prices_repo.get_price_details(waste_type)
     if not doc:
         return {"waste_type": waste_type, "current_base_price": 0.0, "message": "No price history found"}
     return {
@@ -192,31 +192,24 @@ async def get_waste_forecast(
     if db is None:
         raise HTTPException(500, "Database connection not initialized")
 
-    user_profile = await db.households_col.find_one({"_id": household_id})
-    if not user_profile:
+    if not await households_repo.exists(household_id):
         raise HTTPException(404, "Household not found")
 
 
-    price_record = await db.waste_prices.find_one({"waste_type": waste_type})
-    base_rate = price_record.get("current_base_price", 0.0) if price_record else 0.0
+    base_rate = await prices_repo.get_current_price(waste_type)
 
 
-    history_doc = await db.history_col.find_one({
-        "household_id": household_id,
-        "waste_type": waste_type
-    })
-
-    if not history_doc or "weeks" not in history_doc:
+    history = await history_repo.get_history(household_id, waste_type)
+    if not len(history):
         raise HTTPException(404, "No history found")
 
-    all_weeks = sorted(history_doc["weeks"], key=lambda x: (x["year"], x["week"]))
-
-    simulation_window = copy.deepcopy(all_weeks[-12:])
+    recent_weeks = history.entries(waste_type)[-12:]
+    simulation_window = history.tail(12)
 
     history_results = []
 
 
-    for i, entry in enumerate(simulation_window):
+    for i, entry in enumerate(recent_weeks):
         actual_weight = entry.get("weight_kg", 0.0)
 
 
@@ -224,7 +217,7 @@ async def get_waste_forecast(
         r12 = entry.get("roll_12w", actual_weight)
 
 
-        lag1 = simulation_window[i - 1]["weight_kg"] if i > 0 else 0.0
+        lag1 = recent_weeks[i - 1]["weight_kg"] if i > 0 else 0.0
 
         bill_data = tax_engine.calculate_bill(
             weight=actual_weight,
@@ -241,7 +234,7 @@ async def get_waste_forecast(
 
 
         history_results.append(ForecastItem(
-            week_offset=- (len(simulation_window) - i),
+            week_offset=- (len(recent_weeks) - i),
             year=entry["year"],
             week=entry["week"],
             predicted_weight_kg=actual_weight,
@@ -252,31 +245,23 @@ async def get_waste_forecast(
     forecast_results = []
     model_key = WASTE_TYPE_MAP.get(waste_type)
 
-    curr_year = simulation_window[-1]["year"]
-    curr_week = simulation_window[-1]["week"]
+    curr_year, curr_week = simulation_window.last_week
 
     for i in range(1, horizon + 1):
 
-        vals = [x["weight_kg"] for x in simulation_window]
-        for idx, w in enumerate(simulation_window):
-            w["lag_1w"] = vals[idx - 1] if idx >= 1 else 0
-            w["lag_2w"] = vals[idx - 2] if idx >= 2 else 0
-            w["lag_4w"] = vals[idx - 4] if idx >= 4 else 0
-
-
         try:
-            predicted_val = predict_weight_core(model_key, simulation_window)
+            predicted_val = predict_weight_matrix(model_key, simulation_window.feature_matrix())
             predicted_val = max(0.0, round(predicted_val, 2))
         except:
             predicted_val = 0.0
 
 
-        future_vals = [w["weight_kg"] for w in simulation_window] + [predicted_val]
+        future_vals = simulation_window.weights.tolist() + [predicted_val]
         r4 = sum(future_vals[-4:]) / 4
         r12 = sum(future_vals[-12:]) / 12
 
 
-        lag1_for_calc = simulation_window[-1]["weight_kg"]
+        lag1_for_calc = float(simulation_window.weights[-1])
 
 
         bill_data = tax_engine.calculate_bill(
@@ -301,13 +286,7 @@ async def get_waste_forecast(
         ))
 
 
-        simulation_window.append({
-            "year": curr_year,
-            "week": curr_week,
-            "weight_kg": predicted_val
-        })
-        if len(simulation_window) > 12:
-            simulation_window.pop(0)
+        simulation_window = simulation_window.append(curr_year, curr_week, predicted_val)
 
     return UnifiedForecastResponse(
         household_id=household_id,
@@ -331,125 +310,104 @@ async def process_review(data: ReviewActionRequest):
         raise HTTPException(400, "Invalid Submission ID format")
 
 
-    submission = await db.pending_col.find_one({"_id": obj_id})
+    submission = await db.pending_col.find_one({"_id": obj_id}, {"_id": 1})
     if not submission:
         raise HTTPException(404, "Submission not found")
 
 
     if data.action.upper() == "DENY":
-        await db.pending_col.update_one(
-            {"_id": obj_id},
-            {"$set": {"status": "DENIED", "reviewed_at": datetime.now(timezone.utc)}}
+        before = await db.pending_col.find_one_and_update(
+            {"_id": obj_id, "status": {"$in": DENIABLE_STATUSES}},
+            {"$set": {"status": "DENIED", "reviewed_at": datetime.now(timezone.utc)}},
+            projection={"status": 1, "location": 1}
         )
+        if before is None:
+            current = await db.pending_col.find_one({"_id": obj_id}, {"status": 1})
+            if current is None:
+                raise HTTPException(404, "Submission not found")
+            raise HTTPException(409, f"Submission already {current.get('status')}")
+        await pending_repo.adjust_review_count({before.get("location"): -1})
         return {"message": "Weight rejected.", "status": "DENIED"}
 
 
     elif data.action.upper() == "VERIFY":
-        household_id = submission["household_id"]
-        waste_type = submission["waste_type"]
-        weight_kg = submission["weight_kg"]
-
-
-        normalized_type = waste_type.strip().capitalize()
-        price_doc = await db.waste_prices.find_one({"waste_type": normalized_type})
-        base_rate = price_doc.get("current_base_price", 0.0) if price_doc else 0.0
-
-
-        history_record = await db.history_col.find_one({
-            "household_id": household_id,
-            "waste_type": waste_type
-        })
-        weeks = history_record.get("weeks", []) if history_record else []
-        lag1 = weeks[-1]["weight_kg"] if weeks else 0.0
-
-        all_weights = [w["weight_kg"] for w in weeks] + [weight_kg]
-        r4 = sum(all_weights[-4:]) / min(len(all_weights), 4)
-        r12 = sum(all_weights[-12:]) / min(len(all_weights), 12)
-
-        bill_calculation = tax_engine.calculate_bill(
-            weight=weight_kg,
-            category=waste_type,
-            r4=r4,
-            r12=r12,
-            lag1=lag1,
-            rate=base_rate
-        )
-
-
-        reward_credit = 0.0
-
-        reward = await db.rewards.find_one({
-            "household_id": household_id,
-            "status": "AVAILABLE"
-        })
-
-        if reward:
-            reward_credit = float(reward.get("amount", 0.0))
-
-            await db.rewards.update_one(
-                {"_id": reward["_id"]},
-                {"$set": {"status": "USED", "applied_to_bill": obj_id}}
-            )
-
-
-        base_cost = float(bill_calculation.get("base_cost", 0.0))
-        penalty_amount = float(bill_calculation.get("penalty_amount", 0.0))
-        discount_amount = float(bill_calculation.get("discount_amount", 0.0))
-        subtotal = float(bill_calculation.get("final_bill", 0.0))
-
-
-        final_amount = max(0.0, round(subtotal - reward_credit, 2))
-
+        # Parallel reads, one batched bill computation and a single transaction for the writes
+        try:
+            result = await review_service.verify(obj_id)
+        except ReviewError as e:
+            raise HTTPException(e.status_code, e.detail)
+        return {k: v for k, v in result.items() if k != "submission_id"}
 
-        new_entry = {
-            "year": int(submission.get("year", datetime.now().year)),
-            "week": int(submission.get("week", 1)),
-            "weight_kg": float(weight_kg),
-            "lag_1w": float(lag1),
-            "roll_4w": float(round(r4, 2)),
-            "roll_12w": float(round(r12, 2)),
-            "behaviour_class": classify_behaviour(waste_type, weight_kg)
-        }
-        await db.history_col.update_one(
-            {"household_id": household_id, "waste_type": waste_type},
-            {"$push": {"weeks": {"$each": [new_entry], "$slice": -12}}},
-            upsert=True
-        )
+    raise HTTPException(400, "Invalid Action")
 
 
-        bill_doc = {
-            "household_id": household_id,
-            "submission_id": obj_id,
-            "waste_type": waste_type,
-            "weight_kg": float(weight_kg),
-            "year": int(new_entry["year"]),
-            "week": int(new_entry["week"]),
-            "base_cost": base_cost,
-            "penalty_amount": penalty_amount,
-            "discount_amount": discount_amount,
-            "reward_deduction": float(reward_credit),
-            "final_bill": float(final_amount),
-            "status": "UNPAID",
-            "created_at": datetime.now(timezone.utc)
-        }
-        bill_result = await db.bills.insert_one(bill_doc)
 
+@router.post("/process_review_actions", response_model=BulkReviewActionResponse)
+async def process_review_actions(data: BulkReviewActionRequest):
+    """
+    Review many submissions in one call: all DENY actions with one update_many,
+    all VERIFY actions through the batched verification service.
+    """
+    db = get_database()
+    if db is None:
+        raise HTTPException(500, "Database connection failed")
 
-        await db.pending_col.update_one(
-            {"_id": obj_id},
-            {"$set": {"status": "VERIFIED", "reviewed_at": datetime.now(timezone.utc)}}
+    results, to_verify, to_deny = [], [], []
+    for item in data.actions:
+        action = item.action.upper()
+        try:
+            obj_id = ObjectId(item.submission_id)
+        except Exception:
+            results.append(ReviewActionResult(submission_id=item.submission_id, error="Invalid Submission ID format"))
+            continue
+        if action == "VERIFY":
+            to_verify.append(obj_id)
+        elif action == "DENY":
+            to_deny.append(obj_id)
+        else:
+            results.append(ReviewActionResult(submission_id=item.submission_id, error="Invalid Action"))
+
+    denied = 0
+    if to_deny:
+        # BSON dates keep milliseconds; truncate so the re-read below matches this batch's stamp exactly
+        now = datetime.now(timezone.utc)
+        now = now.replace(microsecond=now.microsecond // 1000 * 1000)
+        await db.pending_col.update_many(
+            {"_id": {"$in": to_deny}, "status": {"$in": DENIABLE_STATUSES}},
+            {"$set": {"status": "DENIED", "reviewed_at": now}}
         )
-
-        return {
-            "status": "VERIFIED",
-            "bill_id": str(bill_result.inserted_id),
-            "subtotal": subtotal,
-            "reward_applied": reward_credit,
-            "final_bill": final_amount
-        }
-
-    raise HTTPException(400, "Invalid Action")
-
+        # the documents this update flipped, for the counter; everything else is reported as is
+        modified = {doc["_id"]: doc async for doc in db.pending_col.find(
+            {"_id": {"$in": to_deny}, "status": "DENIED", "reviewed_at": now}, {"_id": 1, "location": 1})}
+        others = {doc["_id"]: doc async for doc in db.pending_col.find(
+            {"_id": {"$in": [i for i in to_deny if i not in modified]}}, {"_id": 1, "status": 1})}
+        deltas = {}
+        for doc in modified.values():
+            deltas[doc.get("location")] = deltas.get(doc.get("location"), 0) - 1
+        await pending_repo.adjust_review_count(deltas)
+        for obj_id in dict.fromkeys(to_deny):
+            if obj_id in modified:
+                denied += 1
+                results.append(ReviewActionResult(submission_id=str(obj_id), status="DENIED"))
+            elif obj_id in others:
+                results.append(ReviewActionResult(submission_id=str(obj_id),
+                                                  error=f"Submission already {others[obj_id].get('status')}"))
+            else:
+                results.append(ReviewActionResult(submission_id=str(obj_id), error="Submission not found"))
+
+    verified = 0
+    if to_verify:
+        try:
+            outcome = await review_service.verify_many(list(dict.fromkeys(to_verify)))
+        except Exception as e:
+            raise HTTPException(500, f"Verification failed: {str(e)}")
+        for result in outcome.values():
+            verified += "error" not in result
+            results.append(ReviewActionResult(**result))
+
+    return BulkReviewActionResponse(
+        verified=verified, denied=denied, failed=len(results) - verified - denied, results=results
+    )
 
 
 @router.post("/pay-bill/{bill_id}")
@@ -461,28 +419,41 @@ async def pay_bill(bill_id: str):
         raise HTTPException(400, "Invalid Bill ID")
 
 
-    result = await db.bills.update_one(
-        {"_id": obj_id},
-        {"$set": {"status": "PAID", "paid_at": datetime.now(timezone.utc)}}
+    bill = await db.bills.find_one_and_update(
+        {"_id": obj_id, "status": {"$ne": "PAID"}},
+        {"$set": {"status": "PAID", "paid_at": datetime.now(timezone.utc)}},
+        projection=BILL_FIELDS
     )
 
-    if result.matched_count == 0:
-        raise HTTPException(404, "Bill record not found")
+    if bill is None:
+        # already paid is still a successful payment; only a missing bill is an error
+        if not await db.bills.find_one({"_id": obj_id}, {"_id": 1}):
+            raise HTTPException(404, "Bill record not found")
+    else:
+        await leaderboard.record_paid([bill])
 
     return {"message": "Payment successful", "status": "PAID"}
 
 
 
-@router.get("/my-bills/{household_id}")
-async def get_user_bills(household_id: str):
-    db = get_database()
-    cursor = db.bills.find({"household_id": household_id}).sort("created_at", -1)
-    bills = await cursor.to_list(length=50)
+def _ndjson_export(bills, filename: str) -> StreamingResponse:
+    async def lines():
+        async for bill in bills:
+            yield json.dumps(bill) + "\n"
+    return StreamingResponse(lines(), media_type="application/x-ndjson",
+                             headers={"Content-Disposition": f'attachment; filename="{filename}"'})
 
-    for b in bills:
-        b["_id"] = str(b["_id"])
-        b["submission_id"] = str(b["submission_id"])
 
+@router.get("/my-bills/{household_id}")
+async def get_user_bills(household_id: str, response: Response, limit: int = Query(50, ge=1, le=500),
+                         cursor: Optional[str] = Query(None)):
+    """Newest bills first. When more exist, X-Next-Cursor holds the cursor for the next page."""
+    try:
+        bills, next_cursor = await bills_repo.recent_for_household(household_id, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return bills
 
 
@@ -498,15 +469,21 @@ async def pay_multiple_bills(data: dict):
 
         obj_ids = [ObjectId(bid) for bid in bill_ids]
 
-
+        # the batch tag identifies exactly the bills this request flipped to PAID
+        payment_batch = ObjectId()
         result = await db.bills.update_many(
-            {"_id": {"$in": obj_ids}},
+            {"_id": {"$in": obj_ids}, "status": {"$ne": "PAID"}},
             {"$set": {
                 "status": "PAID",
                 "paid_at": datetime.now(timezone.utc),
-                "payment_method": "Visa Simulation"
+                "payment_method": "Visa Simulation",
+                "payment_batch": payment_batch
             }}
         )
+        if result.modified_count:
+            paid = await db.bills.find({"_id": {"$in": obj_ids}, "payment_batch": payment_batch},
+                                       BILL_FIELDS).to_list(length=None)
+            await leaderboard.record_paid(paid)
 
         return {
             "message": f"Successfully paid {result.modified_count} bills",
@@ -520,118 +497,20 @@ async def pay_multiple_bills(data: dict):
 
 @router.get("/leaderboard/weekly")
 async def get_weekly_leaderboard(year: int = Query(...), week: int = Query(...)):
-    db = get_database()
-    pipeline = [
-        {"$match": {"status": "PAID", "year": year, "week": week}},
-        {
-            "$group": {
-                "_id": "$household_id",
-                "paid_types": {"$addToSet": "$waste_type"},
-                "total_paid": {"$sum": "$final_bill"},
-                "total_weight": {"$sum": "$weight_kg"},
-                "base_cost": {"$sum": "$base_cost"},
-                "penalty": {"$sum": "$penalty_amount"},
-                "discount": {"$sum": "$discount_amount"}
-            }
-        },
-        {"$match": {"$expr": {"$eq": [{"$size": "$paid_types"}, 3]}}},
-        {"$lookup": {"from": "households_col", "localField": "_id", "foreignField": "_id", "as": "profile"}},
-        {"$unwind": "$profile"},
-        {"$sort": {"total_paid": 1}},
-        {
-            "$project": {
-                "household_id": "$_id",
-                "household_name": "$profile.name",
-                "total_paid": {"$round": ["$total_paid", 2]},
-                "total_weight": {"$round": ["$total_weight", 2]},
-                "base_cost": {"$round": ["$base_cost", 2]},
-                "penalty_amount": {"$round": ["$penalty", 2]},
-                "discount_amount": {"$round": ["$discount", 2]},
-                "consistency": {"$literal": "3/3 Types"}
-            }
-        }
-    ]
-    results = await db.bills.aggregate(pipeline).to_list(length=50)
-    return [{"rank": i + 1, **item} for i, item in enumerate(results)]
+    return await leaderboard.weekly(year, week)
 
 
-from datetime import datetime, timedelta
-
-def get_weeks_for_month(year: int, month: int):
-
-    first_day = datetime(year, month, 1)
-    if month == 12:
-        last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
-    else:
-        last_day = datetime(year, month + 1, 1) - timedelta(days=1)
-
-    start_week = first_day.isocalendar()[1]
-    end_week = last_day.isocalendar()[1]
-
-    if end_week < start_week:
-        return list(range(start_week, 53)) + list(range(1, end_week + 1))
-
-    return list(range(start_week, end_week + 1))
-
 @router.get("/leaderboard/monthly")
 async def get_monthly_leaderboard(year: int, month: int):
-    db = get_database()
+    return await leaderboard.monthly(year, month)
 
-    target_weeks = get_weeks_for_month(year, month)
-    required_count = len(target_weeks) * 3
 
-    pipeline = [
-        {
-            "$match": {
-                "status": "PAID",
-                "year": year,
-                "week": {"$in": target_weeks}
-            }
-        },
-        {
-            "$group": {
-                "_id": "$household_id",
-                "unique_activities": {
-                    "$addToSet": {
-                        "$concat": [{"$toString": "$week"}, "-", "$waste_type"]
-                    }
-                },
-                "total_paid": {"$sum": "$final_bill"},
-                "total_weight": {"$sum": "$weight_kg"},
-                "base_cost": {"$sum": "$base_cost"},
-                "penalty_amount": {"$sum": "$penalty_amount"},
-                "discount_amount": {"$sum": "$discount_amount"}
-            }
-        },
-        {
-            "$addFields": {
-                "activity_count": {"$size": "$unique_activities"}
-            }
-        },
-        {"$match": {"activity_count": {"$gte": required_count}}},
-        {"$lookup": {
-            "from": "households_col",
-            "localField": "_id",
-            "foreignField": "_id",
-            "as": "profile"
-        }},
-        {"$unwind": "$profile"},
-        {"$sort": {"total_paid": 1}},
-        {"$project": {
-            "household_id": "$_id",
-            "household_name": "$profile.name",
-            "total_paid": {"$round": ["$total_paid", 2]},
-            "total_weight": {"$round": ["$total_weight", 2]},
-            "base_cost": {"$round": ["$base_cost", 2]},
-            "penalty_amount": {"$round": ["$penalty_amount", 2]},
-            "discount_amount": {"$round": ["$discount_amount", 2]},
-            "consistency": {"$concat": [
-                {"$toString": "$activity_count"}, "/", str(required_count), " Collections"
-            ]}
-        }}
-    ]
-    results = await db.bills.aggregate(pipeline).to_list(length=50)
-    return [{"rank": i + 1, **item} for i, item in enumerate(results)]
+@router.post("/admin/leaderboards/rebuild")
+async def rebuild_leaderboards(year: Optional[int] = Query(None)):
+    try:
+        return await leaderboard.rebuild(year)
+    except Exception as e:
+        raise HTTPException(500, f"Leaderboard rebuild failed: {str(e)}")
 
 
 @router.post("/cards", status_code=201)
@@ -682,7 +561,14 @@ async def delete_card(card_id: str):
 
 
 @router.get("/regional_unpaid_bills/{collector_name}")
-async def get_regional_unpaid_bills(collector_name: str):
+async def get_regional_unpaid_bills(collector_name: str, response: Response,
+                                    limit: int = Query(200, ge=1, le=1000), cursor: Optional[str] = Query(None),
+                                    format: str = Query("json", pattern="^(json|ndjson)$")):
+    """
+    Newest UNPAID bills of the collector's ward, a page at a time (X-Next-Cursor
+    holds the next page's cursor). format=ndjson streams every bill as an export
+    instead and ignores limit/cursor.
+    """
     db = get_database()
     if db is None:
         raise HTTPException(500, "Database connection failed")
@@ -698,22 +584,16 @@ async def get_regional_unpaid_bills(collector_name: str):
         raise HTTPException(400, "Could not determine area from collector name")
 
 
-    location_pattern = re.compile(f".*{location}.*", re.IGNORECASE)
-
-    cursor = db.bills.find({
-        "household_id": {"$regex": location_pattern},
-        "status": "UNPAID"
-    }).sort("created_at", -1)
-
-    bills = []
-    async for doc in cursor:
-        doc["_id"] = str(doc["_id"])
-        doc["submission_id"] = str(doc["submission_id"])
-
-        if "created_at" in doc and isinstance(doc["created_at"], datetime):
-            doc["created_at"] = doc["created_at"].isoformat()
-        bills.append(doc)
+    if format == "ndjson":
+        bills = bills_repo.stream({"status": "UNPAID", "location": normalize_location(location)})
+        return _ndjson_export(bills, f"unpaid_bills_{normalize_location(location)}.ndjson")
 
+    try:
+        bills, next_cursor = await bills_repo.unpaid_for_location(location, limit=limit, cursor=cursor)
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+    if next_cursor:
+        response.headers["X-Next-Cursor"] = next_cursor
     return bills
 
 @router.post("/pay-single-bill/{bill_id}")
@@ -728,17 +608,19 @@ async def pay_single_bill(bill_id: str):
         raise HTTPException(400, "Invalid Bill ID format")
 
 
-    result = await db.bills.update_one(
+    bill = await db.bills.find_one_and_update(
         {"_id": obj_id, "status": "UNPAID"},
         {"$set": {
             "status": "PAID",
             "paid_at": datetime.now(timezone.utc),
             "payment_method": "Visa Simulation"
-        }}
+        }},
+        projection=BILL_FIELDS
     )
 
-    if result.modified_count == 0:
+    if bill is None:
         raise HTTPException(404, "Bill not found or already paid")
+    await leaderboard.record_paid([bill])
 
     return {
         "message": "Payment successful",
@@ -774,27 +656,7 @@ async def update_reward_settings(settings: RewardSettingsRequest):
     }
 @router.post("/admin/distribute-rewards")
 async def distribute_rewards(req: RewardDistributionRequest):
-    db = get_database()
-
-    winners = await db.bills.aggregate([
-        {"$match": {"year": req.year, "month": req.month, "status": "PAID"}},
-        {"$group": {"_id": "$household_id", "monthly_total": {"$sum": "$final_bill"}}},
-        {"$sort": {"monthly_total": 1}},
-        {"$limit": 3}
-    ]).to_list(length=3)
-
-    issued = 0
-    pacts = [req.rank1_pct/100, req.rank2_pct/100, req.rank3_pct/100]
-
-    for i, winner in enumerate(winners):
-        amt = round(winner["monthly_total"] * pacts[i], 2)
-        exists = await db.rewards.find_one({"household_id": winner["_id"], "year": req.year, "month": req.month})
-        if not exists and amt > 0:
-            await db.rewards.insert_one({
-                "household_id": winner["_id"], "amount": amt, "status": "AVAILABLE",
-                "year": req.year, "month": req.month, "created_at": datetime.now(timezone.utc)
-            })
-            issued += 1
+    issued = await distribute_monthly_rewards(req.year, req.month, [req.rank1_pct, req.rank2_pct, req.rank3_pct])
     return {"issued": issued}
 
 @router.get("/admin/reward-settings")
@@ -804,18 +666,7 @@ async def get_reward_settings():
         raise HTTPException(500, "Database connection failed")
 
 
-    settings = await db.settings.find_one({"type": "global_rewards"})
-
-    if not settings:
-
-        return {"rank1_pct": 12.0, "rank2_pct": 10.0, "rank3_pct": 8.0}
-
-
-    return {
-        "rank1_pct": settings.get("rank1_pct", 12.0),
-        "rank2_pct": settings.get("rank2_pct", 10.0),
-        "rank3_pct": settings.get("rank3_pct", 8.0)
-    }
+    return await get_reward_rates()
 
 
 @router.patch("/adjust-bill/{bill_id}")
@@ -823,46 +674,29 @@ async def adjust_bill(bill_id: str, adj: AdjustmentRequest):
     db = get_database()
     try:
         obj_id = ObjectId(bill_id)
-        bill = await db.bills.find_one({"_id": obj_id})
+        bill = await db.bills.find_one({"_id": obj_id}, {"status": 1, "reward_deduction": 1, **BILL_FIELDS})
+        if bill is None:
+            raise HTTPException(404, "Bill not found")
 
         current_deduction = bill.get("reward_deduction", 0.0)
         original_price = bill["final_bill"] + current_deduction
         new_final = max(0, original_price - adj.amount)
 
-        await db.bills.update_one(
-            {"_id": obj_id},
+        # only if the bill was not paid or adjusted since it was read, so the leaderboard delta is exact
+        result = await db.bills.update_one(
+            {"_id": obj_id, "status": bill.get("status"), "final_bill": bill["final_bill"]},
             {"$set": {
                 "reward_deduction": adj.amount,
                 "final_bill": new_final,
                 "adjustment_reason": adj.reason
             }}
         )
+        if result.matched_count == 0:
+            raise HTTPException(409, "Bill changed during the adjustment, retry")
+        if bill.get("status") == "PAID":
+            await leaderboard.record_adjustment(bill, {"total_paid": new_final - bill["final_bill"]})
         return {"status": "UPDATED", "new_total": new_final}
+    except HTTPException:
+        raise
     except:
         raise HTTPException(400, "Update failed")
-
-async def automated_distribution_task():
-
-    db = get_database()
-    today = datetime.now(timezone.utc)
-    target = (today.replace(day=1) - timedelta(days=1))
-
-    settings = await db.settings.find_one({"type": "global_rewards"})
-    rates = settings if settings else {"rank1_pct": 12.0, "rank2_pct": 10.0, "rank3_pct": 8.0}
-
-    req = RewardDistributionRequest(year=target.year, month=target.month, **rates)
-    await distribute_rewards(req)
-
-def run_monthly_reward_automation():
-
-    loop = asyncio.new_event_loop()
-    asyncio.set_event_loop(loop)
-    try:
-        loop.run_until_complete(automated_distribution_task())
-    finally:
-        loop.close()
-
-scheduler = BackgroundScheduler()
-scheduler.add_job(run_monthly_reward_automation, 'cron', day=1, hour=0, minute=1)
-scheduler.start()
-
@@ -1,6 +1,6 @@
 from fastapi import APIRouter, HTTPException, Query
 from core.database import get_database
-from pymongo import ReturnDocument
+from services.sequences import next_complaint_id
 from datetime import datetime, timedelta
 from typing import Optional
 import logging
@@ -91,16 +91,7 @@ async def get_next_complaint_id() -> str:
     if db is None:
         raise HTTPException(status_code=500, detail="Database not connected")
 
-    counters = db["counters"]
-    result = await counters.find_one_and_update(
-        {"_id": "complaint_id"},
-        {"$inc": {"sequence_value": 1}},
-        upsert=True,
-        return_document=ReturnDocument.AFTER,
-    )
-
-    seq = result.get("sequence_value", 1) if result else 1
-    return f"CMP_{seq:06d}"
+    return await next_complaint_id()
 
 
 @router.post("/complaints")
@@ -1,34 +1,57 @@
 from fastapi import APIRouter, HTTPException, File, UploadFile, Form
+from fastapi.responses import StreamingResponse
 from schemas.dispose_schemas import (
     DisposeRequest, DisposeResponse, ErrorResponse,
+    BatchTextClassifyRequest, BatchTextClassifyResponse, TextClassification,
     TipsRequest, TipsResponse, TipsFeedbackRequest, TipsFeedbackResponse
 )
 from services.classifier import WasteClassifier
+from services.tip_catalog import bump_tips_version
 from core.constants import WasteType, BinCategory, FitStatus, WASTE_TO_BIN_MAPPING, VOLUME_THRESHOLDS
-from core.database import get_database
-from pymongo import ReturnDocument
+from core.config import get_settings
+from core.metrics import register_metrics
+from services.sequences import next_tip_id
+import asyncio
+import json
 import logging
-import base64
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
+settings = get_settings()
 
 classifier = WasteClassifier()
+register_metrics("image_classification_cache", classifier.image_cache.stats)
+register_metrics("text_classification_cache", classifier.cache_stats)
+register_metrics("tip_workflow_cache", classifier.workflow_cache.stats)
+register_metrics("tip_catalog", classifier.tip_catalog.stats)
+register_metrics("tip_feedback_writer", classifier.tip_feedback.stats)
+if getattr(classifier, "technique_table", None) is not None:
+    register_metrics("technique_table", classifier.technique_table.stats)
+
+
+async def _check_upload_size(file: UploadFile) -> int:
+    """
+    Walk the spooled upload in fixed-size chunks to enforce the size cap without
+    holding the whole image in memory, then rewind it for the classifier.
+    """
+    total = 0
+    while True:
+        chunk = await file.read(settings.upload_chunk_bytes)
+        if not chunk:
+            break
+        total += len(chunk)
+        if total > settings.max_upload_bytes:
+            raise HTTPException(
+                status_code=413,
+                detail=f"Image exceeds the {settings.max_upload_bytes // (1024 * 1024)} MB limit"
+            )
+    await file.seek(0)
+    return total
+
 
 async def get_next_tip_id() -> str:
     """Generate next sequential tip ID like TIP_0001"""
-    db = get_database()
-    counters = db["counters"]
-    
-    result = await counters.find_one_and_update(
-        {"_id": "tip_id"},
-        {"$inc": {"sequence_value": 1}},
-        upsert=True,
-        return_document=ReturnDocument.AFTER
-    )
-    
-    sequence = result.get("sequence_value", 1) if result else 1
-    return f"TIP_{sequence:04d}"
+    return await next_tip_id()
 
 
 @router.post("/dispose", response_model=DisposeResponse)
@@ -80,6 +103,29 @@ async def classify_waste(request: DisposeRequest):
         logger.error(f"Error classifying waste: {str(e)}")
         raise HTTPException(status_code=500, detail="Internal server error during classification")
 
+@router.post("/dispose/classify_batch", response_model=BatchTextClassifyResponse)
+async def classify_descriptions_batch(request: BatchTextClassifyRequest):
+    """
+    Classify many text descriptions in one call (admin/bulk use, e.g. re-classifying
+    historical descriptions). Embeddings are computed in batches.
+    """
+    try:
+        results = await classifier.classify_texts(request.descriptions)
+        items = [
+            TextClassification(
+                description=description,
+                waste_type=waste_type,
+                bin_type=WASTE_TO_BIN_MAPPING.get(waste_type, BinCategory.GENERAL),
+                confidence=confidence
+            )
+            for description, (waste_type, confidence) in zip(request.descriptions, results)
+        ]
+        return BatchTextClassifyResponse(results=items, count=len(items))
+
+    except Exception as e:
+        logger.error(f"Error classifying descriptions batch: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error during classification")
+
 @router.post("/dispose/tips", response_model=TipsResponse)
 async def generate_tips(request: TipsRequest):
     """
@@ -120,6 +166,63 @@ async def generate_tips(request: TipsRequest):
         raise HTTPException(status_code=500, detail="Internal server error during tips generation")
 
 
+@router.post("/dispose/tips/stream")
+async def stream_tips(request: TipsRequest):
+    """
+    Server-sent events version of /dispose/tips. Emits a `tip` event as soon as the
+    tip is selected, `workflow` events with LLM text deltas, then `done`.
+    """
+    try:
+        waste_type_enum = WasteType(request.waste_type.lower())
+    except ValueError:
+        waste_type_enum = WasteType.OTHER
+
+    async def event_stream():
+        try:
+            async for event, data in classifier.stream_tips(waste_type_enum, request.user_id):
+                yield f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+        except Exception as e:
+            logger.error(f"Error streaming tips: {str(e)}")
+            yield f"event: error\ndata: {json.dumps({'message': 'Internal server error during tips generation'})}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.post("/dispose/technique_table/regenerate")
+async def regenerate_technique_table():
+    """
+    Rebuild the precomputed technique lookup table. Call after retraining the
+    technique model (the table also rebuilds on startup when the model files are newer).
+    """
+    if getattr(classifier, "technique_table", None) is None:
+        raise HTTPException(status_code=503, detail="Technique model not loaded")
+    try:
+        entries = await asyncio.to_thread(classifier.regenerate_technique_table)
+        return {"success": True, "entries": entries}
+    except Exception as e:
+        logger.error(f"Error regenerating technique table: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error during technique table regeneration")
+
+
+@router.post("/dispose/tips/catalog/refresh")
+async def refresh_tip_catalog():
+    """
+    Reload the in-memory tip catalog after editing the tips collection and bump
+    the tips version so other workers reload on their next check.
+    """
+    try:
+        version = await bump_tips_version()
+        await classifier.tip_catalog.refresh(force=True)
+        return {"success": True, "version": version, **classifier.tip_catalog.stats()}
+    except Exception as e:
+        logger.error(f"Error refreshing tip catalog: {str(e)}")
+        raise HTTPException(status_code=500, detail="Internal server error during tip catalog refresh")
+
+
 @router.post("/dispose/tips/feedback", response_model=TipsFeedbackResponse)
 async def submit_feedback(request: TipsFeedbackRequest):
     """
@@ -131,6 +234,10 @@ async def submit_feedback(request: TipsFeedbackRequest):
         
         logger.info(f"Feedback received - Tip: {request.tip_id}, User: {request.user_id}, Feedback: {request.feedback}")
         
+        # Buffered; written to tip_feedback and folded into tip_scores in batches
+        if not await classifier.tip_feedback.submit(request.tip_id, request.user_id, request.feedback):
+            raise HTTPException(status_code=503, detail="Feedback service is busy, please try again")
+        
         return TipsFeedbackResponse(
             success=True,
             message="Thank you for your feedback!"
@@ -161,18 +268,18 @@ async def classify_waste_upload(
         if not file.content_type or not file.content_type.startswith('image/'):
             raise HTTPException(status_code=400, detail="File must be an image (jpg, png, etc.)")
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Convert to base64 for the classifier
-        image_base64 = base64.b64encode(file_content).decode('utf-8')
+        size = await _check_upload_size(file)
+        if size == 0:
+            raise HTTPException(status_code=400, detail="Uploaded image is empty")
         
-        # Classify waste
-        waste_type, confidence = await classifier.classify_from_image(image_base64)
+        # Classify straight from the spooled file; it is never copied into a bytes/base64 buffer
+        waste_type, confidence = await classifier.classify_from_file(file.file)
         
                
         return DisposeResponse(
             waste_type=waste_type,
+            bin_type=WASTE_TO_BIN_MAPPING.get(waste_type, BinCategory.GENERAL),
+            fit_status=FitStatus.UNKNOWN,
             confidence=confidence,
             message=f"Waste classified as {waste_type.value}"
         )
@@ -1,5 +1,8 @@
 from fastapi import APIRouter, HTTPException
 from core.database import db, get_database
+from core.metrics import collect_metrics
+from core.indexes import index_report, explain_hot_queries
+from jobs.cluster import job_report
 import logging
 
 router = APIRouter()
@@ -10,6 +13,40 @@ async def health_check():
     """Basic health check endpoint"""
     return {"status": "healthy", "service": "waste-classification"}
 
+@router.get("/health/metrics")
+async def metrics():
+    """In-process cache and pool statistics (hit ratios, sizes) for this worker."""
+    return collect_metrics()
+
+@router.get("/health/indexes")
+async def index_health():
+    """
+    Registered indexes missing on the server, indexes unused since the last
+    restart, and the winning plan (COLLSCAN vs IXSCAN) of each hot query.
+    """
+    if db.client is None or db.database is None:
+        raise HTTPException(status_code=503, detail="Database not connected")
+    try:
+        database = get_database()
+        return {
+            "indexes": await index_report(database),
+            "hot_queries": await explain_hot_queries(database),
+        }
+    except Exception as e:
+        logger.error(f"Index health check failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Index health check failed: {str(e)}")
+
+@router.get("/health/jobs")
+async def job_health(runs: int = 10):
+    """Scheduled job leases and the latest runs of each job (owner, duration, status, error)."""
+    if db.client is None or db.database is None:
+        raise HTTPException(status_code=503, detail="Database not connected")
+    try:
+        return await job_report(runs_per_job=runs)
+    except Exception as e:
+        logger.error(f"Job health check failed: {str(e)}")
+        raise HTTPException(status_code=500, detail=f"Job health check failed: {str(e)}")
+
 @router.get("/health/db")
 async def database_health_check():
     """
@@ -1,5 +1,6 @@
-from services.tax_services import classify_behaviour
 from services.tax_services import tax_engine
+from services.tax_services import max_household_sequence
+from services.sequences import peek_location_sequence, reserve_location_sequence
 from schemas.tax_schemas import CreateUserRequest, AddWeekRequest
 from schemas.tax_schemas import PredictNextRequest, WeightOutput
 from schemas.tax_schemas import DashboardResponse, BillDetails, HistoryTaxResponse, HistoricalBillItem
@@ -8,13 +9,29 @@ from schemas.tax_schemas import TaxInput, TaxOutput
 from schemas.tax_schemas import SubmitWeightRequest, PendingItemResponse, ReviewActionRequest
 from datetime import datetime
 from tensorflow.keras.models import load_model
+from services.inference import CompiledModel
 from pathlib import Path
 import numpy as np
 import joblib
 import pandas as pd
 from typing import List, Optional
-from fastapi import APIRouter, HTTPException, Depends, status, Query
+from fastapi import APIRouter, HTTPException, Depends, status, Query, Request, Response, File, UploadFile
+from fastapi.responses import JSONResponse
+from fastapi.encoders import jsonable_encoder
 from core.database import get_database
+from pymongo import UpdateOne
+from core.cache import TTLCache
+from core.config import get_settings
+from core.metrics import register_metrics
+from repositories import households_repo, history_repo, prices_repo, bills_repo, pending_repo
+from repositories.pending import REVIEW_ITEM_PROJECTION
+from core.constants import household_location, normalize_location, id_suffix
+from services.household_history import HouseholdHistory, FEATURE_KEYS
+from services import household_import
+from services.household_import import household_importer
+import asyncio
+import hashlib
+import json
 
 router = APIRouter()
 
@@ -29,11 +46,6 @@ WASTE_TYPE_MAP = {
     "Inorganic": "inorganic"
 }
 
-FEATURE_KEYS = [
-    'lag_1w', 'lag_2w', 'lag_4w',
-    'roll_4w', 'roll_8w', 'roll_12w',
-    'week'
-]
 
 WASTE_TYPES = ["Organic", "Recyclable", "Inorganic"]
 
@@ -51,7 +63,7 @@ try:
         sy_path = MODELS_DIR / f"{key}_scaler_y.pkl"
 
         if model_path.exists() and sx_path.exists() and sy_path.exists():
-            lstm_models[key] = load_model(model_path)
+            lstm_models[key] = CompiledModel(load_model(model_path))
             scalers_x[key] = joblib.load(sx_path)
             scalers_y[key] = joblib.load(sy_path)
 
@@ -62,23 +74,42 @@ except Exception as e:
     print(f"Critical Error loading models: {e}")
 
 
-def predict_weight_core(waste_key: str, features_sequence: list) -> float:
-    if waste_key not in lstm_models:
+def predict_weight_matrix(waste_key: str, X: Optional[np.ndarray]) -> float:
+    """LSTM next-week weight for a (SEQ_LEN, len(FEATURE_KEYS)) feature matrix."""
+    if waste_key not in lstm_models or X is None or len(X) < SEQ_LEN:
         return 0.0
-    model = lstm_models[waste_key]
-    scaler_x = scalers_x[waste_key]
-    scaler_y = scalers_y[waste_key]
-    data_matrix = [[float(week_data.get(k, 0)) for k in FEATURE_KEYS] for week_data in features_sequence]
-    if len(data_matrix) < SEQ_LEN:
-        return 0.0
-    X = np.array(data_matrix)
-    X_scaled = scaler_x.transform(X)
+    X_scaled = scalers_x[waste_key].transform(X[-SEQ_LEN:])
     X_input = X_scaled.reshape(1, SEQ_LEN, len(FEATURE_KEYS))
-    pred_scaled = model.predict(X_input, verbose=0)
-    pred_kg = scaler_y.inverse_transform(pred_scaled)
+    pred_scaled = lstm_models[waste_key].predict(X_input)
+    pred_kg = scalers_y[waste_key].inverse_transform(pred_scaled)
     return float(max(0.0, pred_kg[0][0]))
 
 
+# Next-week predictions keyed by a digest of the LSTM input, so any change to the history invalidates them
+prediction_cache = TTLCache(
+    maxsize=get_settings().prediction_cache_size,
+    ttl_seconds=get_settings().prediction_cache_ttl_seconds
+)
+register_metrics("next_week_prediction_cache", prediction_cache.stats)
+
+
+def predict_next_week_cached(household_id: str, waste_type: str, history: HouseholdHistory) -> Optional[float]:
+    """Rounded LSTM next-week prediction for the last SEQ_LEN weeks; None without enough history."""
+    if len(history) < SEQ_LEN:
+        return None
+    features = history.feature_matrix(SEQ_LEN)
+    key = (household_id, waste_type, hashlib.sha1(features.tobytes()).hexdigest())
+    prediction = prediction_cache.get(key)
+    if prediction is None:
+        try:
+            prediction = round(max(0.0, predict_weight_matrix(WASTE_TYPE_MAP[waste_type], features)), 2)
+        except Exception:
+            # not cached, so the next request retries the model
+            return 0.0
+        prediction_cache.set(key, prediction)
+    return prediction
+
+
 def get_price_for_week(price_doc, target_year, target_week, base_rate):
     if not price_doc or "history" not in price_doc:
         return base_rate
@@ -127,50 +158,64 @@ async def create_user(user: CreateUserRequest):
     if await db.households_col.find_one({"linked_email": user_email}):
         raise HTTPException(status_code=400, detail="User already has a household linked.")
 
+    location = household_location(user.household_id)
     await db.households_col.insert_one({
-        "_id": user.household_id, "linked_email": user_email,
+        "_id": user.household_id, "linked_email": user_email, "location": location,
         "income_tier": user.income_tier, "qr_code": user.qr_code, "created_at": datetime.utcnow()
     })
+    if location:
+        # takes the number /get_next_id suggested (or any ID chosen by hand)
+        await reserve_location_sequence("household", location, id_suffix(user.household_id, "-"))
 
     for wtype in WASTE_TYPES_LIST:
         if wtype not in user.waste_data or len(user.waste_data[wtype]) < SEQ_LEN:
             await db.households_col.delete_one({"_id": user.household_id})
             raise HTTPException(status_code=400, detail=f"Missing or insufficient history for {wtype}")
 
-        week_list = sorted(user.waste_data[wtype], key=lambda x: (x.year, x.week))
-        weights = [w.weight_kg for w in week_list]
-        rows = []
-        for idx, w in enumerate(week_list):
-            row = {
-                "year": w.year, "week": w.week, "weight_kg": w.weight_kg,
-                "lag_1w": weights[idx - 1] if idx >= 1 else 0,
-                "lag_2w": weights[idx - 2] if idx >= 2 else 0,
-                "lag_4w": weights[idx - 4] if idx >= 4 else 0,
-                "roll_4w": round(sum(weights[max(0, idx - 3):idx + 1]) / min(idx + 1, 4), 2),
-                "roll_8w": round(sum(weights[max(0, idx - 7):idx + 1]) / min(idx + 1, 8), 2),
-                "roll_12w": round(sum(weights[max(0, idx - 11):idx + 1]) / min(idx + 1, 12), 2),
-                "behaviour_class": classify_behaviour(wtype, w.weight_kg)
-            }
-            rows.append(row)
-        await db.history_col.insert_one({"household_id": user.household_id, "waste_type": wtype, "weeks": rows})
+        history = HouseholdHistory.from_entries(w.dict() for w in user.waste_data[wtype])
+        await history_repo.save(user.household_id, wtype, history, upsert=True)
     return {"message": "User created with 12-week history"}
 
 
+@router.post("/households/import")
+async def import_households(
+        file: UploadFile = File(...),
+        format: Optional[str] = Query(default=None, pattern="^(csv|ndjson)$"),
+        dry_run: bool = Query(default=False)
+):
+    """
+    Bulk /create_user for onboarding: a CSV or NDJSON file of weekly rows (see
+    services/household_import.py). Returns imported/rejected counts, the reason
+    per rejected household and per-phase timings. dry_run only validates.
+    """
+    db = get_database()
+    if db is None: raise HTTPException(500, "Database connection not ready")
+
+    max_bytes = get_settings().household_import_max_bytes
+    data = await file.read(max_bytes + 1)
+    if len(data) > max_bytes:
+        raise HTTPException(413, f"Import file exceeds the {max_bytes // (1024 * 1024)} MB limit")
+    fmt = format or household_import.detect_format(file.filename, file.content_type)
+    try:
+        frame = await asyncio.to_thread(household_import.parse, data, fmt)
+        return await household_importer.run(frame, dry_run=dry_run)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+
 @router.get("/get_next_id")
 async def get_next_id(location: str):
+    """
+    Suggested ID for a new household. Read-only: the number is taken when
+    /create_user stores the household, so abandoned sign-ups leave no gaps.
+    """
     db = get_database()
     if db is None: raise HTTPException(500, "Database connection not ready")
 
-    pattern = f"^HH-{location}-"
-    cursor = db.households_col.find({"_id": {"$regex": pattern}}, {"_id": 1})
-    existing_ids = await cursor.to_list(length=10000)
-    max_seq = 0
-    for doc in existing_ids:
-        try:
-            max_seq = max(max_seq, int(doc["_id"].split("-")[-1]))
-        except:
-            continue
-    return {"next_id": f"HH-{location}-{max_seq + 1:02d}"}
+    if not normalize_location(location):
+        raise HTTPException(400, "Location is required")
+    seq = await peek_location_sequence("household", location, lambda: max_household_sequence(location))
+    return {"next_id": f"HH-{location}-{seq:02d}"}
 
 
 @router.get("/get_weeks/{household_id}")
@@ -178,11 +223,10 @@ async def get_weeks(household_id: str):
     db = get_database()
     if db is None: raise HTTPException(500, "Database connection not ready")
 
-    result = {}
-    for wtype in ["Organic", "Recyclable", "Sanitary Waste", "General_Waste"]:
-        record = await db.history_col.find_one({"household_id": household_id, "waste_type": wtype})
-        result[wtype] = record.get("weeks", []) if record else []
-    household = await db.households_col.find_one({"_id": household_id})
+    result, household = await asyncio.gather(
+        history_repo.get_weeks_by_type(household_id, ["Organic", "Recyclable", "Sanitary Waste", "General_Waste"]),
+        households_repo.get(household_id, fields=("income_tier",))
+    )
     return {"household_id": household_id, "income_tier": household["income_tier"] if household else None,
             "waste_data": result}
 
@@ -195,28 +239,15 @@ async def get_household_profile_extended(household_id: str):
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection not ready")
 
-    # Fetch profile
-    household = await db.households_col.find_one({"_id": household_id})
+    # Profile fields and per-type weekly averages ($avg server-side) in parallel
+    waste_types = ["Organic", "Recyclable", "Inorganic"]
+    household, averages = await asyncio.gather(
+        households_repo.get(household_id),
+        history_repo.average_weights(household_id, waste_types)
+    )
     if not household:
         raise HTTPException(status_code=404, detail="Household profile not found")
 
-    # Calculate averages for each waste type
-    averages = {}
-    waste_types = ["Organic", "Recyclable", "Inorganic"]
-
-    for wtype in waste_types:
-        record = await db.history_col.find_one({
-            "household_id": household_id,
-            "waste_type": wtype
-        })
-
-        if record and "weeks" in record and len(record["weeks"]) > 0:
-            weights = [w["weight_kg"] for w in record["weeks"]]
-            avg = sum(weights) / len(weights)
-            averages[wtype] = round(avg, 2)
-        else:
-            averages[wtype] = 0.0
-
     return {
         "profile": {
             "household_id": household.get("_id"),
@@ -227,48 +258,88 @@ async def get_household_profile_extended(household_id: str):
         "averages": averages
     }
 
+@router.get("/household/{household_id}/dashboard")
+async def get_household_dashboard(household_id: str, request: Request):
+    """
+    Everything the mobile dashboard shows in one round-trip: profile, weekly
+    averages, next-week predictions (cached per last recorded week), weekly
+    history and recent bills. The three queries run concurrently. The response
+    carries an ETag, and an unchanged dashboard answers If-None-Match with 304.
+    """
+    db = get_database()
+    if db is None:
+        raise HTTPException(status_code=500, detail="Database connection not ready")
+
+    weeks_types = ["Organic", "Recyclable", "Sanitary Waste", "General_Waste"]
+    history_types = list(dict.fromkeys(WASTE_TYPES + weeks_types))
+
+    household, histories, (bills, _) = await asyncio.gather(
+        households_repo.get(household_id),
+        history_repo.get_histories(household_id, history_types),
+        bills_repo.recent_for_household(household_id, limit=50)
+    )
+    if not household:
+        raise HTTPException(status_code=404, detail="Household profile not found")
+
+    averages, predictions = {}, {}
+    for wtype in WASTE_TYPES:
+        weights = histories[wtype].weights
+        averages[wtype] = round(float(weights.mean()), 2) if len(weights) else 0.0
+        predictions[wtype] = {
+            "predicted_next_week_kg": predict_next_week_cached(household_id, wtype, histories[wtype])
+        }
+
+    body = jsonable_encoder({
+        "household_id": household_id,
+        "profile": {
+            "household_id": household.get("_id"),
+            "linked_email": household.get("linked_email", "N/A"),
+            "income_tier": household.get("income_tier", "Unknown"),
+            "qr_code": household.get("qr_code", ""),
+        },
+        "averages": averages,
+        "predictions": predictions,
+        "waste_data": {wtype: histories[wtype].entries(wtype) for wtype in weeks_types},
+        "bills": bills
+    })
+
+    etag = '"' + hashlib.sha1(json.dumps(body, sort_keys=True).encode()).hexdigest() + '"'
+    headers = {"ETag": etag, "Cache-Control": "private, no-cache"}
+    if etag in [t.strip() for t in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(content=body, headers=headers)
+
 @router.post("/process_weekly_waste", response_model=DashboardResponse)
 async def process_weekly_waste(data: PredictNextRequest):
     db = get_database()
     if db is None: raise HTTPException(500, "Database connection not ready")
 
-    user_profile = await db.households_col.find_one({"_id": data.household_id})
-    if not user_profile: raise HTTPException(404, "Household not found")
+    if not await households_repo.exists(data.household_id): raise HTTPException(404, "Household not found")
 
-    price_record = await db.waste_prices.find_one({"waste_type": data.waste_type})
+    price_record = await prices_repo.get_price(data.waste_type)
     base_rate = price_record.get("base_price", price_record.get("current_base_price", 0.0)) if price_record else 0.0
 
-    history = await db.history_col.find_one({"household_id": data.household_id, "waste_type": data.waste_type})
-    if not history: return await handle_cold_start(data, base_rate)
+    history = await history_repo.get_history(data.household_id, data.waste_type)
+    if not len(history): return await handle_cold_start(data, base_rate)
 
-    raw_weeks = sorted(history["weeks"], key=lambda x: (x["year"], x["week"]))
-    last_entry = raw_weeks[-1]
-    curr_week_num = last_entry["week"] + 1 if last_entry["week"] < 52 else 1
-    curr_year = last_entry["year"] if last_entry["week"] < 52 else last_entry["year"] + 1
+    curr_year, curr_week_num = history.next_week()
+    # The current week closes a 12-week window; its rolling means and lag come from that window
+    working_window = history.tail(11).append(curr_year, curr_week_num, data.current_weight_kg, keep=None)
+    weights = working_window.weights
+    lag_1w = float(weights[-2]) if len(weights) > 1 else 0
 
-    working_window = raw_weeks[-11:] + [{
-        "year": curr_year, "week": curr_week_num, "weight_kg": data.current_weight_kg,
-        "roll_4w": 0, "roll_12w": 0, "lag_1w": 0, "lag_2w": 0, "lag_4w": 0
-    }]
+    current_bill_data = tax_engine.calculate_bill(data.current_weight_kg, data.waste_type,
+                                                  float(weights[-4:].mean()), float(weights[-12:].mean()),
+                                                  lag_1w, base_rate)
 
-    weights = [w["weight_kg"] for w in working_window]
-    for i, w in enumerate(working_window):
-        w["lag_1w"] = weights[i - 1] if i >= 1 else 0
-        w["roll_4w"] = sum(weights[max(0, i - 3):i + 1]) / min(i + 1, 4)
-        w["roll_12w"] = sum(weights[max(0, i - 11):i + 1]) / min(i + 1, 12)
+    predicted_kg = round(predict_weight_matrix(WASTE_TYPE_MAP.get(data.waste_type),
+                                               working_window.feature_matrix(SEQ_LEN)), 2)
 
-    cur = working_window[-1]
-    current_bill_data = tax_engine.calculate_bill(data.current_weight_kg, data.waste_type, cur["roll_4w"],
-                                                  cur["roll_12w"], cur["lag_1w"], base_rate)
-
-    predicted_kg = round(predict_weight_core(WASTE_TYPE_MAP.get(data.waste_type), working_window), 2)
-
-    future_weights = weights + [predicted_kg]
-    f_idx = len(future_weights) - 1
+    future_weights = np.append(weights, predicted_kg)
     future_bill_data = tax_engine.calculate_bill(
         predicted_kg, data.waste_type,
-        sum(future_weights[max(0, f_idx - 3):f_idx + 1]) / 4,
-        sum(future_weights[max(0, f_idx - 11):f_idx + 1]) / 12,
+        float(future_weights[-4:].sum()) / 4,
+        float(future_weights[-12:].sum()) / 12,
         data.current_weight_kg, base_rate
     )
 
@@ -286,25 +357,46 @@ async def sync_missing_weeks(household_id: str):
     if db is None: raise HTTPException(500, "Database connection not ready")
 
     current_year, current_week, _ = datetime.now().isocalendar()
+    histories = await history_repo.get_histories(household_id, WASTE_TYPES_LIST)
+
+    # Weeks between the last recorded one and now, per waste type
+    missing = {}
+    for wtype, history in histories.items():
+        if not len(history): continue
+        missing_weeks = list(range(history.last_week[1] + 1, current_week))
+        if missing_weeks:
+            missing[wtype] = (history, missing_weeks)
+    if not missing:
+        return {"status": "sync_complete", "actions": []}
+
+    # One query for the submissions that already exist instead of one per week
+    cursor = db.pending_col.find(
+        {"household_id": household_id, "waste_type": {"$in": list(missing)}, "year": current_year,
+         "week": {"$in": sorted({w for _, weeks in missing.values() for w in weeks})}},
+        {"_id": 0, "waste_type": 1, "week": 1}
+    )
+    existing = {(doc["waste_type"], doc["week"]) async for doc in cursor}
+
+    operations, labels = [], []
+    for wtype, (history, missing_weeks) in missing.items():
+        to_fill = [w for w in missing_weeks if (wtype, w) not in existing]
+        if not to_fill: continue
+        # Same input window for every missing week of this type, so predict once
+        predicted_val = round(predict_weight_matrix(WASTE_TYPE_MAP[wtype], history.feature_matrix(SEQ_LEN)), 2)
+        for week in to_fill:
+            key = {"household_id": household_id, "waste_type": wtype, "year": current_year, "week": week}
+            # $setOnInsert keeps a submission that raced in between the read and this write
+            operations.append(UpdateOne(key, {"$setOnInsert": {
+                **key, "weight_kg": predicted_val, "status": "REVIEW", "is_auto_filled": True,
+                "location": household_location(household_id), "submitted_at": datetime.utcnow()
+            }}, upsert=True))
+            labels.append(f"Auto-filled {wtype} Wk {week}")
+
     actions_log = []
-    for wtype in WASTE_TYPES_LIST:
-        history = await db.history_col.find_one({"household_id": household_id, "waste_type": wtype})
-        if not (history and "weeks" in history): continue
-
-        sorted_weeks = sorted(history["weeks"], key=lambda x: (x["year"], x["week"]))
-        check_week = sorted_weeks[-1]["week"] + 1
-
-        while check_week < current_week:
-            if not await db.pending_col.find_one(
-                    {"household_id": household_id, "waste_type": wtype, "year": current_year, "week": check_week}):
-                predicted_val = round(predict_weight_core(WASTE_TYPE_MAP[wtype], sorted_weeks[-SEQ_LEN:]), 2)
-                await db.pending_col.insert_one({
-                    "household_id": household_id, "waste_type": wtype, "weight_kg": predicted_val,
-                    "year": current_year, "week": check_week, "status": "REVIEW", "is_auto_filled": True,
-                    "submitted_at": datetime.utcnow()
-                })
-                actions_log.append(f"Auto-filled {wtype} Wk {check_week}")
-            check_week += 1
+    if operations:
+        result = await db.pending_col.bulk_write(operations, ordered=False)
+        actions_log = [labels[i] for i in sorted(result.upserted_ids)]
+        await pending_repo.adjust_review_count({household_location(household_id): result.upserted_count})
     return {"status": "sync_complete", "actions": actions_log}
 
 
@@ -340,22 +432,12 @@ async def add_week(data: AddWeekRequest):
     db = get_database()
     if db is None: raise HTTPException(500, "Database connection not ready")
 
-    record = await db.history_col.find_one({"household_id": data.household_id, "waste_type": data.waste_type})
-    if not record: raise HTTPException(404, "Not found")
+    history = await history_repo.get_history(data.household_id, data.waste_type)
+    if not len(history): raise HTTPException(404, "Not found")
 
-    weeks = record.get("weeks", []) + [{"year": data.year, "week": data.week, "weight_kg": data.weight_kg}]
-    weeks = sorted(weeks, key=lambda x: (x["year"], x["week"]))[-12:]
-
-    weights = [w["weight_kg"] for w in weeks]
-    for idx, w in enumerate(weeks):
-        w.update({
-            "lag_1w": weights[idx - 1] if idx >= 1 else 0,
-            "roll_4w": round(sum(weights[max(0, idx - 3):idx + 1]) / min(idx + 1, 4), 2),
-            "roll_12w": round(sum(weights[max(0, idx - 11):idx + 1]) / min(idx + 1, 12), 2),
-            "behaviour_class": classify_behaviour(data.waste_type, w["weight_kg"])
-        })
-    await db.history_col.update_one({"_id": record["_id"]}, {"$set": {"weeks": weeks}})
-    return {"message": "Week added", "latest_behaviour": weeks[-1]["behaviour_class"]}
+    history = history.append(data.year, data.week, data.weight_kg)
+    await history_repo.save(data.household_id, data.waste_type, history)
+    return {"message": "Week added", "latest_behaviour": history.behaviour_classes(data.waste_type)[-1]}
 
 
 @router.get("/households")
@@ -378,10 +460,10 @@ async def get_all_pending_reviews(location: Optional[str] = Query(None)):
     query = {"status": "REVIEW"}
 
     if location:
+        # indexed ward field instead of a regex over household IDs
+        query["location"] = normalize_location(location)
 
-        query["household_id"] = {"$regex": location, "$options": "i"}
-
-    cursor = db.pending_col.find(query).sort("submitted_at", 1)
+    cursor = db.pending_col.find(query, REVIEW_ITEM_PROJECTION).sort([("submitted_at", 1), ("_id", 1)])
 
     results = []
     async for doc in cursor:
@@ -397,6 +479,37 @@ async def get_all_pending_reviews(location: Optional[str] = Query(None)):
     return results
 
 
+@router.get("/review_queue")
+async def get_review_queue(location: Optional[str] = Query(None), household_id: Optional[str] = Query(None),
+                           waste_type: Optional[str] = Query(None), limit: int = Query(100, ge=1, le=500),
+                           cursor: Optional[str] = Query(None)):
+    """Keyset-paginated REVIEW queue, oldest first. Pass next_cursor back as cursor for the next page."""
+    try:
+        docs, next_cursor = await pending_repo.review_page(
+            location=location, household_id=household_id, waste_type=waste_type, limit=limit, cursor=cursor
+        )
+    except ValueError:
+        raise HTTPException(400, "Invalid cursor")
+
+    items = [{
+        "submission_id": str(doc["_id"]),
+        "household_id": doc["household_id"],
+        "waste_type": doc["waste_type"],
+        "weight_kg": doc["weight_kg"],
+        "week": doc.get("week", "N/A"),
+        "status": doc["status"],
+        "location": doc.get("location"),
+        "submitted_at": doc["submitted_at"]
+    } for doc in docs]
+    return {"items": items, "next_cursor": next_cursor}
+
+
+@router.get("/review_queue/count")
+async def get_review_queue_count(location: Optional[str] = Query(None)):
+    return {"location": normalize_location(location) if location else None,
+            "count": await pending_repo.review_count(location)}
+
+
 @router.post("/predict_next_week", response_model=WeightOutput)
 async def predict_next_week(data: PredictNextRequest):
 
@@ -410,58 +523,19 @@ async def predict_next_week(data: PredictNextRequest):
         raise HTTPException(400, "Invalid waste type")
 
 
-    record = await db.history_col.find_one({
-        "household_id": data.household_id,
-        "waste_type": data.waste_type
-    })
-
-    if not record or "weeks" not in record:
+    history = await history_repo.get_history(data.household_id, data.waste_type)
+    if not len(history):
         raise HTTPException(404, "No history found.")
 
-    weeks = record.get("weeks", [])
-    weeks = sorted(weeks, key=lambda x: (x["year"], x["week"]))
-
-    last_entry = weeks[-1]
-    current_year = last_entry["year"]
-    current_week = last_entry["week"]
-
-    if current_week >= 52:
-        new_year = current_year + 1
-        new_week = 1
-    else:
-        new_year = current_year
-        new_week = current_week + 1
-
-    weeks.append({
-        "year": new_year,
-        "week": new_week,
-        "weight_kg": data.current_weight_kg
-    })
-
-    updated_window = weeks[-12:]
-    window_weights = [w["weight_kg"] for w in updated_window]
-
-    for idx, w in enumerate(updated_window):
-        w["roll_4w"] = round(sum(window_weights[max(0, idx - 3):idx + 1]) / min(idx + 1, 4), 2)
-        w["roll_8w"] = round(sum(window_weights[max(0, idx - 7):idx + 1]) / min(idx + 1, 8), 2)
-        w["roll_12w"] = round(sum(window_weights[max(0, idx - 11):idx + 1]) / min(idx + 1, 12), 2)
-
-        w["lag_1w"] = window_weights[idx - 1] if idx >= 1 else 0.0
-        w["lag_2w"] = window_weights[idx - 2] if idx >= 2 else 0.0
-        w["lag_4w"] = window_weights[idx - 4] if idx >= 4 else 0.0
-
-        w["behaviour_class"] = classify_behaviour(data.waste_type, w["weight_kg"])
+    updated_window = history.append(*history.next_week(), data.current_weight_kg)
 
     try:
-        predicted_kg = predict_weight_core(model_key, updated_window)
+        predicted_kg = predict_weight_matrix(model_key, updated_window.feature_matrix(SEQ_LEN))
     except Exception as e:
         print(f"Prediction Error: {e}")
         predicted_kg = 0.0
 
-    await db.history_col.update_one(
-        {"_id": record["_id"]},
-        {"$set": {"weeks": updated_window}}
-    )
+    await history_repo.save(data.household_id, data.waste_type, updated_window)
 
     return WeightOutput(predicted_weight_kg=round(predicted_kg, 2))
 
@@ -474,16 +548,16 @@ async def get_tax_history(household_id: str, waste_type: str):
     if db is None:
         raise HTTPException(status_code=500, detail="Database connection not ready")
 
-    price_record = await db.waste_prices.find_one({"waste_type": waste_type})
+    price_record = await prices_repo.get_price(waste_type)
     base_rate = 0.0
     if price_record:
         base_rate = price_record.get("base_price", price_record.get("current_base_price", 0.0))
 
-    record = await db.history_col.find_one({"household_id": household_id, "waste_type": waste_type})
-    if not record or "weeks" not in record:
+    history = await history_repo.get_history(household_id, waste_type)
+    if not len(history):
         raise HTTPException(404, "No history found")
 
-    weeks = sorted(record["weeks"], key=lambda x: (x["year"], x["week"]))
+    weeks = history.entries(waste_type)
     report_items = []
 
     prev_weight = 0.0
@@ -540,7 +614,7 @@ async def get_my_submissions(household_id: str, waste_type: str):
         "household_id": household_id,
         "waste_type": waste_type,
         "status": {"$in": ["REVIEW", "DENIED"]}
-    }).sort("submitted_at", -1)
+    }, REVIEW_ITEM_PROJECTION).sort("submitted_at", -1)
 
     results = []
     async for doc in cursor:
@@ -565,7 +639,7 @@ async def get_pending_reviews():
         raise HTTPException(status_code=500, detail="Database connection not ready")
 
 
-    cursor = db.pending_col.find({"status": "REVIEW"})
+    cursor = db.pending_col.find({"status": "REVIEW"}, REVIEW_ITEM_PROJECTION)
 
     results = []
     async for doc in cursor:
@@ -593,10 +667,9 @@ async def get_household_pending_reviews(household_id: str, location: Optional[st
 
 
     if location:
+        query["location"] = normalize_location(location)
 
-        query["household_id"] = {"$regex": f".*{location}.*", "$options": "i"} #
-
-    cursor = db.pending_col.find(query) #
+    cursor = db.pending_col.find(query, REVIEW_ITEM_PROJECTION)
     results = []
     async for doc in cursor:
         results.append(PendingItemResponse(
@@ -620,34 +693,18 @@ async def predict_next_week(household_id: str):
         raise HTTPException(status_code=500, detail="Database connection not ready")
 
 
-    household = await db.households_col.find_one({"_id": household_id})
-    if not household:
+    household_exists, histories = await asyncio.gather(
+        households_repo.exists(household_id),
+        history_repo.get_histories(household_id, WASTE_TYPES)
+    )
+    if not household_exists:
         raise HTTPException(status_code=404, detail="Household not found")
 
     predictions = {}
 
     for wtype in WASTE_TYPES:
-        model_key = WASTE_TYPE_MAP[wtype]
-
-        record = await db.history_col.find_one({
-            "household_id": household_id,
-            "waste_type": wtype
-        })
-
-        prediction_val = None
-
-        if record and "weeks" in record:
-            weeks_data = record["weeks"]
-            if len(weeks_data) >= SEQ_LEN:
-                input_sequence = weeks_data[-SEQ_LEN:]
-                try:
-                    raw_pred = predict_weight_core(model_key, input_sequence)
-                    prediction_val = round(max(0.0, raw_pred), 2)
-                except Exception:
-                    prediction_val = 0.0
-
         predictions[wtype] = {
-            "predicted_next_week_kg": prediction_val
+            "predicted_next_week_kg": predict_next_week_cached(household_id, wtype, histories[wtype])
         }
 
     return {
@@ -1,10 +1,14 @@
 from pydantic import BaseModel, Field
 from typing import Optional, List
 from core.constants import WasteType, BinCategory, FitStatus
+from core.config import get_settings
+
+# base64 encodes 3 bytes as 4 characters
+MAX_IMAGE_BASE64_CHARS = (get_settings().max_upload_bytes + 2) // 3 * 4
 
 class DisposeRequest(BaseModel):
     user_id: Optional[str] = Field(None, description="User ID for personalized tips")
-    image_data: Optional[str] = Field(None, description="Base64 encoded image data")
+    image_data: Optional[str] = Field(None, max_length=MAX_IMAGE_BASE64_CHARS, description="Base64 encoded image data")
     description: Optional[str] = Field(None, description="Text description of the waste")
     volume: Optional[int] = Field(None, description="Volume in milliliters", gt=0)
     input_method: str = Field(..., description="Input method: 'image' or 'description'")
@@ -19,6 +23,19 @@ class DisposeResponse(BaseModel):
     bin_volume_liters: Optional[float] = None
     distance_cm: Optional[float] = None
 
+class BatchTextClassifyRequest(BaseModel):
+    descriptions: List[str] = Field(..., min_length=1, max_length=5000, description="Waste descriptions to classify")
+
+class TextClassification(BaseModel):
+    description: str
+    waste_type: WasteType
+    bin_type: BinCategory
+    confidence: float = Field(..., ge=0.0, le=1.0)
+
+class BatchTextClassifyResponse(BaseModel):
+    results: List[TextClassification]
+    count: int
+
 class ErrorResponse(BaseModel):
     error: str
     detail: Optional[str] = None
@@ -106,6 +106,24 @@ class ReviewActionRequest(BaseModel):
     submission_id: str
     action: str
 
+class BulkReviewActionRequest(BaseModel):
+    actions: List[ReviewActionRequest] = Field(..., min_length=1, max_length=1000)
+
+class ReviewActionResult(BaseModel):
+    submission_id: str
+    status: Optional[str] = None
+    bill_id: Optional[str] = None
+    subtotal: Optional[float] = None
+    reward_applied: Optional[float] = None
+    final_bill: Optional[float] = None
+    error: Optional[str] = None
+
+class BulkReviewActionResponse(BaseModel):
+    verified: int
+    denied: int
+    failed: int
+    results: List[ReviewActionResult]
+
 class PendingItemResponse(BaseModel):
     submission_id: str
     household_id: str
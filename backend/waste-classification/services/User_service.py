@@ -11,7 +11,9 @@ from typing import Optional
 import logging
 from datetime import datetime
 from bson import ObjectId
+from core.constants import normalize_location
 from core.database import get_database
+from repositories import users_repo
 
 logger = logging.getLogger(__name__)
 
@@ -57,9 +59,8 @@ async def register_user(user_data: UserRegisterRequest) -> UserRegisterResponse:
     
     # Check if user already exists
     email_lower = user_data.email.lower()
-    existing_user = await users_collection.find_one({"email": email_lower})
     
-    if existing_user:
+    if await users_repo.email_exists(email_lower):
         raise ValueError("Email already registered")
     
     # Hash password
@@ -72,6 +73,7 @@ async def register_user(user_data: UserRegisterRequest) -> UserRegisterResponse:
         "hashed_password": hashed_password,
         "address": user_data.address,
         "area": user_data.area,
+        "location_key": normalize_location(user_data.area),
         "created_at": datetime.utcnow()
     }
     
@@ -88,35 +90,13 @@ async def register_user(user_data: UserRegisterRequest) -> UserRegisterResponse:
     )
 
 async def get_user_by_email(email: str) -> Optional[dict]:
-    """Get user by email from MongoDB."""
-    db = get_database()
-    users_collection = db["users"]
-    
-    email_lower = email.lower()
-    user = await users_collection.find_one({"email": email_lower})
-    
-    if user:
-        # Convert ObjectId to string for JSON serialization
-        user["id"] = str(user["_id"])
-        user.pop("_id", None)
-        # Don't return hashed_password in normal queries
-        user.pop("hashed_password", None)
-    
-    return user
+    """Get user by email from MongoDB (without the password hash)."""
+    return await users_repo.get_profile_by_email(email)
 
 async def get_user_by_id(user_id: str) -> Optional[dict]:
-    """Get user by ID from MongoDB."""
-    db = get_database()
-    users_collection = db["users"]
-    
+    """Get user by ID from MongoDB (without the password hash)."""
     try:
-        user = await users_collection.find_one({"_id": ObjectId(user_id)})
-        if user:
-            user["id"] = str(user["_id"])
-            user.pop("_id", None)
-            # Don't return hashed_password in normal queries
-            user.pop("hashed_password", None)
-        return user
+        return await users_repo.get_profile(user_id)
     except Exception as e:
         logger.error(f"Error getting user by ID: {str(e)}")
         return None
@@ -124,11 +104,8 @@ async def get_user_by_id(user_id: str) -> Optional[dict]:
 async def login_user(user_data: UserLoginRequest) -> UserLoginResponse:
   
     
-    db = get_database()
-    users_collection = db["users"]
-    
     email_lower = user_data.email.lower()
-    user = await users_collection.find_one({"email": email_lower})
+    user = await users_repo.get_credentials(email_lower)
     
     if not user:
         logger.warning(f"Login attempt with non-existent email: {email_lower}")
@@ -149,15 +126,7 @@ async def login_user(user_data: UserLoginRequest) -> UserLoginResponse:
     )
 
 async def get_user_area(user_id: str) -> str | None:
-    db = get_database()
-    users = db["users"]
-
-    user = await users.find_one(
-        {"_id": ObjectId(user_id)},
-        {"area": 1}
-    )
-
-    return user.get("area") if user else None
+    return await users_repo.get_area(user_id)
 
 
 async def update_user_profile(user_id: str, profile_data: UserProfileUpdateRequest) -> UserProfileUpdateResponse:
@@ -173,7 +142,7 @@ async def update_user_profile(user_id: str, profile_data: UserProfileUpdateReque
             raise ValueError("Invalid user ID format")
         
         # Check if user exists
-        user = await users_collection.find_one({"_id": object_id})
+        user = await users_collection.find_one({"_id": object_id}, {"_id": 1})
         if not user:
             raise ValueError("User not found")
         
@@ -2,17 +2,25 @@ import base64
 import io
 import numpy as np
 from PIL import Image
-from typing import Tuple, Optional
+from typing import AsyncIterator, List, Tuple, Optional
 from pathlib import Path
-from core.constants import WasteType, FitStatus
+from core.constants import WasteType, FitStatus, IMAGE_CLASS_MAPPING, TEXT_CLASS_MAPPING
 from core.config import get_settings
+from core.cache import TTLCache
+from services.image_cache import ImageClassificationCache, dhash
+from services.inference import load_backend
+from services.technique_table import TechniqueLookupTable
+from services.workflow_cache import WorkflowCache
+from services.tip_catalog import TipCatalog
+from services.tip_feedback import TipFeedbackWriter
 import logging
 import os
 import requests
 import warnings
-import pandas as pd
 import joblib
-from groq import Groq
+from groq import AsyncGroq
+import httpx
+import asyncio
 import numpy as np
 import tensorflow as tf
 from typing import Tuple
@@ -33,11 +41,33 @@ import tensorflow_hub as hub
 
 logger = logging.getLogger(__name__)
 
+LLM_MODEL = "llama-3.1-8b-instant"
+
 class WasteClassifier:
     
     def __init__(self):
         print(" Initializing WasteClassifier...")
         logger.info("Initializing WasteClassifier...")
+        settings = get_settings()
+        self.llm = None
+        self.image_cache = ImageClassificationCache(
+            maxsize=settings.image_cache_size,
+            ttl_seconds=settings.image_cache_ttl_seconds,
+            max_distance=settings.image_cache_max_distance,
+            shared=settings.image_cache_shared
+        )
+        self.workflow_cache = WorkflowCache(
+            maxsize=settings.workflow_cache_size,
+            ttl_seconds=settings.workflow_cache_ttl_seconds
+        )
+        self.tip_catalog = TipCatalog(refresh_seconds=settings.tip_catalog_refresh_seconds)
+        self.tip_feedback = TipFeedbackWriter(
+            batch_size=settings.tip_feedback_batch_size,
+            flush_interval_seconds=settings.tip_feedback_flush_seconds,
+            on_scores=self.tip_catalog.update_weights
+        )
+        self.text_result_cache = TTLCache(maxsize=settings.text_cache_size, ttl_seconds=settings.text_cache_ttl_seconds)
+        self.embedding_cache = TTLCache(maxsize=settings.text_cache_size, ttl_seconds=None)
         try:
             current_dir = Path(__file__).parent  
             model_dir = current_dir.parent / "model"  
@@ -47,18 +77,18 @@ class WasteClassifier:
             print(f"Loading CNN model from: {model_path_str}")
             logger.info(f"Loading model from: {model_path_str}")
             
-            self.model = tf.keras.models.load_model(model_path_str)
+            self.model = load_backend(model_path, settings.classifier_backend, settings.tflite_num_threads)
             self.model_loaded = True
-            print("CNN model loaded successfully")
+            print(f"CNN model loaded successfully ({self.model.name} backend)")
             logger.info("CNN model loaded successfully")
 
             # Load text model with separate error handling
             text_model_path = model_dir / "model_functional_text.keras"
             text_model_path_str = str(text_model_path.resolve())
             print(f"Loading text model from: {text_model_path_str}")
-            self.text_model = tf.keras.models.load_model(text_model_path_str)
+            self.text_model = load_backend(text_model_path, settings.classifier_backend, settings.tflite_num_threads)
             self.text_model_loaded = True
-            print("Text model loaded successfully")
+            print(f"Text model loaded successfully ({self.text_model.name} backend)")
 
             self.text_embedder = hub.load(
                 "https://tfhub.dev/google/universal-sentence-encoder/4"
@@ -71,38 +101,25 @@ class WasteClassifier:
             encoder_path = model_dir / "technique_encoder.pkl"
             label_encoder_path = model_dir / "technique_label_encoder.pkl"
             categorical_columns_path = model_dir / "technique_feature_columns.pkl"
-            
+            technique_sources = [xgboost_model_path, encoder_path, label_encoder_path, categorical_columns_path]
+            technique_mtime = max(p.stat().st_mtime for p in technique_sources)
+
             self.xgboost_model = joblib.load(str(xgboost_model_path))
             self.encoder = joblib.load(str(encoder_path))
             self.label_encoder = joblib.load(str(label_encoder_path))
             self.categorical_columns = joblib.load(str(categorical_columns_path))
             print("XGBoost model and encoders loaded successfully")
 
+            self.technique_table = TechniqueLookupTable(
+                self.xgboost_model, self.encoder, self.label_encoder, self.categorical_columns,
+                table_path=model_dir / "technique_lookup.pkl",
+                source_paths=technique_sources, loaded_mtime=technique_mtime
+            )
+            self.technique_table.load()
 
-            self.text_class_mapping = {
-                0: WasteType.CLOTHES,
-                1: WasteType.E_WASTE,
-                2: WasteType.GLASS,
-                3: WasteType.PHARMACEUTICAL,
-                4: WasteType.METAL,
-                5: WasteType.ORGANIC,
-                6: WasteType.PAPER,
-                7: WasteType.PLASTIC,
-                8: WasteType.UNKNOWN,
-            }
 
-            self.image_class_mapping = {
-                0: WasteType.BATTERIES,
-                1: WasteType.CLOTHES,
-                2: WasteType.E_WASTE,
-                3: WasteType.GLASS,
-                4: WasteType.LIGHT_BULBS,
-                5: WasteType.METAL,
-                6: WasteType.ORGANIC,
-                7: WasteType.OTHER,
-                8: WasteType.PAPER,
-                9: WasteType.PLASTIC
-            }
+            self.text_class_mapping = TEXT_CLASS_MAPPING
+            self.image_class_mapping = IMAGE_CLASS_MAPPING
             
             # ESP32 configuration
             self.esp32_ip = os.getenv("ESP32_IP", "192.168.43.168")
@@ -110,9 +127,20 @@ class WasteClassifier:
             self.esp32_timeout = int(os.getenv("ESP32_TIMEOUT", "5"))
             
             # Initialize Groq LLM
-            settings = get_settings()
             if settings.llm_key:
-                self.llm = Groq(api_key=settings.llm_key)
+                # Async client with a pooled HTTP connection so LLM calls never block the event loop
+                self.llm = AsyncGroq(
+                    api_key=settings.llm_key,
+                    timeout=settings.llm_timeout_seconds,
+                    max_retries=1,
+                    http_client=httpx.AsyncClient(
+                        timeout=settings.llm_timeout_seconds,
+                        limits=httpx.Limits(
+                            max_connections=settings.llm_max_connections,
+                            max_keepalive_connections=settings.llm_max_connections
+                        )
+                    )
+                )
                 print("Groq LLM initialized successfully")
             else:
                 self.llm = None
@@ -149,6 +177,17 @@ class WasteClassifier:
             self.esp32_url = f"http://{self.esp32_ip}/distance"
             self.esp32_timeout = int(os.getenv("ESP32_TIMEOUT", "5"))
     
+    def _open_image(self, source) -> Image.Image:
+        """
+        Open an image from a binary file-like object without reading it fully.
+        JPEGs are decoded at a reduced scale close to the model input size.
+        """
+        pil_image = Image.open(source)
+        # draft() lets the JPEG decoder downscale by 1/2..1/8 while decoding, so a
+        # 12 MP phone photo is never materialised at full resolution (no-op for PNG etc.)
+        pil_image.draft('RGB', self.input_size)
+        return pil_image
+
     def _preprocess_image(self, pil_image: Image.Image) -> np.ndarray:
    
         if pil_image.mode != 'RGB':
@@ -178,11 +217,32 @@ class WasteClassifier:
         
         try:
             image_bytes = base64.b64decode(image_data)
-            pil_image = Image.open(io.BytesIO(image_bytes))
+        except Exception as e:
+            logger.error(f"Error decoding base64 image: {str(e)}")
+            return WasteType.OTHER, 0.5
+
+        return await self.classify_from_file(io.BytesIO(image_bytes))
+
+    async def classify_from_file(self, image_file) -> Tuple[WasteType, float]:
+        """Classify an image from a binary file-like object (e.g. a spooled upload)."""
+
+        if not self.model_loaded or self.model is None:
+            logger.warning("Model not loaded, falling back to default classification")
+            return WasteType.OTHER, 0.5
+
+        try:
+            pil_image = self._open_image(image_file)
+
+            # Re-scans of the same item hash to (nearly) the same value and skip the CNN
+            image_hash = dhash(pil_image)
+            cached = await self.image_cache.get(image_hash)
+            if cached is not None:
+                logger.info(f"Image cache hit ({image_hash:016x}): {cached[0]}, Confidence: {cached[1]:.2f}")
+                return cached
             
             processed_image = self._preprocess_image(pil_image)
             
-            predictions = self.model.predict(processed_image, verbose=0)
+            predictions = self.model.predict(processed_image)
             
             # Log all class probabilities
             logger.info("All class probabilities:")
@@ -197,6 +257,8 @@ class WasteClassifier:
             waste_type = self.image_class_mapping.get(predicted_class_idx, WasteType.OTHER)
             
             logger.info(f"Predicted class index: {predicted_class_idx}, Waste type: {waste_type}, Confidence: {confidence:.2f}")
+
+            await self.image_cache.set(image_hash, (waste_type, confidence))
             
             return waste_type, confidence
                 
@@ -246,6 +308,69 @@ class WasteClassifier:
     #         return WasteType.OTHER, 0.5
 
 
+    def _normalize_description(self, description: str) -> str:
+        """Result cache key: lower-cased with whitespace collapsed. The embedder gets the original text."""
+        return " ".join(description.lower().split())
+
+    def _embed_texts(self, texts: List[str]) -> np.ndarray:
+        """
+        Universal Sentence Encoder embeddings for texts as given. Cached rows are
+        reused; the rest are embedded in a single text_embedder(list) call.
+        """
+        rows = [self.embedding_cache.get(text) for text in texts]
+        missing = [text for text, row in zip(texts, rows) if row is None]
+        if missing:
+            embedded = self.text_embedder(missing).numpy()
+            fresh = dict(zip(missing, embedded))
+            for text, row in fresh.items():
+                self.embedding_cache.set(text, row)
+            rows = [row if row is not None else fresh[text] for text, row in zip(texts, rows)]
+        return np.stack(rows)
+
+    def _decide_text_class(self, p: np.ndarray) -> Tuple[WasteType, float]:
+        """Pick the class from one row of softmax probabilities, applying the reject rule."""
+        for idx in range(p.shape[0]):
+            waste_type = self.text_class_mapping.get(idx, None)
+            waste_type_str = waste_type.value if waste_type else "UNKNOWN"
+            logger.debug(f"  Class {idx:2d} ({waste_type_str:15s}): {float(p[idx]):.6f} ({float(p[idx])*100:.2f}%)")
+
+        top1_idx = int(np.argmax(p))
+        top1_prob = float(p[top1_idx])
+
+        top2_prob = float(np.partition(p, -2)[-2])
+        margin = top1_prob - top2_prob
+
+        conf_thresh = getattr(self, "text_conf_thresh", 0.60)
+        margin_thresh = getattr(self, "text_margin_thresh", 0.15)
+
+        reject = (top1_prob < conf_thresh) or (margin < margin_thresh)
+
+        unknown_idx = getattr(self, "text_unknown_class_idx", None)
+
+        if reject and unknown_idx is not None:
+            predicted_class_idx = int(unknown_idx)
+            confidence = top1_prob  
+        else:
+            predicted_class_idx = top1_idx
+            confidence = top1_prob
+
+        waste_type = self.text_class_mapping.get(predicted_class_idx, WasteType.OTHER)
+
+        logger.info(
+            f"Predicted idx: {predicted_class_idx}, Waste type: {waste_type}, "
+            f"conf={confidence:.3f}, margin={margin:.3f}, reject={reject}"
+        )
+
+        return waste_type, confidence
+
+    def _text_probabilities(self, texts: List[str]) -> np.ndarray:
+        """Temperature-scaled class probabilities for a batch of texts (blocking; run in a thread)."""
+        embeddings = self._embed_texts(texts)
+        logger.info(f"Embedding shape: {embeddings.shape}")
+        logits = self.text_model.predict(embeddings)
+        T = getattr(self, "text_temperature", 2.0)
+        return tf.nn.softmax(logits / T, axis=1).numpy()
+
     async def classify_from_text(self, description: str) -> Tuple[WasteType, float]:
 
         if not self.text_model_loaded or self.text_model is None:
@@ -256,56 +381,55 @@ class WasteClassifier:
             logger.warning("Text embedder not loaded, falling back to default classification")
             return WasteType.OTHER, 0.5
 
-        try:
-            embedding = self.text_embedder([description]).numpy()
-            logger.info(f"Embedding shape: {embedding.shape}")
-
-           
-            logits = self.text_model.predict(embedding, verbose=0)  
-
-            T = getattr(self, "text_temperature", 2.0)  
-            probs = tf.nn.softmax(logits / T, axis=1).numpy()       
-
-            logger.info("All class probabilities (text):")
-            for idx in range(probs.shape[1]):
-                prob = float(probs[0][idx])
-                waste_type = self.text_class_mapping.get(idx, None)
-                waste_type_str = waste_type.value if waste_type else "UNKNOWN"
-                logger.info(f"  Class {idx:2d} ({waste_type_str:15s}): {prob:.6f} ({prob*100:.2f}%)")
-
-            p = probs[0]
-            top1_idx = int(np.argmax(p))
-            top1_prob = float(p[top1_idx])
-
-            top2_prob = float(np.partition(p, -2)[-2])
-            margin = top1_prob - top2_prob
-
-            conf_thresh = getattr(self, "text_conf_thresh", 0.60)
-            margin_thresh = getattr(self, "text_margin_thresh", 0.15)
-
-            reject = (top1_prob < conf_thresh) or (margin < margin_thresh)
-
-            unknown_idx = getattr(self, "text_unknown_class_idx", None)
+        # classify_texts checks (and counts) the result cache once
+        results = await self.classify_texts([description])
+        return results[0]
 
-            if reject and unknown_idx is not None:
-                predicted_class_idx = int(unknown_idx)
-                confidence = top1_prob  
+    async def classify_texts(self, descriptions: List[str], batch_size: int = 256) -> List[Tuple[WasteType, float]]:
+        """
+        Bulk text classification (e.g. re-classifying historical descriptions).
+        Duplicates and cached descriptions are resolved without the models; the rest
+        are embedded and scored batch_size at a time, off the event loop.
+        """
+        if not self.text_model_loaded or self.text_model is None or \
+                not self.text_embedder_loaded or self.text_embedder is None:
+            logger.warning("Text model/embedder not loaded, falling back to default classification")
+            return [(WasteType.OTHER, 0.5) for _ in descriptions]
+
+        keys = [self._normalize_description(d) for d in descriptions]
+        # first original spelling per key; that is what gets embedded
+        originals = {}
+        for key, description in zip(keys, descriptions):
+            originals.setdefault(key, description)
+        resolved = {}
+        pending = []
+        for key in originals:
+            cached = self.text_result_cache.get(key)
+            if cached is not None:
+                resolved[key] = cached
             else:
-                predicted_class_idx = top1_idx
-                confidence = top1_prob
+                pending.append(key)
 
-            waste_type = self.text_class_mapping.get(predicted_class_idx, WasteType.OTHER)
+        for i in range(0, len(pending), batch_size):
+            batch = pending[i:i + batch_size]
+            try:
+                probs = await asyncio.to_thread(self._text_probabilities, [originals[key] for key in batch])
+                for key, row in zip(batch, probs):
+                    result = self._decide_text_class(row)
+                    self.text_result_cache.set(key, result)
+                    resolved[key] = result
+            except Exception as e:
+                logger.error(f"Error processing text with model: {str(e)}")
+                for key in batch:
+                    resolved[key] = (WasteType.OTHER, 0.5)
 
-            logger.info(
-                f"Predicted idx: {predicted_class_idx}, Waste type: {waste_type}, "
-                f"conf={confidence:.3f}, margin={margin:.3f}, reject={reject}"
-            )
+        return [resolved[key] for key in keys]
 
-            return waste_type, confidence
-
-        except Exception as e:
-            logger.error(f"Error processing text with model: {str(e)}")
-            return WasteType.OTHER, 0.5
+    def cache_stats(self) -> dict:
+        return {
+            "text_results": self.text_result_cache.stats(),
+            "text_embeddings": self.embedding_cache.stats(),
+        }
 
 
     async def volume_from_distance(self, distance: float) -> float:
@@ -351,23 +475,31 @@ class WasteClassifier:
             return FitStatus.PARTIAL_FIT
         else:
             return FitStatus.DOES_NOT_FIT
-    async def generate_tips(self, waste_type: WasteType, user_id: Optional[str] = None) -> Tuple[Optional[dict], str]:
+    async def _get_user_profile(self, user_id: Optional[str]) -> Optional[dict]:
+        if not user_id:
+            return None
+        try:
+            from repositories import users_repo
+            user_profile = await users_repo.get_tip_profile(user_id)
+            if user_profile:
+                logger.info(f"Fetched user profile for tips generation: {user_id}")
+            else:
+                logger.warning(f"User profile not found for user_id: {user_id}")
+            return user_profile
+        except Exception as e:
+            logger.error(f"Error fetching user profile: {str(e)}")
+            return None
+
+    async def _resolve_tip(self, waste_type: WasteType, user_id: Optional[str] = None) -> Tuple[Optional[dict], str]:
         """
-        Generate personalized tip based on waste type and user profile.
-        Returns tuple of (tip_data, technique)
+        Pick a tip for the user's predicted technique. The profile lookup and the
+        tip catalog freshness check do not depend on each other, so both run
+        concurrently; the technique and tip are then chosen in-process.
         """
-        # Get user profile if user_id is provided
-        user_profile = None
-        if user_id:
-            try:
-                from services.User_service import get_user_by_id
-                user_profile = await get_user_by_id(user_id)
-                if user_profile:
-                    logger.info(f"Fetched user profile for tips generation: {user_id}")
-                else:
-                    logger.warning(f"User profile not found for user_id: {user_id}")
-            except Exception as e:
-                logger.error(f"Error fetching user profile: {str(e)}")
+        user_profile, _ = await asyncio.gather(
+            self._get_user_profile(user_id),
+            self.tip_catalog.refresh()
+        )
         
         profile_data = {
             "has_compost_bin": user_profile.get("has_compost_bin", False) if user_profile else False,
@@ -383,41 +515,72 @@ class WasteClassifier:
         technique = self.get_technique(waste_type, profile_data)
         
         tip_data = await self._get_random_tip_from_db(waste_type, technique)
+        return tip_data, technique
 
-        tip_workflow = self.get_tip_from_llm(waste_type, technique, tip_data)
+    async def generate_tips(self, waste_type: WasteType, user_id: Optional[str] = None) -> Tuple[Optional[dict], str, Optional[str]]:
+        """
+        Generate personalized tip based on waste type and user profile.
+        Returns tuple of (tip_data, technique, tip_workflow)
+        """
+        tip_data, technique = await self._resolve_tip(waste_type, user_id)
+
+        tip_workflow = await self.get_tip_from_llm(waste_type, technique, tip_data) if tip_data else None
         
         return tip_data, technique, tip_workflow
 
+    async def stream_tips(self, waste_type: WasteType, user_id: Optional[str] = None) -> AsyncIterator[Tuple[str, dict]]:
+        """
+        Same flow as generate_tips, yielded as (event, data) pairs: the tip as soon
+        as the DB lookup finishes, then workflow text deltas from the LLM, then done.
+        """
+        tip_data, technique = await self._resolve_tip(waste_type, user_id)
+        yield "tip", {"technique": technique, **(tip_data or {})}
+
+        cached = await self.workflow_cache.get(waste_type.value, technique, tip_data) if tip_data else None
+        if cached is not None:
+            yield "workflow", {"delta": cached}
+        elif tip_data and self.llm:
+            try:
+                stream = await self.llm.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=self._workflow_messages(waste_type, technique, tip_data),
+                    stream=True
+                )
+                parts = []
+                async for chunk in stream:
+                    delta = chunk.choices[0].delta.content if chunk.choices else None
+                    if delta:
+                        parts.append(delta)
+                        yield "workflow", {"delta": delta}
+                if parts:
+                    await self.workflow_cache.set(waste_type.value, technique, tip_data, "".join(parts))
+            except Exception as e:
+                logger.error(f"Error streaming tip workflow from LLM: {str(e)}")
+                yield "error", {"message": "Workflow generation failed"}
+
+        yield "done", {}
+
     def get_technique(self, waste_type: WasteType, profile_data: dict) -> str:
         try:
             household_size_str = str(profile_data['household_size']).replace('+', '')
             household_size = int(household_size_str) if household_size_str.isdigit() else 3
             
-            input_data = pd.DataFrame({
-                'waste_type': [str(waste_type.value)],
-                'living_type': [str(profile_data['residence_type']).lower()],
-                'has_recycle_bin': ["Yes" if profile_data['has_recycling_bin'] else "No"],
-                'has_compost_bin': ["Yes" if profile_data['has_compost_bin'] else "No"],
-                'has_weekly_collection': ["Yes" if profile_data['has_weekly_collection'] else "No"],
-                'household_size': [household_size],
-                'waste_volume_per_week': [str(profile_data['waste_amount']).lower()]
-            })
-            
-            logger.info(f"Categorical columns expected: {self.categorical_columns}")
-            logger.info(f"Input data values: {input_data.iloc[0].to_dict()}")
-            
-            X_raw = input_data[self.categorical_columns]
+            input_data = {
+                'waste_type': str(waste_type.value),
+                'living_type': str(profile_data['residence_type']).lower(),
+                'has_recycle_bin': "Yes" if profile_data['has_recycling_bin'] else "No",
+                'has_compost_bin': "Yes" if profile_data['has_compost_bin'] else "No",
+                'has_weekly_collection': "Yes" if profile_data['has_weekly_collection'] else "No",
+                'household_size': household_size,
+                'waste_volume_per_week': str(profile_data['waste_amount']).lower()
+            }
             
-            X_raw_values = X_raw.astype(str).values
-
-            X_encoded = self.encoder.transform(X_raw_values)
+            logger.info(f"Input data values: {input_data}")
 
-            y_pred_int = self.xgboost_model.predict(X_encoded)
-            
-            predicted_label = self.label_encoder.inverse_transform(y_pred_int)[0]
+            # O(1) lookup in the precomputed table; unseen inputs fall back to the model once
+            predicted_label = self.technique_table.get(input_data)
             
             logger.info(f"Predicted technique: {predicted_label}")
-            print(f"Predicted technique: {predicted_label}")
             return predicted_label
             
         except Exception as e:
@@ -427,70 +590,82 @@ class WasteClassifier:
             # Return default technique on error
             return "recycle"
 
+    def regenerate_technique_table(self) -> int:
+        """Reload the retrained XGBoost technique model and encoders, then rebuild the lookup table."""
+        entries = self.technique_table.regenerate(reload=True)
+        self.xgboost_model = self.technique_table.xgboost_model
+        self.encoder = self.technique_table.encoder
+        self.label_encoder = self.technique_table.label_encoder
+        self.categorical_columns = self.technique_table.categorical_columns
+        return entries
+
 
     async def _get_random_tip_from_db(self, waste_type: WasteType, technique: str) -> Optional[dict]:
         """
-        Fetch a random tip from database based on waste type and technique.
+        Pick a random tip based on waste type and technique from the in-memory tip
+        catalog, weighted by each tip's feedback score.
         Returns tip data with tip_id, title, and description.
         """
         try:
-            from core.database import get_database
-            db = get_database()
-            tips_collection = db["tips"]
+            tip_data = await self.tip_catalog.random_tip(waste_type.value, technique)
             
-            # Query for matching tip with random selection using aggregation
-            pipeline = [
-                {"$match": {"waste_type": waste_type.value, "technique": technique}},
-                {"$sample": {"size": 1}}
-            ]
-            
-            cursor = tips_collection.aggregate(pipeline)
-            tip_docs = await cursor.to_list(length=1)
-            
-            if tip_docs:
-                tip_doc = tip_docs[0]
-                logger.info(f"Found tip: {tip_doc['_id']} for waste_type={waste_type.value}, technique={technique}")
-                return {
-                    "tip_id": tip_doc["_id"],
-                    "title": tip_doc.get("title", ""),
-                    "description": tip_doc.get("description", "")
-                }
+            if tip_data:
+                logger.info(f"Found tip: {tip_data['tip_id']} for waste_type={waste_type.value}, technique={technique}")
+                return tip_data
             
             logger.warning(f"No tip found for waste_type={waste_type.value}, technique={technique}")
             return None
             
         except Exception as e:
-            logger.error(f"Error fetching tip from database: {str(e)}")
+            logger.error(f"Error selecting tip: {str(e)}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
             return None
 
-    def get_tip_from_llm(self, waste_type: WasteType, technique: str, tip_data: dict) -> Optional[str]:
+    def _workflow_messages(self, waste_type: WasteType, technique: str, tip_data: dict) -> List[dict]:
+        prompt = (
+            f"Generate brief workflow steps for disposing {waste_type.value} waste using {technique} technique.\n"
+            f"Tip: {tip_data['title']} - {tip_data['description']}\n\n"
+            f"Rules:\n"
+            f"- Give only the steps to the user for the specific description of the tip.\n"
+            f"- Output ONLY numbered steps (1. 2. 3. etc)\n"
+            f"- Keep each step brief (sentences or brief paragraphs)\n"
+            f"- Maximum 5 steps\n"
+            f"- No introductions, headers, or extra text\n"
+            f"- Start directly with step 1"
+        )
+        return [
+            {"role": "system", "content": "You are a waste management expert. Give only brief numbered steps, nothing else."},
+            {"role": "user", "content": prompt}
+        ]
+
+    async def get_tip_from_llm(self, waste_type: WasteType, technique: str, tip_data: dict) -> Optional[str]:
+        cached = await self.workflow_cache.get(waste_type.value, technique, tip_data)
+        if cached is not None:
+            return cached
+        return await self.generate_workflow(waste_type, technique, tip_data)
+
+    async def generate_workflow(self, waste_type: WasteType, technique: str, tip_data: dict) -> Optional[str]:
+        """Ask the LLM for the tip's workflow and cache it, without a cache lookup first."""
         if not self.llm:
             logger.warning("LLM not configured, skipping workflow generation")
             return None
         try:
-            prompt = (
-                f"Generate brief workflow steps for disposing {waste_type.value} waste using {technique} technique.\n"
-                f"Tip: {tip_data['title']} - {tip_data['description']}\n\n"
-                f"Rules:\n"
-                f"- Give only the steps to the user for the specific description of the tip.\n"
-                f"- Output ONLY numbered steps (1. 2. 3. etc)\n"
-                f"- Keep each step brief (sentences or brief paragraphs)\n"
-                f"- Maximum 5 steps\n"
-                f"- No introductions, headers, or extra text\n"
-                f"- Start directly with step 1"
-            )
-            response = self.llm.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": "You are a waste management expert. Give only brief numbered steps, nothing else."},
-                    {"role": "user", "content": prompt}
-                ]
+            response = await self.llm.chat.completions.create(
+                model=LLM_MODEL,
+                messages=self._workflow_messages(waste_type, technique, tip_data)
             )
-            return response.choices[0].message.content
+            workflow = response.choices[0].message.content
+            if workflow:
+                await self.workflow_cache.set(waste_type.value, technique, tip_data, workflow)
+            return workflow
         except Exception as e:
             logger.error(f"Error generating tip from LLM: {str(e)}")
             import traceback
             logger.error(f"Traceback: {traceback.format_exc()}")
-            return None
\ No newline at end of file
+            return None
+
+    async def close(self) -> None:
+        await self.tip_feedback.stop()
+        if self.llm:
+            await self.llm.close()
@@ -0,0 +1,138 @@
+"""
+Weekly waste history of one household and waste type, as parallel NumPy arrays.
+
+`history_col` documents store the history as three parallel arrays,
+`years`, `week_numbers` and `weights` (format 2), instead of one dict per week
+holding its own lag/rolling/behaviour fields. Those derived fields are computed
+on demand here, vectorized, exactly as the routes used to compute them in
+Python loops. Documents still in the old `weeks` layout are read transparently;
+jobs/migrate_history_arrays.py converts them.
+"""
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from core.constants import BEHAVIOUR_THRESHOLDS, BEHAVIOUR_CLASSES
+
+HISTORY_FORMAT = 2
+# The window every writer keeps and the LSTM consumes
+MAX_WEEKS = 12
+FEATURE_KEYS = ['lag_1w', 'lag_2w', 'lag_4w', 'roll_4w', 'roll_8w', 'roll_12w', 'week']
+LAGS = {"lag_1w": 1, "lag_2w": 2, "lag_4w": 4}
+ROLLS = {"roll_4w": 4, "roll_8w": 8, "roll_12w": 12}
+# Fields to project when reading either layout
+HISTORY_PROJECTION = {"years": 1, "week_numbers": 1, "weights": 1, "weeks": 1}
+
+
+def next_week(year: int, week: int) -> Tuple[int, int]:
+    """The week after (year, week), rolling over after week 52 like the rest of the app."""
+    return (year, week + 1) if week < 52 else (year + 1, 1)
+
+
+class HouseholdHistory:
+    """Immutable, (year, week)-sorted weekly weights with vectorized derived features."""
+
+    def __init__(self, years: Iterable[int] = (), week_numbers: Iterable[int] = (), weights: Iterable[float] = ()):
+        years = np.asarray(list(years), dtype=np.int32)
+        week_numbers = np.asarray(list(week_numbers), dtype=np.int32)
+        weights = np.asarray(list(weights), dtype=np.float64)
+        order = np.lexsort((week_numbers, years))
+        self.years, self.week_numbers, self.weights = years[order], week_numbers[order], weights[order]
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[dict]) -> "HouseholdHistory":
+        """From dicts with year, week and weight_kg; a repeated (year, week) keeps the last one."""
+        latest = {(int(e["year"]), int(e["week"])): float(e.get("weight_kg", 0.0)) for e in entries}
+        return cls([k[0] for k in latest], [k[1] for k in latest], latest.values())
+
+    @classmethod
+    def from_document(cls, doc: Optional[dict]) -> "HouseholdHistory":
+        """From a history_col document in either layout (both, for documents written mid-migration)."""
+        if not doc:
+            return cls()
+        entries = list(doc.get("weeks") or [])
+        entries += [{"year": y, "week": w, "weight_kg": kg}
+                    for y, w, kg in zip(doc.get("years", []), doc.get("week_numbers", []), doc.get("weights", []))]
+        return cls.from_entries(entries)
+
+    def to_document(self) -> dict:
+        return {
+            "format": HISTORY_FORMAT,
+            "years": self.years.tolist(),
+            "week_numbers": self.week_numbers.tolist(),
+            "weights": self.weights.tolist(),
+        }
+
+    def __len__(self) -> int:
+        return len(self.weights)
+
+    @property
+    def last_week(self) -> Optional[Tuple[int, int]]:
+        return (int(self.years[-1]), int(self.week_numbers[-1])) if len(self) else None
+
+    def next_week(self) -> Optional[Tuple[int, int]]:
+        return next_week(*self.last_week) if len(self) else None
+
+    def tail(self, n: int = MAX_WEEKS) -> "HouseholdHistory":
+        n = min(n, len(self))
+        return HouseholdHistory(self.years[len(self) - n:], self.week_numbers[len(self) - n:],
+                                self.weights[len(self) - n:])
+
+    def append(self, year: int, week: int, weight_kg: float, keep: Optional[int] = MAX_WEEKS) -> "HouseholdHistory":
+        """A new history with the week added (replacing the same week if present), trimmed to `keep`."""
+        merged = dict(zip(zip(self.years.tolist(), self.week_numbers.tolist()), self.weights.tolist()))
+        merged[(int(year), int(week))] = float(weight_kg)
+        history = HouseholdHistory([k[0] for k in merged], [k[1] for k in merged], merged.values())
+        return history.tail(keep) if keep else history
+
+    def features(self) -> Dict[str, np.ndarray]:
+        """
+        Per-week lags (0 before the first week) and rolling means over the weeks
+        available so far (a 4-week mean of week 2 divides by 2), rolling means
+        rounded to 2 decimals as they were stored.
+        """
+        w = self.weights
+        n = len(w)
+        idx = np.arange(n)
+        result = {}
+        for name, lag in LAGS.items():
+            lagged = np.zeros(n)
+            lagged[lag:] = w[:n - lag] if n > lag else []
+            result[name] = lagged
+        csum = np.concatenate(([0.0], np.cumsum(w)))
+        for name, window in ROLLS.items():
+            start = np.maximum(0, idx - window + 1)
+            result[name] = np.round((csum[idx + 1] - csum[start]) / np.minimum(idx + 1, window), 2)
+        result["week"] = self.week_numbers.astype(np.float64)
+        return result
+
+    def behaviour_classes(self, waste_type: str) -> List[str]:
+        thresholds = BEHAVIOUR_THRESHOLDS.get(waste_type)
+        if thresholds is None:
+            return ["Unknown"] * len(self)
+        return [BEHAVIOUR_CLASSES[i] for i in np.searchsorted(thresholds, self.weights, side="left")]
+
+    def feature_matrix(self, seq_len: int = MAX_WEEKS) -> Optional[np.ndarray]:
+        """
+        The (seq_len, len(FEATURE_KEYS)) LSTM input: the features of the last
+        `seq_len` weeks, computed over the whole history. None with fewer weeks.
+        """
+        if len(self) < seq_len:
+            return None
+        features = self.features()
+        return np.column_stack([features[key] for key in FEATURE_KEYS])[-seq_len:]
+
+    def entries(self, waste_type: str) -> List[dict]:
+        """The history in the old per-week dict layout, for API responses."""
+        features = self.features()
+        behaviours = self.behaviour_classes(waste_type)
+        return [
+            {
+                "year": int(self.years[i]),
+                "week": int(self.week_numbers[i]),
+                "weight_kg": float(self.weights[i]),
+                **{key: float(features[key][i]) for key in list(LAGS) + list(ROLLS)},
+                "behaviour_class": behaviours[i],
+            }
+            for i in range(len(self))
+        ]
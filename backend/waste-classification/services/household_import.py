@@ -0,0 +1,362 @@
+"""
+Bulk household onboarding from CSV or NDJSON.
+
+POST /create_user takes one household with its 12+ weeks of history per waste
+type. Municipal onboarding loads tens of thousands at once, so this module does
+the same in bulk: the file is parsed into one row per (household, waste type,
+week), validated with column-wise pandas masks, deduplicated and sorted once,
+and split into history arrays with NumPy group boundaries. Households are
+written in chunks (insert_many, ordered=False) with one transaction per chunk,
+so a chunk lands completely or not at all; without transaction support the
+chunk is written directly and the histories of households that failed to
+insert are skipped.
+
+Input rows (CSV columns or NDJSON objects):
+  household_id, email, income_tier, qr_code, location, waste_type, year, week, weight_kg
+household_id may be empty when location is given; an ID is then allocated from
+the location's counter. An NDJSON line may also be a /create_user body
+(household_id, email, income_tier, qr_code, waste_data: {type: [weeks]}).
+"""
+import asyncio
+import io
+import json
+import logging
+import time
+from datetime import datetime
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError, OperationFailure
+
+from core.config import get_settings
+from core.constants import household_location, id_suffix, location_counter_id, normalize_location
+from core.database import get_database, TRANSACTIONS_UNSUPPORTED_CODES
+from repositories import households_repo
+from services.household_history import HISTORY_FORMAT
+from services.sequences import sequences
+
+logger = logging.getLogger(__name__)
+
+WASTE_TYPES = ["Organic", "Recyclable", "Inorganic"]
+MIN_WEEKS = 12
+TEXT_COLUMNS = ["household_id", "email", "income_tier", "qr_code", "location", "waste_type"]
+NUMERIC_COLUMNS = ["year", "week", "weight_kg"]
+REQUIRED_COLUMNS = ["email", "income_tier", "waste_type", "year", "week", "weight_kg"]
+WEEK_KEY = ["_key", "waste_type", "year", "week"]
+# Rejections listed in the response; the count is always complete
+MAX_REPORTED_REJECTIONS = 1000
+
+
+def parse_csv(data: bytes) -> pd.DataFrame:
+    try:
+        return pd.read_csv(io.BytesIO(data), dtype=str, keep_default_na=False, skipinitialspace=True)
+    except (pd.errors.ParserError, pd.errors.EmptyDataError, UnicodeDecodeError) as e:
+        raise ValueError(f"Invalid CSV: {str(e)}") from e
+
+
+def parse_ndjson(data: bytes) -> pd.DataFrame:
+    rows = []
+    for line_no, line in enumerate(data.decode("utf-8", errors="replace").splitlines(), start=1):
+        if not line.strip():
+            continue
+        try:
+            record = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise ValueError(f"Invalid JSON on line {line_no}: {e.msg}") from e
+        if not isinstance(record, dict):
+            raise ValueError(f"Line {line_no} is not a JSON object")
+        waste_data = record.pop("waste_data", None)
+        if isinstance(waste_data, dict):
+            rows.extend({**record, "waste_type": wtype, **week}
+                        for wtype, weeks in waste_data.items() for week in weeks or [] if isinstance(week, dict))
+        else:
+            rows.append(record)
+    return pd.DataFrame(rows)
+
+
+def parse(data: bytes, fmt: str) -> pd.DataFrame:
+    if fmt == "csv":
+        return parse_csv(data)
+    if fmt == "ndjson":
+        return parse_ndjson(data)
+    raise ValueError(f"Unsupported format: {fmt} (expected csv or ndjson)")
+
+
+def detect_format(filename: Optional[str], content_type: Optional[str] = None) -> str:
+    name = (filename or "").lower()
+    if name.endswith((".ndjson", ".jsonl", ".json")) or "json" in (content_type or ""):
+        return "ndjson"
+    return "csv"
+
+
+def _normalize(frame: pd.DataFrame) -> pd.DataFrame:
+    missing = [c for c in REQUIRED_COLUMNS if c not in frame.columns]
+    if "household_id" not in frame.columns and "location" not in frame.columns:
+        missing.append("household_id or location")
+    if missing:
+        raise ValueError(f"Missing columns: {', '.join(missing)}")
+
+    frame = frame.reindex(columns=TEXT_COLUMNS + NUMERIC_COLUMNS)
+    for column in TEXT_COLUMNS:
+        frame[column] = frame[column].fillna("").astype(str).str.strip()
+    frame["email"] = frame["email"].str.lower()
+    for column in NUMERIC_COLUMNS:
+        frame[column] = pd.to_numeric(frame[column], errors="coerce")
+    # Rows without an ID are grouped by email, which is one household either way
+    frame["_key"] = frame["household_id"].where(frame["household_id"] != "", "email:" + frame["email"])
+    frame["_row"] = np.arange(len(frame))
+    return frame
+
+
+def _row_errors(frame: pd.DataFrame) -> pd.Series:
+    """First problem of every row (None for valid rows), evaluated column-wise."""
+    year, week, weight = frame["year"], frame["week"], frame["weight_kg"]
+    checks = [
+        (~frame["email"].str.contains("@", regex=False), "Invalid email"),
+        (frame["income_tier"] == "", "Missing income_tier"),
+        ((frame["household_id"] == "") & (frame["location"] == ""), "Missing household_id or location"),
+        (year.isna() | (year % 1 != 0) | (year < 2000) | (year > 2100), "Invalid year"),
+        (week.isna() | (week % 1 != 0) | (week < 1) | (week > 53), "Invalid week"),
+        (weight.isna() | (weight < 0) | ~np.isfinite(weight.fillna(0)), "Invalid weight_kg"),
+    ]
+    errors = pd.Series(None, index=frame.index, dtype=object)
+    for mask, reason in checks:
+        errors = errors.mask(errors.isna() & mask, reason)
+    return errors
+
+
+def validate(frame: pd.DataFrame) -> Tuple[pd.DataFrame, Dict[str, str], int]:
+    """
+    Valid week rows, deduplicated (a repeated week keeps the last row) and sorted
+    by household, waste type and week; {household key: reason} for every rejected
+    household; and the number of households in the input. One bad row rejects
+    its whole household, like /create_user.
+    """
+    frame = _normalize(frame)
+    received = int(frame["_key"].nunique())
+    rejected: Dict[str, str] = {}
+
+    def reject(keys: pd.Series, reasons) -> None:
+        for key, reason in zip(keys, reasons if not isinstance(reasons, str) else [reasons] * len(keys)):
+            rejected.setdefault(key, reason)
+
+    errors = _row_errors(frame)
+    bad = frame.loc[errors.notna(), "_key"]
+    first_error = errors[errors.notna()].groupby(bad).first()
+    reject(first_error.index, first_error.values)
+
+    profiles = frame.groupby("_key", sort=False).agg(
+        emails=("email", "nunique"), tiers=("income_tier", "nunique"), email=("email", "first")
+    )
+    reject(profiles.index[profiles["emails"] > 1], "Conflicting emails for one household")
+    reject(profiles.index[profiles["tiers"] > 1], "Conflicting income_tier for one household")
+    profiles = profiles[~profiles.index.isin(list(rejected))]
+    email_taken = profiles["email"].duplicated(keep="first")
+    reject(profiles.index[email_taken], "Email is linked to another household in this import")
+    remaining = profiles.index[~email_taken]
+
+    # Other waste types are ignored, as /create_user does
+    frame = frame[frame["waste_type"].isin(WASTE_TYPES) & frame["_key"].isin(remaining)]
+    frame = frame.sort_values(WEEK_KEY + ["_row"], kind="stable").drop_duplicates(WEEK_KEY, keep="last")
+
+    counts = frame.groupby(["_key", "waste_type"]).size().unstack(fill_value=0)
+    counts = counts.reindex(index=remaining, columns=WASTE_TYPES, fill_value=0)
+    short = counts < MIN_WEEKS
+    for wtype in WASTE_TYPES:
+        reject(counts.index[short[wtype]], f"Missing or insufficient history for {wtype}")
+    valid = frame[~frame["_key"].isin(list(rejected))]
+    return valid.astype({"year": int, "week": int, "weight_kg": float}), rejected, received
+
+
+def build_documents(rows: pd.DataFrame, ids: Dict[str, str], now) -> Tuple[List[dict], Dict[str, List[dict]]]:
+    """
+    households_col documents and, per household ID, its history_col documents.
+    `rows` must be validated (sorted by key, type and week); the histories are
+    cut out of the column arrays at the NumPy group boundaries.
+    """
+    keys = rows["_key"].to_numpy()
+    types = rows["waste_type"].to_numpy()
+    years = rows["year"].to_numpy()
+    weeks = rows["week"].to_numpy()
+    weights = rows["weight_kg"].to_numpy()
+
+    boundary = np.ones(len(rows), dtype=bool)
+    boundary[1:] = (keys[1:] != keys[:-1]) | (types[1:] != types[:-1])
+    starts = np.flatnonzero(boundary)
+    ends = np.append(starts[1:], len(rows))
+
+    histories: Dict[str, List[dict]] = {}
+    for start, end in zip(starts, ends):
+        household_id = ids[keys[start]]
+        histories.setdefault(household_id, []).append({
+            "household_id": household_id,
+            "waste_type": types[start],
+            "format": HISTORY_FORMAT,
+            "years": years[start:end].tolist(),
+            "week_numbers": weeks[start:end].tolist(),
+            "weights": weights[start:end].tolist(),
+        })
+
+    profiles = rows.drop_duplicates("_key")
+    households = [
+        {"_id": ids[key], "linked_email": email, "location": household_location(ids[key]),
+         "income_tier": tier, "qr_code": qr_code, "created_at": now}
+        for key, email, tier, qr_code in zip(profiles["_key"], profiles["email"],
+                                             profiles["income_tier"], profiles["qr_code"])
+    ]
+    return households, histories
+
+
+def _highest_suffixes(household_ids: Iterable[str]) -> Dict[str, int]:
+    """Highest HH-<location>-<seq> sequence per normalized location among the IDs."""
+    highest = {}
+    for household_id in household_ids:
+        location = household_location(household_id)
+        if location:
+            highest[location] = max(highest.get(location, 0), id_suffix(household_id, "-"))
+    return highest
+
+
+class HouseholdImporter:
+    """Validates and writes onboarding files; see the module docstring."""
+
+    def __init__(self, chunk_size: int = 500, database=None):
+        self.chunk_size = chunk_size
+        self._database = database
+        self.transactions_supported = True
+
+    @property
+    def database(self):
+        return self._database if self._database is not None else get_database()
+
+    async def _assign_ids(self, rows: pd.DataFrame) -> Dict[str, str]:
+        """
+        Household ID per key: the given one, or HH-<location>-<seq> from the location
+        counter. The counter is first raised past explicit IDs in the same file, so
+        allocated numbers cannot collide with them.
+        """
+        profiles = rows.drop_duplicates("_key")[["_key", "household_id", "location"]]
+        ids = {key: hid for key, hid in zip(profiles["_key"], profiles["household_id"]) if hid}
+        explicit = _highest_suffixes(ids.values())
+        pending = profiles[profiles["household_id"] == ""]
+        for location, group in pending.groupby("location"):
+            highest = explicit.get(normalize_location(location))
+            if highest:
+                # raising the counter skips allocate's seed, so fold the stored IDs in here
+                in_use = await households_repo.max_sequence(location)
+                await sequences.raise_to(location_counter_id("household", location), max(highest, in_use))
+            numbers = await sequences.allocate(location_counter_id("household", location), len(group),
+                                               seed=lambda: households_repo.max_sequence(location))
+            ids.update({key: f"HH-{location}-{seq:02d}" for key, seq in zip(group["_key"], numbers)})
+        return ids
+
+    async def _insert(self, households: List[dict], histories: List[dict], session=None) -> None:
+        await self.database.households_col.insert_many(households, ordered=False, session=session)
+        await self.database.history_col.insert_many(histories, ordered=False, session=session)
+
+    async def _insert_partial(self, households: List[dict], histories: Dict[str, List[dict]]) -> Dict[str, str]:
+        """Non-transactional path: histories are written only for households that inserted."""
+        failed = {}
+        try:
+            await self.database.households_col.insert_many(households, ordered=False)
+        except BulkWriteError as e:
+            for error in e.details.get("writeErrors", []):
+                household_id = households[error["index"]]["_id"]
+                failed[household_id] = ("Household ID or email already exists" if error.get("code") == 11000
+                                        else error.get("errmsg", "Insert failed"))
+        documents = [doc for hid, docs in histories.items() if hid not in failed for doc in docs]
+        if documents:
+            await self.database.history_col.insert_many(documents, ordered=False)
+        return failed
+
+    async def _write_chunk(self, households: List[dict], histories: Dict[str, List[dict]]) -> Dict[str, str]:
+        """Write one chunk; returns {household_id: reason} for households that were not imported."""
+        if self.transactions_supported:
+            documents = [doc for household in households for doc in histories[household["_id"]]]
+            try:
+                async with await self.database.client.start_session() as session:
+                    await session.with_transaction(lambda s: self._insert(households, documents, session=s))
+                return {}
+            except BulkWriteError:
+                # a household raced in after the pre-check; the chunk rolled back, retry it row by row
+                logger.info(f"Import chunk of {len(households)} hit a duplicate, retrying without a transaction")
+            except OperationFailure as e:
+                if e.code not in TRANSACTIONS_UNSUPPORTED_CODES:
+                    raise
+                self.transactions_supported = False
+                logger.warning("MongoDB transactions unavailable; importing households without a transaction")
+        return await self._insert_partial(households, histories)
+
+    async def run(self, frame: pd.DataFrame, dry_run: bool = False) -> dict:
+        """Validate and import parsed rows. Returns counts, rejections and per-phase timings."""
+        timings = {}
+        started = time.perf_counter()
+        # pandas/NumPy work runs off the event loop
+        rows, rejected, received = await asyncio.to_thread(validate, frame)
+        timings["validate_ms"] = round((time.perf_counter() - started) * 1000, 1)
+
+        phase = time.perf_counter()
+        profiles = rows.drop_duplicates("_key")
+        taken_ids, taken_emails = await households_repo.taken(
+            [hid for hid in profiles["household_id"] if hid], profiles["email"], database=self.database
+        )
+        for key, hid, email in zip(profiles["_key"], profiles["household_id"], profiles["email"]):
+            if hid in taken_ids:
+                rejected.setdefault(key, "Household ID already exists")
+            elif email in taken_emails:
+                rejected.setdefault(key, "User already has a household linked.")
+        rows = rows[~rows["_key"].isin(list(rejected))]
+        timings["precheck_ms"] = round((time.perf_counter() - phase) * 1000, 1)
+
+        imported, chunks = 0, 0
+        if not dry_run and len(rows):
+            phase = time.perf_counter()
+            ids = await self._assign_ids(rows)
+            households, histories = await asyncio.to_thread(build_documents, rows, ids, datetime.utcnow())
+            timings["build_ms"] = round((time.perf_counter() - phase) * 1000, 1)
+
+            phase = time.perf_counter()
+            key_by_id = {hid: key for key, hid in ids.items()}
+            for start in range(0, len(households), self.chunk_size):
+                chunk = households[start:start + self.chunk_size]
+                failed = await self._write_chunk(chunk, {h["_id"]: histories[h["_id"]] for h in chunk})
+                for hid, reason in failed.items():
+                    rejected.setdefault(key_by_id.get(hid, hid), reason)
+                imported += len(chunk) - len(failed)
+                chunks += 1
+            timings["write_ms"] = round((time.perf_counter() - phase) * 1000, 1)
+            await self._reserve_counters([h["_id"] for h in households])
+
+        elapsed = time.perf_counter() - started
+        timings["total_ms"] = round(elapsed * 1000, 1)
+        valid = int(rows["_key"].nunique())
+        logger.info(f"Household import: {received} received, {valid} valid, {imported} imported, "
+                    f"{len(rejected)} rejected in {timings['total_ms']} ms")
+        return {
+            "dry_run": dry_run,
+            "received": received,
+            "valid": valid,
+            "imported": imported,
+            "rejected_count": len(rejected),
+            "rejected": [{"household": key.replace("email:", "", 1), "reason": reason}
+                         for key, reason in list(rejected.items())[:MAX_REPORTED_REJECTIONS]],
+            "chunks": chunks,
+            "transactions": self.transactions_supported,
+            "timings_ms": timings,
+            "households_per_second": round(imported / elapsed, 1) if imported and elapsed else 0.0,
+        }
+
+    async def _reserve_counters(self, household_ids: List[str]) -> None:
+        """Keep each location counter ahead of imported IDs chosen outside the counter."""
+        highest = _highest_suffixes(household_ids)
+        if highest:
+            await self.database.counters.bulk_write([
+                UpdateOne({"_id": location_counter_id("household", location)},
+                          {"$max": {"sequence_value": value}}, upsert=True)
+                for location, value in highest.items()
+            ], ordered=False)
+
+
+household_importer = HouseholdImporter(chunk_size=get_settings().household_import_chunk_size)
@@ -0,0 +1,148 @@
+import logging
+from datetime import datetime
+from typing import Optional, Tuple
+
+import numpy as np
+from PIL import Image
+
+from core.cache import TTLCache
+from core.constants import WasteType
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+SHARED_CACHE_COLLECTION = "image_classification_cache"
+HASH_BITS = 64
+BAND_BITS = 16
+BAND_COUNT = HASH_BITS // BAND_BITS
+
+
+def dhash(pil_image: Image.Image, hash_size: int = 8) -> int:
+    """
+    64-bit difference hash: compares neighbouring pixels of a 9x8 grayscale thumbnail.
+    Robust to re-encoding, small crops and lighting changes between repeated scans.
+    """
+    thumb = pil_image.convert('L').resize((hash_size + 1, hash_size), Image.Resampling.BILINEAR)
+    pixels = np.asarray(thumb, dtype=np.int16)
+    diff = pixels[:, 1:] > pixels[:, :-1]
+    return int.from_bytes(np.packbits(diff).tobytes(), 'big')
+
+
+def hamming_distance(a: int, b: int) -> int:
+    return (a ^ b).bit_count()
+
+
+def hash_bands(image_hash: int) -> list:
+    """
+    Split the hash into 16-bit bands tagged with their position. Two hashes within
+    Hamming distance < BAND_COUNT share at least one band, so the shared tier can
+    find near-duplicates with an indexed $in query.
+    """
+    mask = (1 << BAND_BITS) - 1
+    return [(i << BAND_BITS) | ((image_hash >> (i * BAND_BITS)) & mask) for i in range(BAND_COUNT)]
+
+
+class ImageClassificationCache:
+    """
+    Near-duplicate cache for CNN results keyed by perceptual hash.
+    Tier 1 is an in-process LRU with TTL; tier 2 (optional) is a MongoDB
+    collection shared by all workers, expired by a TTL index.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl_seconds: int = 3600,
+                 max_distance: int = 4, shared: bool = False):
+        self.memory = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.max_distance = min(max_distance, BAND_COUNT - 1)
+        self.shared = shared
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    def _lookup_memory(self, image_hash: int) -> Optional[Tuple[WasteType, float]]:
+        result = self.memory.get(image_hash)
+        if result is not None:
+            return result
+        best = None
+        for key, value in self.memory.items():
+            distance = hamming_distance(key, image_hash)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, value)
+        return best[1] if best else None
+
+    async def _lookup_shared(self, image_hash: int) -> Optional[Tuple[WasteType, float]]:
+        db = get_database()
+        if db is None:
+            return None
+        cursor = db[SHARED_CACHE_COLLECTION].find(
+            {"bands": {"$in": hash_bands(image_hash)}},
+            {"_id": 1, "waste_type": 1, "confidence": 1}
+        ).limit(32)
+        best = None
+        async for doc in cursor:
+            distance = hamming_distance(int(doc["_id"], 16), image_hash)
+            if distance <= self.max_distance and (best is None or distance < best[0]):
+                best = (distance, (WasteType(doc["waste_type"]), float(doc["confidence"])))
+        return best[1] if best else None
+
+    async def get(self, image_hash: int) -> Optional[Tuple[WasteType, float]]:
+        result = self._lookup_memory(image_hash)
+        if result is not None:
+            self.memory_hits += 1
+            return result
+
+        if self.shared:
+            try:
+                result = await self._lookup_shared(image_hash)
+            except Exception as e:
+                logger.warning(f"Shared image cache lookup failed: {str(e)}")
+                result = None
+            if result is not None:
+                self.shared_hits += 1
+                self.memory.set(image_hash, result)
+                return result
+
+        self.misses += 1
+        return None
+
+    async def set(self, image_hash: int, result: Tuple[WasteType, float]) -> None:
+        self.memory.set(image_hash, result)
+        if not self.shared:
+            return
+        try:
+            db = get_database()
+            if db is None:
+                return
+            waste_type, confidence = result
+            await db[SHARED_CACHE_COLLECTION].update_one(
+                {"_id": f"{image_hash:016x}"},
+                {"$set": {
+                    "bands": hash_bands(image_hash),
+                    "waste_type": waste_type.value,
+                    "confidence": float(confidence),
+                    "created_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Shared image cache write failed: {str(e)}")
+
+    async def ensure_indexes(self) -> None:
+        if not self.shared:
+            return
+        db = get_database()
+        coll = db[SHARED_CACHE_COLLECTION]
+        await coll.create_index("bands")
+        await coll.create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.shared_hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.shared_hits) / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self.memory),
+            "shared_tier": self.shared,
+        }
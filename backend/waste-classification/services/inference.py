@@ -0,0 +1,146 @@
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+import tensorflow as tf
+
+logger = logging.getLogger(__name__)
+
+# "keras" runs the model through a traced tf.function; "keras_predict" is the
+# plain model.predict path, kept as the benchmark baseline.
+BACKENDS = ("keras", "keras_predict", "tflite", "tflite_int8")
+
+# Batches are zero-padded up to one of these sizes so each model is traced at most
+# len(BATCH_BUCKETS) times; larger batches are split into chunks of the biggest bucket.
+BATCH_BUCKETS = (1, 4, 16, 64)
+
+# Suffixes written by jobs/export_models.py next to the .keras file
+TFLITE_SUFFIXES = {
+    "tflite": "_dynamic.tflite",
+    "tflite_int8": "_int8.tflite",
+}
+
+
+def tflite_path(keras_path: Path, backend: str) -> Path:
+    keras_path = Path(keras_path)
+    return keras_path.with_name(keras_path.stem + TFLITE_SUFFIXES[backend])
+
+
+class CompiledModel:
+    """
+    Calls a Keras model through tf.function concrete functions with fixed input
+    signatures, one per batch bucket. This skips the data-adapter and callback
+    setup model.predict does on every call, which dominates 1-row inference.
+    """
+
+    def __init__(self, model, buckets: tuple = BATCH_BUCKETS):
+        self.model = model
+        self.input_shape = model.input_shape
+        self.buckets = tuple(sorted(buckets))
+        self._fn = tf.function(lambda x: self.model(x, training=False))
+        self._concrete = {}
+        self._lock = threading.Lock()
+
+    def _function_for(self, bucket: int):
+        fn = self._concrete.get(bucket)
+        if fn is None:
+            with self._lock:
+                fn = self._concrete.get(bucket)
+                if fn is None:
+                    spec = tf.TensorSpec([bucket] + list(self.input_shape[1:]), tf.float32)
+                    fn = self._fn.get_concrete_function(spec)
+                    self._concrete[bucket] = fn
+        return fn
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        x = np.asarray(x, dtype=np.float32)
+        largest = self.buckets[-1]
+        outputs = []
+        for start in range(0, x.shape[0], largest):
+            chunk = x[start:start + largest]
+            n = chunk.shape[0]
+            bucket = next(b for b in self.buckets if b >= n)
+            if bucket != n:
+                padded = np.zeros((bucket,) + chunk.shape[1:], dtype=np.float32)
+                padded[:n] = chunk
+                chunk = padded
+            outputs.append(self._function_for(bucket)(tf.constant(chunk)).numpy()[:n])
+        return np.concatenate(outputs)
+
+
+class KerasBackend:
+    """Float Keras model, compiled into per-bucket tf.functions unless compiled=False."""
+
+    def __init__(self, model_path: Path, compiled: bool = True):
+        self.name = "keras" if compiled else "keras_predict"
+        self.model_path = Path(model_path)
+        self.model = tf.keras.models.load_model(str(self.model_path))
+        self.input_shape = self.model.input_shape
+        self._compiled = CompiledModel(self.model) if compiled else None
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        if self._compiled is not None:
+            return self._compiled.predict(x)
+        return self.model.predict(x, verbose=0)
+
+
+class TFLiteBackend:
+    """
+    TFLite interpreter for a converted model. Handles dynamic batch sizes and
+    (de)quantizes int8 inputs/outputs so callers always pass and get float32.
+    """
+
+    def __init__(self, model_path: Path, name: str = "tflite", num_threads: Optional[int] = None):
+        self.name = name
+        self.model_path = Path(model_path)
+        self.interpreter = tf.lite.Interpreter(model_path=str(self.model_path), num_threads=num_threads)
+        self.interpreter.allocate_tensors()
+        self._input = self.interpreter.get_input_details()[0]
+        self._output = self.interpreter.get_output_details()[0]
+        self.input_shape = tuple([None] + list(self._input["shape"][1:]))
+        # the interpreter holds mutable tensor buffers and is not thread-safe
+        self._lock = threading.Lock()
+
+    def _quantize(self, x: np.ndarray) -> np.ndarray:
+        scale, zero_point = self._input["quantization"]
+        if self._input["dtype"] in (np.int8, np.uint8) and scale:
+            return np.round(x / scale + zero_point).astype(self._input["dtype"])
+        return x.astype(self._input["dtype"])
+
+    def _dequantize(self, y: np.ndarray) -> np.ndarray:
+        scale, zero_point = self._output["quantization"]
+        if self._output["dtype"] in (np.int8, np.uint8) and scale:
+            return (y.astype(np.float32) - zero_point) * scale
+        return y.astype(np.float32)
+
+    def predict(self, x: np.ndarray) -> np.ndarray:
+        with self._lock:
+            if self._input["shape"][0] != x.shape[0]:
+                self.interpreter.resize_tensor_input(self._input["index"], list(x.shape))
+                self.interpreter.allocate_tensors()
+                self._input = self.interpreter.get_input_details()[0]
+                self._output = self.interpreter.get_output_details()[0]
+            self.interpreter.set_tensor(self._input["index"], self._quantize(x))
+            self.interpreter.invoke()
+            return self._dequantize(self.interpreter.get_tensor(self._output["index"]))
+
+
+def load_backend(keras_path: Path, backend: str = "keras", num_threads: Optional[int] = None):
+    """
+    Load a model with the requested backend. Falls back to the float Keras model
+    when the converted file has not been exported yet.
+    """
+    if backend not in BACKENDS:
+        logger.warning(f"Unknown inference backend '{backend}', using keras")
+        backend = "keras"
+
+    if backend in TFLITE_SUFFIXES:
+        path = tflite_path(keras_path, backend)
+        if path.exists():
+            logger.info(f"Loading {backend} model from: {path}")
+            return TFLiteBackend(path, name=backend, num_threads=num_threads)
+        logger.warning(f"{path.name} not found (run jobs/export_models.py), using keras")
+
+    return KerasBackend(keras_path, compiled=(backend != "keras_predict"))
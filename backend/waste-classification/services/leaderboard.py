@@ -0,0 +1,276 @@
+import logging
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from pymongo import ASCENDING, UpdateOne
+
+from core.cache import TTLCache
+from core.config import get_settings
+from core.database import get_database
+from core.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+LEADERBOARD_COLLECTION = "leaderboards"
+WASTE_TYPE_COUNT = 3
+TOP_K = 50
+# leaderboard field -> bill field summed into it
+SUM_FIELDS = {
+    "total_paid": "final_bill",
+    "total_weight": "weight_kg",
+    "base_cost": "base_cost",
+    "penalty_amount": "penalty_amount",
+    "discount_amount": "discount_amount",
+}
+# What record_paid needs from a bill
+BILL_FIELDS = {"household_id": 1, "waste_type": 1, "year": 1, "week": 1, **{f: 1 for f in SUM_FIELDS.values()}}
+
+
+def get_weeks_for_month(year: int, month: int):
+
+    first_day = datetime(year, month, 1)
+    if month == 12:
+        last_day = datetime(year + 1, 1, 1) - timedelta(days=1)
+    else:
+        last_day = datetime(year, month + 1, 1) - timedelta(days=1)
+
+    start_week = first_day.isocalendar()[1]
+    end_week = last_day.isocalendar()[1]
+
+    if end_week < start_week:
+        return list(range(start_week, 53)) + list(range(1, end_week + 1))
+
+    return list(range(start_week, end_week + 1))
+
+
+@lru_cache(maxsize=4096)
+def months_for_week(year: int, week: int) -> Tuple[int, ...]:
+    """Months whose get_weeks_for_month range contains `week` (boundary weeks count for both months)."""
+    return tuple(month for month in range(1, 13) if week in get_weeks_for_month(year, month))
+
+
+def entry_id(period: str, year: int, bucket: int, household_id: str) -> str:
+    return f"{period}|{year}|{bucket}|{household_id}"
+
+
+class LeaderboardService:
+    """
+    Weekly and monthly leaderboards materialized in `leaderboards`, one document
+    per (period, year, week|month, household) with the paid totals and the set of
+    distinct activities (waste types for a week, "<week>-<waste type>" for a
+    month). Paying a bill folds it in with a pipeline upsert; reads are a top-K
+    index scan plus one households lookup, cached in-process for a short TTL.
+    record_adjustment() moves the totals of a bill changed after it was paid.
+    rebuild() recomputes everything from the bills with $merge.
+    """
+
+    def __init__(self, cache_ttl_seconds: float = 30):
+        self.cache = TTLCache(maxsize=256, ttl_seconds=cache_ttl_seconds)
+
+    @property
+    def collection(self):
+        return get_database()[LEADERBOARD_COLLECTION]
+
+    async def ensure_indexes(self) -> None:
+        await self.collection.create_index(
+            [("period", ASCENDING), ("year", ASCENDING), ("bucket", ASCENDING), ("total_paid", ASCENDING)],
+            name="period_year_bucket_total_paid"
+        )
+        await self.collection.create_index([("updated_at", ASCENDING)], name="updated_at")
+
+    @staticmethod
+    def _fold(period: str, year: int, bucket: int, bill: dict, activity: str, now: datetime) -> UpdateOne:
+        """Add one paid bill to a leaderboard entry (pipeline update so activity_count stays in sync)."""
+        household_id = bill["household_id"]
+        return UpdateOne({"_id": entry_id(period, year, bucket, household_id)}, [
+            {"$set": {
+                "period": period, "year": year, "bucket": bucket, "household_id": household_id,
+                "activities": {"$setUnion": [{"$ifNull": ["$activities", []]}, [{"$literal": activity}]]},
+                **{field: {"$add": [{"$ifNull": [f"${field}", 0]}, float(bill.get(source) or 0.0)]}
+                   for field, source in SUM_FIELDS.items()},
+                "updated_at": now,
+            }},
+            {"$set": {"activity_count": {"$size": "$activities"}}},
+        ], upsert=True)
+
+    @staticmethod
+    def _buckets(bill: dict) -> Iterator[Tuple[str, int, int, str]]:
+        """(period, year, bucket, activity) of every entry a bill counts towards."""
+        year, week, waste_type = bill.get("year"), bill.get("week"), bill.get("waste_type")
+        if year is None or week is None:
+            return
+        yield "weekly", year, week, waste_type
+        for month in months_for_week(year, week):
+            yield "monthly", year, month, f"{week}-{waste_type}"
+
+    async def _write(self, operations: List[UpdateOne], touched: set) -> None:
+        if not operations:
+            return
+        try:
+            await self.collection.bulk_write(operations, ordered=False)
+        except Exception as e:
+            logger.error(f"Leaderboard update failed for {len(operations)} entries: {str(e)}")
+        for key in touched:
+            self.cache.pop(key)
+
+    async def record_paid(self, bills: Iterable[dict]) -> None:
+        """
+        Fold newly PAID bills (with BILL_FIELDS) into their weekly and monthly
+        entries. Callers must pass each bill once, when its status flips to PAID.
+        Failures are logged, not raised: the payment stands and rebuild() repairs.
+        """
+        now = datetime.now(timezone.utc)
+        operations, touched = [], set()
+        for bill in bills:
+            for period, year, bucket, activity in self._buckets(bill):
+                operations.append(self._fold(period, year, bucket, bill, activity, now))
+                touched.add((period, year, bucket))
+        await self._write(operations, touched)
+
+    async def record_adjustment(self, bill: dict, deltas: Dict[str, float]) -> None:
+        """
+        Add `deltas` (leaderboard field -> change, e.g. {"total_paid": -5.0}) to the
+        entries of a bill already folded in by record_paid. Entries that do not
+        exist are left to rebuild(); failures are logged as in record_paid.
+        """
+        deltas = {field: float(delta) for field, delta in deltas.items() if delta}
+        if not deltas:
+            return
+        now = datetime.now(timezone.utc)
+        operations, touched = [], set()
+        for period, year, bucket, _ in self._buckets(bill):
+            operations.append(UpdateOne({"_id": entry_id(period, year, bucket, bill["household_id"])},
+                                        {"$inc": deltas, "$set": {"updated_at": now}}))
+            touched.add((period, year, bucket))
+        await self._write(operations, touched)
+
+    async def weekly(self, year: int, week: int) -> List[dict]:
+        return await self._top("weekly", year, week, WASTE_TYPE_COUNT)
+
+    async def monthly(self, year: int, month: int, limit: int = TOP_K, use_cache: bool = True) -> List[dict]:
+        required = len(get_weeks_for_month(year, month)) * WASTE_TYPE_COUNT
+        if not use_cache:
+            return await self._query("monthly", year, month, required, limit)
+        return (await self._top("monthly", year, month, required))[:limit]
+
+    async def _top(self, period: str, year: int, bucket: int, required: int) -> List[dict]:
+        key = (period, year, bucket)
+        cached = self.cache.get(key)
+        if cached is not None:
+            return cached
+        result = await self._query(period, year, bucket, required, TOP_K)
+        self.cache.set(key, result)
+        return result
+
+    async def _query(self, period: str, year: int, bucket: int, required: int, limit: int) -> List[dict]:
+        cursor = self.collection.find(
+            {"period": period, "year": year, "bucket": bucket, "activity_count": {"$gte": required}},
+            {"activities": 0}
+        ).sort("total_paid", ASCENDING).batch_size(limit)
+
+        # Entries without a household profile are skipped (the old $lookup + $unwind), so names
+        # are resolved per batch until `limit` ranked rows exist
+        rows, batch = [], []
+        async for doc in cursor:
+            batch.append(doc)
+            if len(batch) == limit:
+                rows.extend(await self._named(batch))
+                batch = []
+                if len(rows) >= limit:
+                    break
+        if batch and len(rows) < limit:
+            rows.extend(await self._named(batch))
+
+        return [{"rank": i + 1, **self._format(doc, name, period, required)}
+                for i, (doc, name) in enumerate(rows[:limit])]
+
+    async def _named(self, docs: List[dict]) -> List[Tuple[dict, Optional[str]]]:
+        cursor = get_database().households_col.find(
+            {"_id": {"$in": [doc["household_id"] for doc in docs]}}, {"name": 1}
+        )
+        names = {profile["_id"]: profile.get("name") async for profile in cursor}
+        return [(doc, names[doc["household_id"]]) for doc in docs if doc["household_id"] in names]
+
+    @staticmethod
+    def _format(doc: dict, name: Optional[str], period: str, required: int) -> dict:
+        if period == "weekly":
+            consistency = f"{WASTE_TYPE_COUNT}/{WASTE_TYPE_COUNT} Types"
+        else:
+            consistency = f"{doc.get('activity_count', 0)}/{required} Collections"
+        return {
+            "_id": doc["household_id"],
+            "household_id": doc["household_id"],
+            "household_name": name,
+            **{field: round(float(doc.get(field, 0.0)), 2) for field in SUM_FIELDS},
+            "consistency": consistency,
+        }
+
+    def _merge_pipeline(self, match: dict, period: str, group_key: dict, bucket: str, activity, now: datetime) -> list:
+        return [
+            {"$match": match},
+            {"$group": {
+                "_id": {**group_key, "household_id": "$household_id"},
+                "activities": {"$addToSet": activity},
+                **{field: {"$sum": f"${source}"} for field, source in SUM_FIELDS.items()},
+            }},
+            {"$project": {
+                "_id": {"$concat": [period, "|", {"$toString": "$_id.year"}, "|", {"$toString": bucket},
+                                    "|", {"$toString": "$_id.household_id"}]},
+                "period": {"$literal": period},
+                "year": "$_id.year",
+                "bucket": bucket,
+                "household_id": "$_id.household_id",
+                "activities": 1,
+                "activity_count": {"$size": "$activities"},
+                **{field: 1 for field in SUM_FIELDS},
+                "updated_at": {"$literal": now},
+            }},
+            # entries folded by record_paid/record_adjustment since the rebuild started are newer; keep them
+            {"$merge": {"into": LEADERBOARD_COLLECTION, "on": "_id", "whenNotMatched": "insert",
+                        "whenMatched": [{"$replaceWith": {
+                            "$cond": [{"$gte": ["$updated_at", "$$new.updated_at"]}, "$$ROOT", "$$new"]
+                        }}]}},
+        ]
+
+    async def rebuild(self, year: Optional[int] = None) -> dict:
+        """
+        Recompute every entry (or one year's) from the PAID bills with $merge,
+        then drop entries the rebuild did not touch (e.g. bills no longer PAID).
+        Entries updated by payments while it runs are left as they are.
+        """
+        db = get_database()
+        started = datetime.now(timezone.utc)
+        match = {"status": "PAID"}
+        if year is not None:
+            match["year"] = year
+
+        await db.bills.aggregate(self._merge_pipeline(
+            match, "weekly", {"year": "$year", "week": "$week"}, "$_id.week", "$waste_type", started
+        )).to_list(length=None)
+
+        years = [year] if year is not None else await db.bills.distinct("year", {"status": "PAID"})
+        for y in years:
+            for month in range(1, 13):
+                await db.bills.aggregate(self._merge_pipeline(
+                    {**match, "year": y, "week": {"$in": get_weeks_for_month(y, month)}},
+                    "monthly", {"year": "$year"}, {"$literal": month},
+                    {"$concat": [{"$toString": "$week"}, "-", "$waste_type"]}, started
+                )).to_list(length=None)
+
+        stale = {"updated_at": {"$lt": started}}
+        if year is not None:
+            stale["year"] = year
+        removed = await self.collection.delete_many(stale)
+        self.cache.clear()
+        entries = await self.collection.count_documents({} if year is None else {"year": year})
+        logger.info(f"Leaderboards rebuilt for {len(years)} year(s): {entries} entries, "
+                    f"{removed.deleted_count} stale removed")
+        return {"years": sorted(years), "entries": entries, "removed": removed.deleted_count}
+
+    def stats(self) -> dict:
+        return self.cache.stats()
+
+
+leaderboard = LeaderboardService(cache_ttl_seconds=get_settings().leaderboard_cache_ttl_seconds)
+register_metrics("leaderboard_cache", leaderboard.stats)
@@ -0,0 +1,308 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime, timezone
+from typing import Dict, List, Tuple
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import OperationFailure
+
+from core.constants import household_location
+from core.database import db as mongo, get_database, TRANSACTIONS_UNSUPPORTED_CODES
+from repositories import prices_repo, pending_repo
+from services.household_history import HouseholdHistory, HISTORY_PROJECTION, HISTORY_FORMAT, MAX_WEEKS
+from services.tax_services import tax_engine
+
+logger = logging.getLogger(__name__)
+
+VERIFIABLE_STATUSES = ["REVIEW", "DENIED"]
+# Only queued submissions can be denied: VERIFIED ones have a bill, VERIFYING ones are being billed
+DENIABLE_STATUSES = ["REVIEW"]
+# Re-reads after another reviewer changed a submission or reward mid-batch
+MAX_STALE_RETRIES = 3
+
+
+def _history_push(household_id: str, waste_type: str, entries: List[dict]) -> UpdateOne:
+    """
+    Append weeks to the history arrays atomically, keeping the last MAX_WEEKS.
+    A document still in the legacy `weeks` layout is converted in the same update.
+    """
+    def appended(field: str, legacy: str, values: list) -> dict:
+        current = {"$ifNull": [f"${field}", {"$ifNull": [f"$weeks.{legacy}", []]}]}
+        return {"$slice": [{"$concatArrays": [current, values]}, -MAX_WEEKS]}
+
+    return UpdateOne({"household_id": household_id, "waste_type": waste_type}, [
+        {"$set": {
+            "format": HISTORY_FORMAT,
+            "years": appended("years", "year", [e["year"] for e in entries]),
+            "week_numbers": appended("week_numbers", "week", [e["week"] for e in entries]),
+            "weights": appended("weights", "weight_kg", [e["weight_kg"] for e in entries]),
+        }},
+        {"$unset": "weeks"},
+    ], upsert=True)
+
+
+class ReviewError(Exception):
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+class _StaleReview(Exception):
+    """A conditional write matched fewer documents than read; the batch must be recomputed."""
+
+
+class ReviewVerificationService:
+    """
+    Verifies pending weight submissions into bills. All read-side data (prices,
+    history, available rewards) is fetched in parallel with one query per
+    collection for the whole batch. Bills are computed in one batched model call,
+    and the writes (rewards, history, bills, pending) go out as one bulk write
+    per collection inside a multi-document transaction (the REVIEW counter is
+    adjusted after the commit, outside it). If the server cannot
+    run transactions, the same writes run without one, and the pending status is
+    claimed first so a submission is never billed twice.
+    """
+
+    def __init__(self):
+        self.transactions_supported = True
+
+    async def _load(self, submissions: List[dict]) -> Tuple[Dict[str, float], Dict[tuple, HouseholdHistory],
+                                                           Dict[str, list]]:
+        db = get_database()
+        household_ids = list({s["household_id"] for s in submissions})
+        waste_types = list({s["waste_type"] for s in submissions})
+
+        async def history():
+            cursor = db.history_col.find(
+                {"household_id": {"$in": household_ids}, "waste_type": {"$in": waste_types}},
+                {"_id": 0, "household_id": 1, "waste_type": 1, **HISTORY_PROJECTION}
+            )
+            return {(doc["household_id"], doc["waste_type"]): HouseholdHistory.from_document(doc)
+                    async for doc in cursor}
+
+        async def rewards():
+            cursor = db.rewards.find(
+                {"household_id": {"$in": household_ids}, "status": "AVAILABLE"},
+                {"household_id": 1, "amount": 1}
+            )
+            grouped = defaultdict(list)
+            async for doc in cursor:
+                grouped[doc["household_id"]].append(doc)
+            return grouped
+
+        return await asyncio.gather(prices_repo.get_current_prices(waste_types), history(), rewards())
+
+    def _build(self, submissions: List[dict], prices: Dict[str, float],
+               history: Dict[tuple, HouseholdHistory], rewards: Dict[str, list],
+               claimed: bool = False) -> Tuple[List[dict], dict]:
+        """Compute bills and the write set. Submissions of the same household/type chain in week order."""
+        submissions = sorted(submissions, key=lambda s: (s.get("year", 0), s.get("week", 0)))
+        histories = dict(history)
+        rows, contexts = [], []
+        for sub in submissions:
+            key = (sub["household_id"], sub["waste_type"])
+            weeks = histories.get(key, HouseholdHistory())
+            weight_kg = sub["weight_kg"]
+            lag1 = float(weeks.weights[-1]) if len(weeks) else 0.0
+            all_weights = weeks.weights.tolist() + [weight_kg]
+            r4 = sum(all_weights[-4:]) / min(len(all_weights), 4)
+            r12 = sum(all_weights[-12:]) / min(len(all_weights), 12)
+            rows.append({"weight": weight_kg, "category": sub["waste_type"], "r4": r4, "r12": r12,
+                         "lag1": lag1, "rate": prices.get(sub["waste_type"], 0.0)})
+
+            entry = {
+                "year": int(sub.get("year", datetime.now().year)),
+                "week": int(sub.get("week", 1)),
+                "weight_kg": float(weight_kg),
+            }
+            histories[key] = weeks.append(entry["year"], entry["week"], entry["weight_kg"], keep=None)
+            contexts.append((sub, entry))
+
+        calculations = tax_engine.calculate_bills(rows)
+
+        now = datetime.now(timezone.utc)
+        results, bills, reward_updates = [], [], []
+        history_pushes = defaultdict(list)
+        for (sub, entry), calc in zip(contexts, calculations):
+            reward_credit = 0.0
+            available = rewards.get(sub["household_id"])
+            if available:
+                reward = available.pop(0)
+                reward_credit = float(reward.get("amount", 0.0))
+                reward_updates.append(UpdateOne(
+                    {"_id": reward["_id"], "status": "AVAILABLE"},
+                    {"$set": {"status": "USED", "applied_to_bill": sub["_id"]}}
+                ))
+
+            subtotal = float(calc.get("final_bill", 0.0))
+            final_amount = max(0.0, round(subtotal - reward_credit, 2))
+            history_pushes[(sub["household_id"], sub["waste_type"])].append(entry)
+            bill = {
+                "_id": ObjectId(),
+                "household_id": sub["household_id"],
+                "location": sub.get("location") or household_location(sub["household_id"]),
+                "submission_id": sub["_id"],
+                "waste_type": sub["waste_type"],
+                "weight_kg": float(sub["weight_kg"]),
+                "year": entry["year"],
+                "week": entry["week"],
+                "base_cost": float(calc.get("base_cost", 0.0)),
+                "penalty_amount": float(calc.get("penalty_amount", 0.0)),
+                "discount_amount": float(calc.get("discount_amount", 0.0)),
+                "reward_deduction": float(reward_credit),
+                "final_bill": float(final_amount),
+                "status": "UNPAID",
+                "created_at": now
+            }
+            bills.append(bill)
+            results.append({
+                "submission_id": str(sub["_id"]),
+                "status": "VERIFIED",
+                "bill_id": str(bill["_id"]),
+                "subtotal": subtotal,
+                "reward_applied": reward_credit,
+                "final_bill": final_amount
+            })
+
+        review_deltas = defaultdict(int)
+        for sub, _ in contexts:
+            if sub.get("status") == "REVIEW":
+                review_deltas[sub.get("location")] -= 1
+
+        writes = {
+            "review_count": dict(review_deltas),
+            "rewards": reward_updates,
+            "history": [_history_push(hid, wtype, entries) for (hid, wtype), entries in history_pushes.items()],
+            "bills": bills,
+            "pending": [
+                UpdateOne({"_id": sub["_id"], "status": "VERIFYING" if claimed else {"$in": VERIFIABLE_STATUSES}},
+                          {"$set": {"status": "VERIFIED", "reviewed_at": now},
+                           **({"$unset": {"claimed_status": "", "verifying_at": ""}} if claimed else {})})
+                for sub, _ in contexts
+            ],
+        }
+        return results, writes
+
+    async def _apply(self, writes: dict, session=None) -> None:
+        db = get_database()
+        if writes["pending"]:
+            result = await db.pending_col.bulk_write(writes["pending"], ordered=False, session=session)
+            if session is not None and result.matched_count < len(writes["pending"]):
+                raise _StaleReview()
+        if writes["rewards"]:
+            result = await db.rewards.bulk_write(writes["rewards"], ordered=False, session=session)
+            if session is not None and result.matched_count < len(writes["rewards"]):
+                raise _StaleReview()
+        if writes["history"]:
+            await db.history_col.bulk_write(writes["history"], ordered=False, session=session)
+        if writes["bills"]:
+            await db.bills.insert_many(writes["bills"], ordered=False, session=session)
+
+    async def _claim(self, submissions: List[dict]) -> List[dict]:
+        """
+        Non-transactional path: flip pending -> VERIFYING first so concurrent
+        reviewers cannot double-bill. The previous status and claim time are kept
+        so a failed or abandoned claim can be released (pending_repo.release_claims).
+        """
+        db = get_database()
+        ids = [s["_id"] for s in submissions]
+        await db.pending_col.update_many(
+            {"_id": {"$in": ids}, "status": {"$in": VERIFIABLE_STATUSES}},
+            [{"$set": {"claimed_status": "$status", "status": "VERIFYING", "verifying_at": "$$NOW"}}]
+        )
+        claimed = {doc["_id"] async for doc in db.pending_col.find(
+            {"_id": {"$in": ids}, "status": "VERIFYING"}, {"_id": 1})}
+        return [s for s in submissions if s["_id"] in claimed]
+
+    async def _write(self, submissions: List[dict]) -> List[dict]:
+        if self.transactions_supported:
+            prices, history, rewards = await self._load(submissions)
+            results, writes = self._build(submissions, prices, history, rewards)
+            try:
+                async with await mongo.client.start_session() as session:
+                    # with_transaction retries TransientTransactionError and unknown commit results
+                    await session.with_transaction(lambda s: self._apply(writes, session=s))
+                await self._adjust_review_count(writes)
+                return results
+            except OperationFailure as e:
+                if e.code not in TRANSACTIONS_UNSUPPORTED_CODES:
+                    raise
+                self.transactions_supported = False
+                logger.warning("MongoDB transactions unavailable; verifying reviews without a transaction")
+
+        submissions = await self._claim(submissions)
+        if not submissions:
+            return []
+        try:
+            prices, history, rewards = await self._load(submissions)
+            results, writes = self._build(submissions, prices, history, rewards, claimed=True)
+            await self._apply(writes)
+        except Exception:
+            # Submissions already VERIFIED stay so; the rest go back to the queue
+            await pending_repo.release_claims([s["_id"] for s in submissions])
+            raise
+        await self._adjust_review_count(writes)
+        return results
+
+    @staticmethod
+    async def _adjust_review_count(writes: dict) -> None:
+        """
+        After the commit, outside the transaction: every review would otherwise
+        write the single counter document and conflict with every other one.
+        Drift from a failure here is repaired by pending_repo.recount().
+        """
+        try:
+            await pending_repo.adjust_review_count(writes["review_count"])
+        except Exception as e:
+            logger.error(f"Review counter update failed: {str(e)}")
+
+    async def verify_many(self, submission_ids: List[ObjectId]) -> Dict[str, dict]:
+        """Verify submissions by id; returns {submission_id: result or {"error": ...}}."""
+        for attempt in range(MAX_STALE_RETRIES):
+            try:
+                return await self._verify_many(submission_ids)
+            except _StaleReview:
+                logger.info(f"Review batch changed concurrently, retrying ({attempt + 1}/{MAX_STALE_RETRIES})")
+        try:
+            return await self._verify_many(submission_ids)
+        except _StaleReview:
+            logger.warning(f"Review batch still changing after {MAX_STALE_RETRIES} retries; giving up")
+            return {str(sid): {"submission_id": str(sid), "error": "Submission was reviewed concurrently"}
+                    for sid in submission_ids}
+
+    async def _verify_many(self, submission_ids: List[ObjectId]) -> Dict[str, dict]:
+        db = get_database()
+        cursor = db.pending_col.find({"_id": {"$in": submission_ids}})
+        found = {doc["_id"]: doc async for doc in cursor}
+
+        outcome = {}
+        verifiable = []
+        for sid in submission_ids:
+            sub = found.get(sid)
+            if sub is None:
+                outcome[str(sid)] = {"submission_id": str(sid), "error": "Submission not found"}
+            elif sub.get("status") not in VERIFIABLE_STATUSES:
+                outcome[str(sid)] = {"submission_id": str(sid), "error": f"Submission already {sub.get('status')}"}
+            else:
+                verifiable.append(sub)
+
+        if verifiable:
+            results = await self._write(verifiable)
+            outcome.update({r["submission_id"]: r for r in results})
+            for sub in verifiable:
+                outcome.setdefault(str(sub["_id"]), {"submission_id": str(sub["_id"]),
+                                                     "error": "Submission was reviewed concurrently"})
+        return outcome
+
+    async def verify(self, submission_id: ObjectId) -> dict:
+        result = (await self.verify_many([submission_id]))[str(submission_id)]
+        if "error" in result:
+            status = 404 if result["error"] == "Submission not found" else 409
+            raise ReviewError(status, result["error"])
+        return result
+
+
+review_service = ReviewVerificationService()
@@ -0,0 +1,49 @@
+import logging
+from datetime import datetime, timezone
+from typing import List
+
+from pymongo import UpdateOne
+
+from core.database import get_database
+from services.leaderboard import leaderboard
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_REWARD_RATES = {"rank1_pct": 12.0, "rank2_pct": 10.0, "rank3_pct": 8.0}
+
+
+async def get_reward_rates() -> dict:
+    """Reward percentages for ranks 1-3 from the global settings, or the defaults."""
+    db = get_database()
+    settings = await db.settings.find_one({"type": "global_rewards"})
+    if not settings:
+        return dict(DEFAULT_REWARD_RATES)
+    return {key: settings.get(key, default) for key, default in DEFAULT_REWARD_RATES.items()}
+
+
+async def distribute_monthly_rewards(year: int, month: int, rank_pcts: List[float]) -> int:
+    """
+    Issue rewards to the top of the monthly leaderboard, `rank_pcts[i]` percent
+    of the winner's monthly total for rank i+1. Idempotent per (household, year,
+    month); returns the number of rewards newly issued.
+    """
+    db = get_database()
+    # Bills carry year/week only; the monthly leaderboard already groups them by the
+    # get_weeks_for_month weeks, so the top of it are the month's winners
+    winners = await leaderboard.monthly(year, month, limit=len(rank_pcts), use_cache=False)
+
+    now = datetime.now(timezone.utc)
+    operations = []
+    for winner, pct in zip(winners, rank_pcts):
+        amt = round(winner["total_paid"] * pct / 100, 2)
+        if amt > 0:
+            key = {"household_id": winner["household_id"], "year": year, "month": month}
+            operations.append(UpdateOne(key, {"$setOnInsert": {
+                **key, "amount": amt, "status": "AVAILABLE", "rank": winner["rank"], "created_at": now
+            }}, upsert=True))
+
+    if not operations:
+        return 0
+    result = await db.rewards.bulk_write(operations, ordered=False)
+    logger.info(f"Rewards for {year}-{month:02d}: {result.upserted_count} issued to {len(operations)} winners")
+    return result.upserted_count
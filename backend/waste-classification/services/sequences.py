@@ -0,0 +1,143 @@
+import asyncio
+import logging
+from typing import Awaitable, Callable, Dict, List, Optional
+
+from pymongo import ReturnDocument
+
+from core.config import get_settings
+from core.constants import location_counter_id
+from core.database import get_database
+from core.metrics import register_metrics
+
+logger = logging.getLogger(__name__)
+
+COMPLAINT_COUNTER_ID = "complaint_id"
+TIP_COUNTER_ID = "tip_id"
+
+
+class SequenceAllocator:
+    """
+    Sequence numbers from the `counters` collection ({_id, sequence_value}).
+
+    - next(counter_id): one number. With block_size > 1 the process reserves
+      `block_size` numbers in one $inc and hands them out from memory, so only
+      one call in `block_size` goes to MongoDB. Numbers stay unique across
+      workers but are no longer strictly ordered between them, and the unused
+      rest of a block is skipped on restart.
+    - allocate(counter_id, count): a contiguous run for batch imports, one $inc.
+    - raise_to(counter_id, value): $max, for IDs taken without the allocator.
+    - peek(counter_id): the next number without consuming it, for suggested IDs
+      that are only taken (via raise_to) once actually used.
+
+    Counters whose IDs can also be chosen by hand (household, collector) must be
+    allocated with block_size=1, otherwise raise_to cannot protect numbers that
+    already sit in an in-memory block.
+    """
+
+    def __init__(self, block_size: int = 100):
+        self.block_size = max(1, block_size)
+        self._blocks: Dict[str, List[int]] = {}  # counter_id -> [next, last]
+        self._locks: Dict[str, asyncio.Lock] = {}
+        self._seeded = set()
+        self.round_trips = 0
+        self.allocated = 0
+
+    @property
+    def counters(self):
+        return get_database()["counters"]
+
+    async def _increment(self, counter_id: str, amount: int) -> int:
+        """Add `amount` to the counter and return its new value (the last number reserved)."""
+        result = await self.counters.find_one_and_update(
+            {"_id": counter_id},
+            {"$inc": {"sequence_value": amount}},
+            upsert=True,
+            return_document=ReturnDocument.AFTER,
+        )
+        self.round_trips += 1
+        return int(result.get("sequence_value", amount)) if result else amount
+
+    async def _seed(self, counter_id: str, seed: Optional[Callable[[], Awaitable[int]]]) -> None:
+        if seed is None or counter_id in self._seeded:
+            return
+        if await self.counters.find_one({"_id": counter_id}, {"_id": 1}) is None:
+            await self.raise_to(counter_id, await seed())
+        self._seeded.add(counter_id)
+
+    async def next(self, counter_id: str, block_size: Optional[int] = None,
+                   seed: Optional[Callable[[], Awaitable[int]]] = None) -> int:
+        """
+        Next number of `counter_id`. `seed` is awaited only when the counter does
+        not exist yet and returns the highest number already in use.
+        """
+        block_size = self.block_size if block_size is None else max(1, block_size)
+        lock = self._locks.setdefault(counter_id, asyncio.Lock())
+        async with lock:
+            block = self._blocks.get(counter_id)
+            if block is None or block[0] > block[1]:
+                await self._seed(counter_id, seed)
+                last = await self._increment(counter_id, block_size)
+                block = self._blocks[counter_id] = [last - block_size + 1, last]
+            value = block[0]
+            block[0] += 1
+        self.allocated += 1
+        return value
+
+    async def allocate(self, counter_id: str, count: int,
+                       seed: Optional[Callable[[], Awaitable[int]]] = None) -> List[int]:
+        """`count` consecutive numbers in one round trip, bypassing the in-memory block."""
+        if count <= 0:
+            return []
+        await self._seed(counter_id, seed)
+        last = await self._increment(counter_id, count)
+        self.allocated += count
+        return list(range(last - count + 1, last + 1))
+
+    async def raise_to(self, counter_id: str, value: int) -> None:
+        await self.counters.update_one({"_id": counter_id}, {"$max": {"sequence_value": int(value)}}, upsert=True)
+
+    async def current(self, counter_id: str) -> int:
+        doc = await self.counters.find_one({"_id": counter_id}, {"sequence_value": 1})
+        return int(doc.get("sequence_value", 0)) if doc else 0
+
+    async def peek(self, counter_id: str, seed: Optional[Callable[[], Awaitable[int]]] = None) -> int:
+        """The number a block_size=1 next() would return now, without taking it."""
+        await self._seed(counter_id, seed)
+        return await self.current(counter_id) + 1
+
+    def stats(self) -> dict:
+        return {
+            "block_size": self.block_size,
+            "allocated": self.allocated,
+            "round_trips": self.round_trips,
+            "buffered": {cid: max(0, b[1] - b[0] + 1) for cid, b in self._blocks.items()},
+        }
+
+
+sequences = SequenceAllocator(block_size=get_settings().sequence_block_size)
+register_metrics("sequences", sequences.stats)
+
+
+async def next_complaint_id() -> str:
+    return f"CMP_{await sequences.next(COMPLAINT_COUNTER_ID):06d}"
+
+
+async def next_tip_id() -> str:
+    return f"TIP_{await sequences.next(TIP_COUNTER_ID):04d}"
+
+
+async def next_location_sequence(kind: str, location: str,
+                                 seed: Optional[Callable[[], Awaitable[int]]] = None) -> int:
+    """Per-location counter (`<kind>_seq:<location>`), allocated one at a time (see SequenceAllocator)."""
+    return await sequences.next(location_counter_id(kind, location), block_size=1, seed=seed)
+
+
+async def peek_location_sequence(kind: str, location: str,
+                                 seed: Optional[Callable[[], Awaitable[int]]] = None) -> int:
+    """Next number of a location counter, left unallocated (see SequenceAllocator.peek)."""
+    return await sequences.peek(location_counter_id(kind, location), seed=seed)
+
+
+async def reserve_location_sequence(kind: str, location: str, value: int) -> None:
+    """Raise a location counter to at least `value` (an ID was taken without going through the counter)."""
+    await sequences.raise_to(location_counter_id(kind, location), value)
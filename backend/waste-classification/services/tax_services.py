@@ -5,9 +5,13 @@ import xgboost as xgb
 from pathlib import Path
 from typing import List, Optional, Dict, Any
 from tensorflow.keras.models import load_model
+from services.inference import CompiledModel
 from motor.motor_asyncio import AsyncIOMotorClient
 from passlib.context import CryptContext
 from fastapi import HTTPException
+from core.constants import normalize_location, id_suffix
+from services.sequences import peek_location_sequence
+from repositories import households_repo
 
 
 # ==========================================
@@ -18,26 +22,6 @@ from core.database import get_database
 db = get_database()
 
 
-def classify_behaviour(waste_type: str, weight: float) -> str:
-    if waste_type == "Organic":
-        thresholds = [0.5, 2.0, 5.0]
-    elif waste_type == "Inorganic":
-        thresholds = [1.0, 4.0, 8.0]
-    elif waste_type == "Recyclable":
-        thresholds = [0.1, 0.8, 2.5]
-    else:
-        return "Unknown"
-
-    if weight <= thresholds[0]:
-        return "Zero"
-    elif weight <= thresholds[1]:
-        return "Low"
-    elif weight <= thresholds[2]:
-        return "Normal"
-    else:
-        return "High"
-
-
 def update_week_history(prev_12_weeks: List[float], new_weight: float) -> List[float]:
     prev_12_weeks = prev_12_weeks[-11:]
     prev_12_weeks.append(new_weight)
@@ -57,33 +41,23 @@ def get_password_hash(password):
     return pwd_context.hash(password)
 
 
-async def get_next_collector_id(location: str) -> str:
-
-    db = get_database()
-
+async def max_collector_sequence(location: str) -> int:
+    cursor = get_database()["users"].find(
+        {"location_key": normalize_location(location), "username": {"$regex": "^Collector_"}}, {"username": 1}
+    )
+    return max([id_suffix(doc["username"], "_") async for doc in cursor], default=0)
 
-    if db is None:
-        raise HTTPException(status_code=500, detail="Database connection not initialized")
 
-    users_collection = db["users"]
-    regex_pattern = f"^Collector_{location}_\\d+$"
-    cursor = users_collection.find({"username": {"$regex": regex_pattern}})
+async def max_household_sequence(location: str) -> int:
+    return await households_repo.max_sequence(location)
 
-    users = await cursor.to_list(length=1000)
-    if not users:
-        return "01"
 
-    max_num = 0
-    for user in users:
-        try:
-            parts = user["username"].split("_")
-            num_part = int(parts[-1])
-            if num_part > max_num:
-                max_num = num_part
-        except (ValueError, IndexError):
-            continue
-
-    return f"{max_num + 1:02d}"
+async def get_next_collector_id(location: str) -> str:
+    if not normalize_location(location):
+        raise HTTPException(status_code=400, detail="Location is required")
+    # read-only suggestion; /register takes the number when the collector is stored
+    seq = await peek_location_sequence("collector", location, lambda: max_collector_sequence(location))
+    return f"{seq:02d}"
 
 
 async def set_base_price(waste_type: str, price: float, collector_id: str):
@@ -95,7 +69,7 @@ async def set_base_price(waste_type: str, price: float, collector_id: str):
 
 
 async def get_base_price(waste_type: str) -> float:
-    record = await db.waste_prices.find_one({"waste_type": waste_type})
+    record = await db.waste_prices.find_one({"waste_type": waste_type}, {"base_price": 1})
     return record["base_price"] if record else 0.0
 
 
@@ -123,7 +97,7 @@ try:
     for cat in WASTE_CATEGORIES:
         model_path = MODELS_DIR_WASTE / f"{cat}_lstm_model.keras"
         if model_path.exists():
-            lstm_models[cat] = load_model(model_path)
+            lstm_models[cat] = CompiledModel(load_model(model_path))
             scalers_x[cat] = joblib.load(MODELS_DIR_WASTE / f"{cat}_scaler_x.pkl")
             scalers_y[cat] = joblib.load(MODELS_DIR_WASTE / f"{cat}_scaler_y.pkl")
 except Exception as e:
@@ -134,7 +108,7 @@ def predict_weight(waste_type: str, features: np.ndarray) -> float:
     waste_type = waste_type.lower()
     model, s_x, s_y = lstm_models[waste_type], scalers_x[waste_type], scalers_y[waste_type]
     X_scaled = s_x.transform(features)
-    pred_scaled = model.predict(X_scaled.reshape(1, 12, 7), verbose=0)
+    pred_scaled = model.predict(X_scaled.reshape(1, 12, 7))
     return float(s_y.inverse_transform(pred_scaled)[0][0])
 
 
@@ -176,30 +150,47 @@ class TaxEngine:
             print(f"Tax Model Load Error: {e}")
 
     def calculate_bill(self, weight, category, r4, r12, lag1, rate):
-        if not self.encoders: return {"error": "Models not loaded"}
+        return self.calculate_bills([{"weight": weight, "category": category, "r4": r4, "r12": r12,
+                                      "lag1": lag1, "rate": rate}])[0]
+
+    def calculate_bills(self, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        calculate_bill for many inputs at once: one DataFrame and one predict
+        call per model instead of one per bill. Each row has the calculate_bill
+        keyword arguments (weight, category, r4, r12, lag1, rate).
+        """
+        if not self.encoders: return [{"error": "Models not loaded"} for _ in rows]
+        if not rows: return []
         cat_encoder = self.encoders['main_waste_category']
-        valid_cat = next((c for c in cat_encoder.classes_ if c.lower() == category.lower()), category)
-        cat_encoded = cat_encoder.transform([valid_cat])[0]
+        classes = {c.lower(): c for c in cat_encoder.classes_}
+        categories = [classes.get(str(r["category"]).lower(), r["category"]) for r in rows]
 
+        weight = np.array([r["weight"] for r in rows], dtype=float)
+        r4 = np.array([r["r4"] for r in rows], dtype=float)
+        rate = np.array([r["rate"] for r in rows], dtype=float)
         util_ratio = weight / (r4 + 0.001)
-        input_df = pd.DataFrame({'weight_kg': [weight], 'roll_4w': [r4], 'roll_12w': [r12], 'lag_1w': [lag1],
-                                 'main_waste_category': [cat_encoded], 'base_tax_rate': [rate],
-                                 'utilization_ratio': [util_ratio]})
-
-        is_excess = self.m_excess.predict(input_df)[0]
-        disc_rate = np.clip(self.m_discount.predict(input_df)[0], 0.0, 1.0)
-
-        base_cost = weight * rate
-        status = "PENALTY" if is_excess == 1 else "Normal"
-        cost_after_penalty = base_cost * (1.5 if is_excess == 1 else 1.0)
-
-        return {
-            "status": status, "base_cost": round(base_cost, 2),
-            "penalty_amount": round(cost_after_penalty - base_cost, 2),
-            "discount_percent": round(float(disc_rate) * 100, 1),
-            "discount_amount": round(cost_after_penalty * disc_rate, 2),
-            "final_bill": round(cost_after_penalty * (1 - disc_rate), 2), "utilization_ratio": round(util_ratio, 2)
-        }
+        input_df = pd.DataFrame({'weight_kg': weight, 'roll_4w': r4, 'roll_12w': [r["r12"] for r in rows],
+                                 'lag_1w': [r["lag1"] for r in rows],
+                                 'main_waste_category': cat_encoder.transform(categories), 'base_tax_rate': rate,
+                                 'utilization_ratio': util_ratio})
+
+        is_excess = self.m_excess.predict(input_df)
+        disc_rate = np.clip(self.m_discount.predict(input_df), 0.0, 1.0)
+
+        results = []
+        for i in range(len(rows)):
+            base_cost = weight[i] * rate[i]
+            excess = is_excess[i] == 1
+            cost_after_penalty = base_cost * (1.5 if excess else 1.0)
+            results.append({
+                "status": "PENALTY" if excess else "Normal", "base_cost": round(float(base_cost), 2),
+                "penalty_amount": round(float(cost_after_penalty - base_cost), 2),
+                "discount_percent": round(float(disc_rate[i]) * 100, 1),
+                "discount_amount": round(float(cost_after_penalty * disc_rate[i]), 2),
+                "final_bill": round(float(cost_after_penalty * (1 - disc_rate[i])), 2),
+                "utilization_ratio": round(float(util_ratio[i]), 2)
+            })
+        return results
 
 
 tax_engine = TaxEngine()
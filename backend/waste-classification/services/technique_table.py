@@ -0,0 +1,137 @@
+import itertools
+import logging
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple
+
+import joblib
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+TABLE_VERSION = 1
+# Above this many combinations the table is filled lazily instead of up front
+MAX_PRECOMPUTED_ROWS = 200_000
+
+
+class TechniqueLookupTable:
+    """
+    Precomputed XGBoost technique predictions over the full categorical input
+    space (every category the encoder was fitted on), persisted next to
+    technique_encoder.pkl. Inputs outside that space are predicted once and
+    memoized in-process.
+
+    source_paths are the model, encoder, label encoder and feature column files,
+    in that order; the table records the mtime of the files it was built from.
+    """
+
+    def __init__(self, xgboost_model, encoder, label_encoder, categorical_columns: List[str],
+                 table_path: Path, source_paths: List[Path], loaded_mtime: Optional[float] = None):
+        self.xgboost_model = xgboost_model
+        self.encoder = encoder
+        self.label_encoder = label_encoder
+        self.categorical_columns = list(categorical_columns)
+        self.table_path = Path(table_path)
+        self.source_paths = [Path(p) for p in source_paths]
+        # mtime of the model files in memory (taken before they were read, so a later write counts as newer)
+        self.loaded_mtime = self._source_mtime() if loaded_mtime is None else loaded_mtime
+        self.table: Dict[Tuple[str, ...], str] = {}
+        self.lookups = 0
+        self.fallbacks = 0
+
+    def _source_mtime(self) -> float:
+        return max((p.stat().st_mtime for p in self.source_paths if p.exists()), default=0.0)
+
+    def reload_sources(self) -> None:
+        """Load the model, encoders and feature columns from source_paths (e.g. after retraining)."""
+        loaded_mtime = self._source_mtime()
+        model_path, encoder_path, label_encoder_path, columns_path = self.source_paths
+        xgboost_model = joblib.load(str(model_path))
+        encoder = joblib.load(str(encoder_path))
+        label_encoder = joblib.load(str(label_encoder_path))
+        categorical_columns = list(joblib.load(str(columns_path)))
+        self.xgboost_model, self.encoder, self.label_encoder = xgboost_model, encoder, label_encoder
+        self.categorical_columns = categorical_columns
+        self.loaded_mtime = loaded_mtime
+        logger.info("Reloaded technique model and encoders")
+
+    def predict_rows(self, rows: np.ndarray, models: Optional[tuple] = None) -> List[str]:
+        """Run encoder + XGBoost on a (n, len(categorical_columns)) array of strings."""
+        xgboost_model, encoder, label_encoder = models or (self.xgboost_model, self.encoder, self.label_encoder)
+        X_encoded = encoder.transform(rows)
+        y_pred_int = xgboost_model.predict(X_encoded)
+        return [str(label) for label in label_encoder.inverse_transform(y_pred_int)]
+
+    def build(self) -> Dict[Tuple[str, ...], str]:
+        categories = getattr(self.encoder, "categories_", None)
+        if categories is None or len(categories) != len(self.categorical_columns):
+            logger.warning("Technique encoder exposes no categories_; technique table will fill lazily")
+            return {}
+
+        space = [[str(c) for c in column] for column in categories]
+        size = int(np.prod([len(column) for column in space]))
+        if size > MAX_PRECOMPUTED_ROWS:
+            logger.warning(f"Technique input space has {size} rows; technique table will fill lazily")
+            return {}
+
+        keys = list(itertools.product(*space))
+        labels = self.predict_rows(np.array(keys, dtype=object).astype(str))
+        logger.info(f"Built technique lookup table with {len(keys)} entries")
+        return dict(zip(keys, labels))
+
+    def load(self) -> None:
+        """Load the persisted table, rebuilding it if missing or older than the model files."""
+        try:
+            if self.table_path.exists():
+                stored = joblib.load(self.table_path)
+                if stored.get("version") == TABLE_VERSION \
+                        and stored.get("columns") == self.categorical_columns \
+                        and stored.get("source_mtime", 0) >= self._source_mtime():
+                    self.table = stored["table"]
+                    logger.info(f"Loaded technique lookup table ({len(self.table)} entries)")
+                    return
+                logger.info("Technique lookup table is stale; regenerating")
+        except Exception as e:
+            logger.warning(f"Could not load technique lookup table: {str(e)}")
+        self.regenerate()
+
+    def regenerate(self, reload: bool = False) -> int:
+        """
+        Rebuild and persist the table from the model in memory; with reload=True
+        the retrained model files are loaded first.
+        """
+        if reload:
+            self.reload_sources()
+        try:
+            self.table = self.build()
+        except Exception as e:
+            logger.error(f"Could not build technique lookup table, filling lazily: {str(e)}")
+            self.table = {}
+        if self.table:
+            try:
+                joblib.dump({
+                    "version": TABLE_VERSION,
+                    "columns": self.categorical_columns,
+                    "source_mtime": self.loaded_mtime,
+                    "table": self.table,
+                }, self.table_path)
+            except Exception as e:
+                logger.warning(f"Could not persist technique lookup table: {str(e)}")
+        return len(self.table)
+
+    def get(self, row: Dict[str, str]) -> Optional[str]:
+        key = tuple(str(row[column]) for column in self.categorical_columns)
+        self.lookups += 1
+        technique = self.table.get(key)
+        if technique is None:
+            self.fallbacks += 1
+            models = (self.xgboost_model, self.encoder, self.label_encoder)
+            technique = self.predict_rows(np.array([key], dtype=object).astype(str), models)[0]
+            self.table[key] = technique
+        return technique
+
+    def stats(self) -> dict:
+        return {
+            "entries": len(self.table),
+            "lookups": self.lookups,
+            "model_fallbacks": self.fallbacks,
+        }
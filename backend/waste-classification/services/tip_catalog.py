@@ -0,0 +1,127 @@
+import asyncio
+import logging
+import random
+import time
+from collections import defaultdict
+from typing import Dict, List, Optional, Tuple
+
+from pymongo import ReturnDocument
+
+from core.database import get_database
+from services.tip_feedback import UNRATED_WEIGHT, smoothed_like_ratio
+
+logger = logging.getLogger(__name__)
+
+# counters document bumped by anything that writes to the tips collection
+TIPS_VERSION_ID = "tips_version"
+# Floor for poorly rated tips so they still surface occasionally and can recover.
+# Weights are smoothed like ratios, so an unrated tip weighs UNRATED_WEIGHT (0.5)
+# and any net-positive tip weighs more.
+MIN_TIP_WEIGHT = 0.05
+
+
+async def bump_tips_version() -> int:
+    """Mark the tips catalog as changed so every worker reloads it on its next check."""
+    db = get_database()
+    result = await db["counters"].find_one_and_update(
+        {"_id": TIPS_VERSION_ID},
+        {"$inc": {"sequence_value": 1}},
+        upsert=True,
+        return_document=ReturnDocument.AFTER
+    )
+    return result.get("sequence_value", 1) if result else 1
+
+
+class TipCatalog:
+    """
+    In-process copy of the (small, rarely changing) tips collection grouped by
+    (waste_type, technique), so picking a random tip is a dict lookup instead of
+    a query. At most every `refresh_seconds` the `tips_version` counter is read
+    and the catalog is reloaded only when it has moved; feedback scores from
+    `tip_scores` are re-read on every check and weight the random pick
+    (smoothed like ratio; the Wilson `score` there is for ranking only).
+    """
+
+    def __init__(self, refresh_seconds: float = 300):
+        self.refresh_seconds = refresh_seconds
+        self.groups: Dict[Tuple[str, str], List[dict]] = {}
+        self.weights: Dict[str, float] = {}
+        self.version: Optional[int] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+        self.reloads = 0
+        self.picks = 0
+
+    async def _current_version(self, db) -> int:
+        doc = await db["counters"].find_one({"_id": TIPS_VERSION_ID}, {"sequence_value": 1})
+        return doc.get("sequence_value", 0) if doc else 0
+
+    async def _load(self, db) -> None:
+        cursor = db["tips"].find({}, {"_id": 1, "waste_type": 1, "technique": 1, "title": 1, "description": 1})
+        groups = defaultdict(list)
+        async for doc in cursor:
+            groups[(doc.get("waste_type"), doc.get("technique"))].append({
+                "tip_id": doc["_id"],
+                "title": doc.get("title", ""),
+                "description": doc.get("description", "")
+            })
+        self.groups = dict(groups)
+        self.reloads += 1
+        logger.info(f"Loaded tip catalog: {sum(len(g) for g in self.groups.values())} tips "
+                    f"in {len(self.groups)} groups (version {self.version})")
+
+    async def _load_weights(self, db) -> None:
+        cursor = db["tip_scores"].find({}, {"weight": 1, "likes": 1, "dislikes": 1})
+        # entries written before `weight` existed fall back to their counters
+        self.weights = {doc["_id"]: doc["weight"] if "weight" in doc
+                        else smoothed_like_ratio(doc.get("likes", 0), doc.get("dislikes", 0))
+                        async for doc in cursor}
+
+    def update_weights(self, weights: Dict[str, float]) -> None:
+        """Apply weights freshly written by this worker's feedback writer."""
+        self.weights.update(weights)
+
+    def _weight(self, tip_id: str) -> float:
+        return max(self.weights.get(tip_id, UNRATED_WEIGHT), MIN_TIP_WEIGHT)
+
+    async def refresh(self, force: bool = False) -> None:
+        if not force and self.version is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+            return
+        async with self._lock:
+            # another request may have refreshed while we waited for the lock
+            if not force and self.version is not None and time.monotonic() - self._checked_at < self.refresh_seconds:
+                return
+            try:
+                db = get_database()
+                version = await self._current_version(db)
+                if force or version != self.version:
+                    self.version = version
+                    await self._load(db)
+                await self._load_weights(db)
+                self._checked_at = time.monotonic()
+            except Exception as e:
+                # keep serving the previous catalog; retry on the next request
+                logger.error(f"Error refreshing tip catalog: {str(e)}")
+
+    async def random_tip(self, waste_type: str, technique: str) -> Optional[dict]:
+        await self.refresh()
+        candidates = self.groups.get((waste_type, technique))
+        if not candidates:
+            return None
+        self.picks += 1
+        weights = [self._weight(tip["tip_id"]) for tip in candidates]
+        return dict(random.choices(candidates, weights=weights)[0])
+
+    async def ensure_indexes(self) -> None:
+        db = get_database()
+        await db["tips"].create_index([("waste_type", 1), ("technique", 1)])
+
+    def stats(self) -> dict:
+        return {
+            "version": self.version,
+            "groups": len(self.groups),
+            "tips": sum(len(g) for g in self.groups.values()),
+            "scored_tips": len(self.weights),
+            "reloads": self.reloads,
+            "picks": self.picks,
+        }
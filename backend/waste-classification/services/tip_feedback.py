@@ -0,0 +1,227 @@
+import asyncio
+import logging
+from collections import defaultdict
+from datetime import datetime
+from typing import Callable, Dict, List, Optional
+
+from bson import ObjectId
+from pymongo import UpdateOne
+from pymongo.errors import BulkWriteError
+
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+FEEDBACK_COLLECTION = "tip_feedback"
+SCORES_COLLECTION = "tip_scores"
+# 95% confidence
+WILSON_Z = 1.96
+# Smoothed like ratio of a tip nobody has rated yet: (0 + 1) / (0 + 2)
+UNRATED_WEIGHT = 0.5
+MAX_FLUSH_ATTEMPTS = 3
+FLUSH_RETRY_DELAY_SECONDS = 1.0
+# Batch ids remembered per tip so a retried batch is not counted twice
+APPLIED_BATCHES_KEPT = 20
+
+
+def smoothed_like_ratio(likes: int, dislikes: int) -> float:
+    """Laplace-smoothed like ratio used as the selection weight; UNRATED_WEIGHT with no votes."""
+    return (likes + 1) / (likes + dislikes + 2)
+
+
+def _wilson_expr(z: float = WILSON_Z) -> dict:
+    """
+    Lower bound of the Wilson score interval for the document's like ratio
+    (0 with no votes), as an aggregation expression.
+    """
+    z2 = z * z
+    return {"$let": {
+        "vars": {"n": {"$add": ["$likes", "$dislikes"]}},
+        "in": {"$cond": [{"$eq": ["$$n", 0]}, 0.0, {"$let": {
+            "vars": {"p": {"$divide": ["$likes", "$$n"]}},
+            "in": {"$divide": [
+                {"$subtract": [
+                    {"$add": ["$$p", {"$divide": [z2, {"$multiply": [2, "$$n"]}]}]},
+                    {"$multiply": [z, {"$sqrt": {"$divide": [
+                        {"$add": [{"$multiply": ["$$p", {"$subtract": [1, "$$p"]}]},
+                                  {"$divide": [z2, {"$multiply": [4, "$$n"]}]}]},
+                        "$$n"]}}]},
+                ]},
+                {"$add": [1, {"$divide": [z2, "$$n"]}]},
+            ]},
+        }}]},
+    }}
+
+
+def _score_pipeline(inc: Dict[str, int], batch_id: ObjectId, now: datetime) -> list:
+    """
+    Pipeline update adding one batch's likes/dislikes to a tip and recomputing
+    its `score` (Wilson lower bound, for ranking) and `weight` (smoothed like
+    ratio, for selection) from the new counters in the same write. A batch
+    already in `applied_batches` leaves the counters unchanged.
+    """
+    applied = {"$in": [batch_id, {"$ifNull": ["$applied_batches", []]}]}
+    return [
+        {"$set": {
+            **{field: {"$add": [{"$ifNull": [f"${field}", 0]}, {"$cond": [applied, 0, inc[field]]}]}
+               for field in ("likes", "dislikes")},
+            "applied_batches": {"$cond": [applied, "$applied_batches", {"$slice": [
+                {"$concatArrays": [{"$ifNull": ["$applied_batches", []]}, [batch_id]]}, -APPLIED_BATCHES_KEPT
+            ]}]},
+            "updated_at": now,
+        }},
+        {"$set": {
+            "score": _wilson_expr(),
+            "weight": {"$divide": [{"$add": ["$likes", 1]}, {"$add": ["$likes", "$dislikes", 2]}]},
+        }},
+    ]
+
+
+class TipFeedbackWriter:
+    """
+    Buffers tip like/dislike events and writes them in batches: raw events go
+    to `tip_feedback` with one insert_many, and per-tip counters in `tip_scores`
+    are bumped with one bulk_write of pipeline updates that also recompute each
+    tip's score and weight. A batch is flushed when it reaches `batch_size` or
+    every `flush_interval_seconds`; a failed batch is retried as a whole
+    (the writes are idempotent) up to MAX_FLUSH_ATTEMPTS times.
+    """
+
+    def __init__(self, batch_size: int = 200, flush_interval_seconds: float = 5.0,
+                 max_queue_size: int = 10000,
+                 on_scores: Optional[Callable[[Dict[str, float]], None]] = None):
+        self.batch_size = batch_size
+        self.flush_interval_seconds = flush_interval_seconds
+        self.on_scores = on_scores
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queue_size)
+        self._task: Optional[asyncio.Task] = None
+        self._flushing: Optional[asyncio.Future] = None
+        # events taken off the queue for the batch being collected
+        self._pending: List[dict] = []
+        self.written = 0
+        self.dropped = 0
+        self.failed_batches = 0
+        self.retries = 0
+
+    async def submit(self, tip_id: str, user_id: str, feedback: str) -> bool:
+        """Queue one feedback event. Returns False if the buffer is full and the event was dropped."""
+        event = {"_id": ObjectId(), "tip_id": tip_id, "user_id": user_id, "feedback": feedback,
+                 "created_at": datetime.utcnow()}
+        try:
+            self._queue.put_nowait(event)
+            return True
+        except asyncio.QueueFull:
+            self.dropped += 1
+            logger.warning(f"Tip feedback buffer full, dropping feedback for {tip_id}")
+            return False
+
+    async def _next_batch(self) -> List[dict]:
+        self._pending.append(await self._queue.get())
+        deadline = asyncio.get_running_loop().time() + self.flush_interval_seconds
+        while len(self._pending) < self.batch_size:
+            timeout = deadline - asyncio.get_running_loop().time()
+            if timeout <= 0:
+                break
+            try:
+                self._pending.append(await asyncio.wait_for(self._queue.get(), timeout))
+            except asyncio.TimeoutError:
+                break
+        batch, self._pending = self._pending, []
+        return batch
+
+    def _drain(self) -> List[dict]:
+        batch, self._pending = self._pending, []
+        while not self._queue.empty():
+            batch.append(self._queue.get_nowait())
+        return batch
+
+    async def _write(self, batch: List[dict], counts: Dict[str, dict], batch_id: ObjectId) -> None:
+        """
+        Idempotent write of one batch, so a failed attempt can be retried as a
+        whole: events carry their _id from submit() (re-inserting one is a
+        duplicate key), and each tip's counters only take a batch whose id is
+        not among the ones it recently applied.
+        """
+        db = get_database()
+        try:
+            await db[FEEDBACK_COLLECTION].insert_many(batch, ordered=False)
+        except BulkWriteError as e:
+            if any(error.get("code") != 11000 for error in e.details.get("writeErrors", [])) \
+                    or e.details.get("writeConcernErrors"):
+                raise
+
+        now = datetime.utcnow()
+        await db[SCORES_COLLECTION].bulk_write([
+            UpdateOne({"_id": tip_id}, _score_pipeline(inc, batch_id, now), upsert=True)
+            for tip_id, inc in counts.items()
+        ], ordered=False)
+
+    async def _flush(self, batch: List[dict]) -> None:
+        if not batch:
+            return
+        counts = defaultdict(lambda: {"likes": 0, "dislikes": 0})
+        for event in batch:
+            counts[event["tip_id"]]["likes" if event["feedback"] == "like" else "dislikes"] += 1
+
+        batch_id = ObjectId()
+        for attempt in range(1, MAX_FLUSH_ATTEMPTS + 1):
+            try:
+                await self._write(batch, counts, batch_id)
+                break
+            except Exception as e:
+                if attempt == MAX_FLUSH_ATTEMPTS:
+                    self.failed_batches += 1
+                    logger.error(f"Giving up on tip feedback batch of {len(batch)} after {attempt} attempts: {str(e)}")
+                    return
+                self.retries += 1
+                logger.warning(f"Error writing tip feedback batch of {len(batch)} (attempt {attempt}), "
+                               f"retrying: {str(e)}")
+                await asyncio.sleep(FLUSH_RETRY_DELAY_SECONDS * attempt)
+
+        self.written += len(batch)
+        logger.info(f"Flushed {len(batch)} tip feedback events for {len(counts)} tips")
+        if self.on_scores:
+            try:
+                cursor = get_database()[SCORES_COLLECTION].find({"_id": {"$in": list(counts)}}, {"weight": 1})
+                self.on_scores({doc["_id"]: doc.get("weight", UNRATED_WEIGHT) async for doc in cursor})
+            except Exception as e:
+                logger.warning(f"Could not read back tip weights: {str(e)}")
+
+    async def _run(self) -> None:
+        while True:
+            batch = await self._next_batch()
+            # shielded so stop() cannot cancel a batch halfway through its writes
+            self._flushing = asyncio.ensure_future(self._flush(batch))
+            await asyncio.shield(self._flushing)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+            logger.info("Tip feedback writer started")
+
+    async def stop(self) -> None:
+        """Stop the background task and flush whatever is still buffered."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        if self._flushing is not None and not self._flushing.done():
+            await self._flushing
+        await self._flush(self._drain())
+
+    async def ensure_indexes(self) -> None:
+        db = get_database()
+        await db[FEEDBACK_COLLECTION].create_index([("tip_id", 1), ("created_at", -1)])
+        await db[FEEDBACK_COLLECTION].create_index("user_id")
+
+    def stats(self) -> dict:
+        return {
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "failed_batches": self.failed_batches,
+            "retries": self.retries,
+        }
@@ -0,0 +1,101 @@
+import hashlib
+import logging
+from datetime import datetime
+from typing import Iterable, Optional, Set
+
+from core.cache import TTLCache
+from core.database import get_database
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_COLLECTION = "tip_workflows"
+
+
+def tip_digest(tip: dict) -> str:
+    """Short hash of the tip text the workflow prompt is built from."""
+    text = f"{tip.get('title', '')}\n{tip.get('description', '')}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def workflow_key(waste_type: str, technique: str, tip: dict) -> str:
+    return f"{waste_type}|{technique}|{tip['tip_id']}|{tip_digest(tip)}"
+
+
+class WorkflowCache:
+    """
+    LLM-generated workflow steps keyed by (waste_type, technique, tip_id) and a
+    digest of the tip's title and description; the prompt is deterministic for
+    that key, and editing a tip's text leaves the old workflow unreachable until
+    it expires. In-process LRU in front of a MongoDB collection expired by a TTL
+    index, so all workers share generated workflows.
+    """
+
+    def __init__(self, maxsize: int = 2048, ttl_seconds: int = 7 * 24 * 3600):
+        self.memory = TTLCache(maxsize=maxsize, ttl_seconds=ttl_seconds)
+        self.ttl_seconds = ttl_seconds
+        self.memory_hits = 0
+        self.db_hits = 0
+        self.misses = 0
+
+    async def get(self, waste_type: str, technique: str, tip: dict) -> Optional[str]:
+        key = workflow_key(waste_type, technique, tip)
+        workflow = self.memory.get(key)
+        if workflow is not None:
+            self.memory_hits += 1
+            return workflow
+
+        try:
+            db = get_database()
+            doc = await db[WORKFLOW_COLLECTION].find_one({"_id": key}, {"workflow": 1})
+        except Exception as e:
+            logger.warning(f"Workflow cache lookup failed: {str(e)}")
+            doc = None
+
+        if doc and doc.get("workflow"):
+            self.db_hits += 1
+            self.memory.set(key, doc["workflow"])
+            return doc["workflow"]
+
+        self.misses += 1
+        return None
+
+    async def set(self, waste_type: str, technique: str, tip: dict, workflow: str) -> None:
+        key = workflow_key(waste_type, technique, tip)
+        self.memory.set(key, workflow)
+        try:
+            db = get_database()
+            await db[WORKFLOW_COLLECTION].update_one(
+                {"_id": key},
+                {"$set": {
+                    "waste_type": waste_type,
+                    "technique": technique,
+                    "tip_id": tip["tip_id"],
+                    "tip_digest": tip_digest(tip),
+                    "workflow": workflow,
+                    "created_at": datetime.utcnow()
+                }},
+                upsert=True
+            )
+        except Exception as e:
+            logger.warning(f"Workflow cache write failed: {str(e)}")
+
+    async def cached_keys(self, keys: Iterable[str]) -> Set[str]:
+        """Which of the given keys already have a stored workflow (one query, not counted in stats)."""
+        db = get_database()
+        cursor = db[WORKFLOW_COLLECTION].find({"_id": {"$in": list(keys)}}, {"_id": 1})
+        return {doc["_id"] async for doc in cursor}
+
+    async def ensure_indexes(self) -> None:
+        db = get_database()
+        await db[WORKFLOW_COLLECTION].create_index("created_at", expireAfterSeconds=self.ttl_seconds)
+
+    def stats(self) -> dict:
+        lookups = self.memory_hits + self.db_hits + self.misses
+        return {
+            "lookups": lookups,
+            "memory_hits": self.memory_hits,
+            "db_hits": self.db_hits,
+            "misses": self.misses,
+            "hit_ratio": round((self.memory_hits + self.db_hits) / lookups, 4) if lookups else 0.0,
+            "memory_size": len(self.memory),
+        }